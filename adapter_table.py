@@ -0,0 +1,208 @@
+import argparse
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import traced
+from json_codec import JSONDecodeError
+from vault_index import list_dir, read_json
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to stdlib arrays
+    np = None
+
+credit_adapters_dir = "credit_adapters"
+vaults_dir = "vaults"
+
+ADAPTER_FIELDS = [
+    ("adapter_name", "adapter_name", "N/A"),
+    ("status", "status", "N/A"),
+    ("schema_version", "schema_version", "N/A"),
+    ("endpoint", "endpoint", ""),
+    ("compliance_note", "compliance_note", "No specific note provided.")
+]
+METADATA_FIELDS = [
+    ("tradeline_schema_version", "tradeline_schema_version", "N/A"),
+    ("credit_score_model", "credit_score_model", "N/A"),
+    ("vault_data_schema", "vault_data_schema", "N/A"),
+    ("currency", "regional_currency", "N/A"),
+    ("aesthetic_tag", "aesthetic_tag", "N/A")
+]
+COLUMNS = ["region"] + [name for name, _, _ in ADAPTER_FIELDS] + [name for name, _, _ in METADATA_FIELDS]
+
+MISSING_ADAPTER = {"adapter_name": "Adapter file missing", "status": "Missing", "compliance_note": "Adapter file not found in directory."}
+UNREADABLE_ADAPTER = {"adapter_name": "Error reading adapter file", "status": "Error", "compliance_note": "Could not decode adapter JSON."}
+
+
+def _codes_array(codes):
+    if np is not None:
+        return np.asarray(codes, dtype=np.int32)
+    return array("i", codes)
+
+
+class _Column:
+    # Dictionary-encoded string column: one small int code per row plus the distinct labels.
+    __slots__ = ("codes", "labels")
+
+    def __init__(self, codes, labels):
+        self.codes = codes
+        self.labels = labels
+
+    @classmethod
+    def encode(cls, values):
+        lookup = {}
+        labels = []
+        codes = []
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(labels)
+                labels.append(value)
+            codes.append(code)
+        return cls(_codes_array(codes), labels)
+
+    def set(self, index, value):
+        try:
+            code = self.labels.index(value)
+        except ValueError:
+            code = len(self.labels)
+            self.labels.append(value)
+        self.codes[index] = code
+
+    def take(self, indices):
+        if np is not None:
+            return _Column(self.codes[indices], self.labels)
+        return _Column(array("i", (self.codes[i] for i in indices)), self.labels)
+
+    def __iter__(self):
+        labels = self.labels
+        return (labels[code] for code in self.codes)
+
+
+def _read_json(path):
+    try:
+        return read_json(path)
+    except FileNotFoundError:
+        return None
+    except JSONDecodeError:
+        return False
+
+
+@traced("adapter_table.load_region")
+def _load_region_record(region_code):
+    adapter_data = _read_json(os.path.join(credit_adapters_dir, f"{region_code}_adapter.json"))
+    if adapter_data is None:
+        adapter_data = MISSING_ADAPTER
+    elif adapter_data is False or not isinstance(adapter_data, dict):
+        adapter_data = UNREADABLE_ADAPTER
+    metadata = _read_json(os.path.join(vaults_dir, region_code, "tradeline_metadata.json"))
+    if not isinstance(metadata, dict):
+        metadata = {}
+
+    record = [region_code.upper()]
+    record.extend(str(adapter_data.get(key, default)) for _, key, default in ADAPTER_FIELDS)
+    record.extend(str(metadata.get(key, default)) for _, key, default in METADATA_FIELDS)
+    return record
+
+
+def _adapter_region_codes():
+    return [name[:-len("_adapter.json")] for name in list_dir(credit_adapters_dir, suffix="_adapter.json")]
+
+
+class AdapterStatusTable:
+    def __init__(self, columns):
+        self._columns = columns
+
+    @classmethod
+    def from_records(cls, records):
+        return cls({name: _Column.encode(record[i] for record in records) for i, name in enumerate(COLUMNS)})
+
+    @classmethod
+    @traced("adapter_table.load")
+    def load(cls, regions=None, max_workers=None):
+        # One scan of the adapter and vault metadata files; every query afterwards runs on the arrays.
+        region_codes = sorted({code.lower() for code in (regions if regions is not None else _adapter_region_codes())})
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            records = list(executor.map(_load_region_record, region_codes))
+        return cls.from_records(records)
+
+    def refresh(self, region_codes):
+        # Re-reads only the given regions and patches their rows in place. Returns the region
+        # codes whose rows changed, or None if a region has no row yet and a full load is needed.
+        regions = self._columns["region"]
+        positions = {label: code for code, label in enumerate(regions.labels)}
+        row_of = {code: i for i, code in enumerate(regions.codes)}
+        changed = []
+        for region_code in sorted({code.lower() for code in region_codes}):
+            label_code = positions.get(region_code.upper())
+            if label_code is None or label_code not in row_of:
+                return None
+            i = row_of[label_code]
+            record = _load_region_record(region_code)
+            current = [self._columns[name].labels[self._columns[name].codes[i]] for name in COLUMNS]
+            if record != current:
+                for name, value in zip(COLUMNS, record):
+                    self._columns[name].set(i, value)
+                changed.append(region_code)
+        return changed
+
+    def __len__(self):
+        return len(self._columns["region"].codes)
+
+    def column(self, name):
+        return list(self._columns[name])
+
+    def rows(self, names):
+        return zip(*(iter(self._columns[name]) for name in names))
+
+    def where(self, name, value):
+        column = self._columns[name]
+        if value not in column.labels:
+            indices = []
+        else:
+            code = column.labels.index(value)
+            if np is not None:
+                indices = np.flatnonzero(column.codes == code)
+            else:
+                indices = [i for i, c in enumerate(column.codes) if c == code]
+        return AdapterStatusTable({key: col.take(indices) for key, col in self._columns.items()})
+
+    def value_counts(self, name):
+        column = self._columns[name]
+        if np is not None:
+            counts = np.bincount(column.codes, minlength=len(column.labels))
+            return {label: int(count) for label, count in zip(column.labels, counts) if count}
+        return {column.labels[code]: count for code, count in Counter(column.codes).items()}
+
+    def count_by(self, group, by="status"):
+        # Grouped counts, e.g. status per schema_version / credit_score_model / currency.
+        group_col = self._columns[group]
+        by_col = self._columns[by]
+        result = {}
+        if np is not None:
+            width = len(by_col.labels)
+            keys = group_col.codes.astype(np.int64) * width + by_col.codes
+            counts = np.bincount(keys, minlength=len(group_col.labels) * width).reshape(len(group_col.labels), width)
+            for g, g_label in enumerate(group_col.labels):
+                row = {by_col.labels[b]: int(count) for b, count in enumerate(counts[g]) if count}
+                if row:
+                    result[g_label] = row
+            return result
+        for (g, b), count in Counter(zip(group_col.codes, by_col.codes)).items():
+            result.setdefault(group_col.labels[g], {})[by_col.labels[b]] = count
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate credit adapter status across vaults.")
+    parser.add_argument("--group-by", default="schema_version", choices=COLUMNS, help="Column to group on.")
+    parser.add_argument("--count", default="status", choices=COLUMNS, help="Column whose values are counted per group.")
+    args = parser.parse_args()
+
+    table = AdapterStatusTable.load()
+    print(f"Loaded {len(table)} adapters ({'NumPy' if np is not None else 'array'} backend).")
+    for group, counts in sorted(table.count_by(args.group_by, args.count).items()):
+        summary = ", ".join(f"{value}: {count}" for value, count in sorted(counts.items()))
+        print(f"  {group}: {summary}")
@@ -0,0 +1,202 @@
+import argparse
+import hashlib
+import os
+import re
+
+from atomic_io import atomic_write_bytes, file_has_bytes
+from instrumentation import traced
+from json_codec import load_file, loads
+
+# What is left of the store: dummy_asset*.txt payloads, which repeat across every vault, are hard
+# linked to one blob each (store_file / migrate), and `gc` prunes blobs no vault links any more.
+# Everything else is a plain file (write_plain). Trees written by the retired "ref" mode still
+# read through read_bytes/read_json until `restore` turns their .ref pointers back into files.
+asset_store_dir = os.environ.get("CRYPDNA_ASSET_STORE", "asset_store")
+REF_SUFFIX = ".ref"
+DEFAULT_REF_ROOTS = ["vaults", "assets", "media", "scripts", "audio"]
+
+# Generated files that `migrate` moves into the store. Only payloads that repeat across vaults and
+# runs belong here; per-region crypmercials and timestamped creatives are unique and stay plain files.
+MIGRATE_PATTERNS = [
+    re.compile(r"(^|.*/)dummy_asset(_\d+)?\.txt$")
+]
+
+
+def blob_path(digest):
+    return os.path.join(asset_store_dir, "objects", digest[:2], digest[2:])
+
+
+def put_bytes(data):
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    # Blobs are immutable: if the digest is already stored there is nothing to write.
+    if not os.path.exists(path):
+        atomic_write_bytes(path, data)
+    return digest
+
+
+def write_plain(path, data):
+    # For unique payloads: a plain file written only when its bytes change, replacing any stale .ref.
+    if not file_has_bytes(path, data):
+        atomic_write_bytes(path, data)
+    if os.path.exists(path + REF_SUFFIX):
+        os.unlink(path + REF_SUFFIX)
+    return path
+
+
+@traced("asset_store.store_file")
+def store_file(path, data):
+    # The vault keeps a hard link to the blob (same inode), or a copy where linking fails, so
+    # vault paths stay readable as plain files by the static site.
+    digest = put_bytes(data)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path + REF_SUFFIX):
+        os.unlink(path + REF_SUFFIX)
+    source = blob_path(digest)
+    tmp_path = f"{path}.{digest[:12]}.tmp"
+    try:
+        if os.path.exists(path) and os.path.samefile(path, source):
+            return path
+        os.link(source, tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        # No hard links here (e.g. another filesystem): fall back to an atomic plain copy.
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        write_plain(path, data)
+    return path
+
+
+def read_ref(ref_path):
+    return load_file(ref_path)
+
+
+def read_bytes(path):
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    ref = read_ref(path + REF_SUFFIX)
+    with open(blob_path(ref["blob"]), "rb") as f:
+        return f.read()
+
+
+def read_json(path):
+    return loads(read_bytes(path))
+
+
+def iter_files(roots, suffix=""):
+    for root in roots:
+        if not os.path.isdir(root):
+            continue
+        stack = [root]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(suffix):
+                        yield entry
+
+
+def referenced_digests(roots=DEFAULT_REF_ROOTS):
+    digests = set()
+    for entry in iter_files(roots, REF_SUFFIX):
+        try:
+            digests.add(read_ref(entry.path)["blob"])
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"Warning: Ignoring unreadable reference {entry.path}")
+    return digests
+
+
+def iter_blobs():
+    objects_dir = os.path.join(asset_store_dir, "objects")
+    if not os.path.isdir(objects_dir):
+        return
+    with os.scandir(objects_dir) as shards:
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as blobs:
+                for blob in blobs:
+                    if not blob.name.endswith(".tmp"):
+                        yield shard.name + blob.name, blob
+
+
+def collect_garbage(roots=DEFAULT_REF_ROOTS, dry_run=False):
+    referenced = referenced_digests(roots)
+    removed = 0
+    freed = 0
+    for digest, blob in iter_blobs():
+        stat = blob.stat()
+        # A blob is live if a .ref points at it or a vault hard-links it (nlink > 1).
+        if digest in referenced or stat.st_nlink > 1:
+            continue
+        removed += 1
+        freed += stat.st_size
+        if not dry_run:
+            os.unlink(blob.path)
+    verb = "Would prune" if dry_run else "Pruned"
+    print(f"{verb} {removed} unreferenced blobs ({freed} bytes).")
+    return removed, freed
+
+
+def migrate(roots=DEFAULT_REF_ROOTS):
+    migrated = 0
+    for entry in list(iter_files(roots)):
+        path = entry.path.replace(os.sep, "/")
+        if entry.name.endswith(REF_SUFFIX) or not any(pattern.match(path) for pattern in MIGRATE_PATTERNS):
+            continue
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        store_file(entry.path, data)
+        migrated += 1
+    print(f"Migrated {migrated} generated assets into {asset_store_dir}.")
+    return migrated
+
+
+def restore(roots=DEFAULT_REF_ROOTS):
+    # Turns every <name>.ref left by the retired "ref" mode back into a plain <name> file.
+    # The blobs stay until `gc` finds them unreferenced.
+    restored = 0
+    for entry in list(iter_files(roots, REF_SUFFIX)):
+        path = entry.path[:-len(REF_SUFFIX)]
+        try:
+            data = read_bytes(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"Warning: Cannot restore {path}; its blob is missing or the ref is unreadable.")
+            continue
+        write_plain(path, data)
+        restored += 1
+    print(f"Restored {restored} referenced assets as plain files.")
+    return restored
+
+
+def store_stats(roots=DEFAULT_REF_ROOTS):
+    blob_count = 0
+    blob_bytes = 0
+    for _, blob in iter_blobs():
+        blob_count += 1
+        blob_bytes += blob.stat().st_size
+    ref_count = sum(1 for _ in iter_files(roots, REF_SUFFIX))
+    return {"blobs": blob_count, "blob_bytes": blob_bytes, "refs": ref_count}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-addressed store for generated vault assets.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    gc_parser = subparsers.add_parser("gc", help="Prune blobs no vault references.")
+    gc_parser.add_argument("--dry-run", action="store_true")
+    subparsers.add_parser("migrate", help="Hard link existing dummy_asset*.txt files to shared blobs.")
+    subparsers.add_parser("restore", help="Replace .ref pointers left by the old ref mode with plain files.")
+    subparsers.add_parser("stats", help="Show blob and reference counts.")
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        collect_garbage(dry_run=args.dry_run)
+    elif args.command == "migrate":
+        migrate()
+    elif args.command == "restore":
+        restore()
+    else:
+        stats = store_stats()
+        print(f"{stats['blobs']} blobs ({stats['blob_bytes']} bytes) referenced by {stats['refs']} refs.")
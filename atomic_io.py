@@ -0,0 +1,63 @@
+import os
+import stat
+import tempfile
+
+from instrumentation import span
+from json_codec import dumps
+
+# Read once at import (single-threaded): os.umask() can only be queried by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def replace_keeping_mode(tmp_path, path):
+    # mkstemp creates 0600 files; give the temp file the target's current mode (or the usual
+    # 0666 & ~umask for a new file) so the rename does not make served files owner-only.
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+def atomic_write_bytes(path, data, fsync=False):
+    # Write to a temp file in the target directory, then rename over the target,
+    # so readers only ever see the old or the new file, never a partial one.
+    with span("io.atomic_write", path=path, bytes=len(data)):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            replace_keeping_mode(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+def atomic_write_text(path, text, fsync=False):
+    atomic_write_bytes(path, text.encode("utf-8"), fsync=fsync)
+
+
+def atomic_write_json(path, data, indent=2, fsync=False, sort_keys=False):
+    # indent=None writes the compact, backend-independent form used for machine-only artifacts.
+    atomic_write_bytes(path, dumps(data, pretty=indent is not None, indent=indent, sort_keys=sort_keys), fsync=fsync)
+
+
+def file_has_bytes(path, data):
+    # Cheap size check first; only read the file when the sizes agree.
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
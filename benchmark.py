@@ -0,0 +1,234 @@
+import argparse
+import json
+import os
+import resource
+import runpy
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from atomic_io import atomic_write_json
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+baseline_path = os.path.join(REPO_DIR, "benchmark_baseline.json")
+
+DEFAULT_SCALES = ["10", "1k", "10k", "100k"]
+DEFAULT_TOLERANCE = 0.25
+
+# Entry points in pipeline order; each later stage consumes what the earlier ones wrote.
+STAGES = [
+    ("create_credit_adapters", []),
+    ("generate_adapter_registry", []),
+    ("link_registry_to_vaults", []),
+    ("generate_credit_report", []),
+    ("simulate_kimi_commercials", []),
+    ("simulate_sync", ["--retries", "0"])
+]
+
+LOCALES = [
+    ("en", "$", "USD", "Neon noir"),
+    ("de", "€", "EUR", "Bauhaus chrome"),
+    ("fr", "€", "EUR", "Noir minimalism"),
+    ("ja", "¥", "JPY", "Kintsugi glow"),
+    ("ar", "د.إ", "AED", "Desert gold")
+]
+
+INDEX_HTML = ('<!DOCTYPE html>\n<html lang="{language}">\n  <head>\n    <script type="module" src="/assets/index-{digest}.js"></script>\n'
+              '    <link rel="stylesheet" href="/assets/index-{digest}.css">\n  </head>\n  <body><div id="root"></div></body>\n</html>\n')
+
+
+def parse_scale(text):
+    text = text.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(text[:-1] if multiplier > 1 else text) * multiplier
+
+
+def synthetic_region_codes(count):
+    width = max(4, len(str(count - 1)))
+    return [f"r{i:0{width}d}" for i in range(count)]
+
+
+def generate_fixture(root, count):
+    # regions_data.json, an existing adapter directory and one vault tree per region.
+    codes = synthetic_region_codes(count)
+    regions = {}
+    os.makedirs(os.path.join(root, "credit_adapters"))
+    for i, code in enumerate(codes):
+        language, symbol, currency, aesthetic = LOCALES[i % len(LOCALES)]
+        regions[code] = {"status": "active" if i % 10 == 0 else "dormant", "language": language,
+                         "currency_symbol": symbol, "currency_iso": currency}
+        vault_dir = os.path.join(root, "vaults", code)
+        os.makedirs(os.path.join(vault_dir, "assets"))
+        config = {"region": code.upper(), "language": language, "currency": currency, "currency_symbol": symbol,
+                  "design_genome_ref": "../../core/design_genome/design_genome.json",
+                  "aesthetic": {"palette": aesthetic, "texture": None, "typography": None}}
+        metadata = {"region": code.upper(), "tradeline_schema_version": "1.0", "credit_score_model": f"CrypDNA-Score-V2-{code.upper()}",
+                    "vault_data_schema": "CrypDNA-Vault-Schema-V3", "regional_currency": currency, "aesthetic_tag": aesthetic}
+        with open(os.path.join(vault_dir, "config.json"), "w") as f:
+            json.dump(config, f, indent=4)
+        with open(os.path.join(vault_dir, "tradeline_metadata.json"), "w") as f:
+            json.dump(metadata, f, indent=2)
+        digest = f"{i:08x}"
+        with open(os.path.join(vault_dir, "index.html"), "w") as f:
+            f.write(INDEX_HTML.format(language=language, digest=digest))
+        with open(os.path.join(vault_dir, "assets", f"index-{digest}.js"), "w") as f:
+            f.write(f"console.log('{code}');\n")
+    with open(os.path.join(root, "regions_data.json"), "w") as f:
+        json.dump(regions, f, indent=2)
+    return len(codes)
+
+
+def fixture_env(root):
+    env = dict(os.environ)
+    env.update({
+        "CRYPDNA_REGIONS_DATA": os.path.join(root, "regions_data.json"),
+        "CRYPDNA_REGION_CACHE_DIR": os.path.join(root, ".cache"),
+        "CRYPDNA_ASSET_STORE": os.path.join(root, "asset_store"),
+        "CRYPDNA_SYNC_JOURNAL": os.path.join(root, "sync_journal"),
+        "CRYPDNA_SYNC_SUMMARY": os.path.join(root, "sync_summary.md"),
+        "PYTHONPATH": REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    })
+    return env
+
+
+def _install_file_op_counter(root, counts):
+    # Audit hooks see every open/scandir/rename/remove the entry point makes; only paths
+    # inside the fixture are counted so interpreter and import I/O stay out of the numbers.
+    root = os.path.realpath(root)
+    write_flags = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT
+
+    def inside(path):
+        if isinstance(path, int):
+            return False
+        return os.path.abspath(os.fsdecode(path)).startswith(root)
+
+    def hook(event, args):
+        if event == "open":
+            path, mode, flags = args
+            if path is None or not inside(path):
+                return
+            writing = any(c in mode for c in "wax+") if isinstance(mode, str) else bool(flags & write_flags)
+            counts["writes" if writing else "reads"] += 1
+        elif event in ("os.scandir", "os.listdir"):
+            if args and args[0] is not None and inside(args[0]):
+                counts["dir_scans"] += 1
+        elif event == "os.rename":
+            if inside(args[0]):
+                counts["renames"] += 1
+        elif event in ("os.remove", "os.mkdir", "os.link"):
+            if inside(args[0]):
+                counts[event[3:] + "s"] += 1
+
+    sys.addaudithook(hook)
+
+
+def run_stage_in_child(stage, argv, root):
+    # Runs inside the benchmark child: execute the entry point as __main__ and report on stdout.
+    counts = dict.fromkeys(("reads", "writes", "dir_scans", "renames", "removes", "mkdirs", "links"), 0)
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(root)
+    sys.argv = [stage] + argv
+    _install_file_op_counter(root, counts)
+    exit_code = 0
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            runpy.run_path(os.path.join(REPO_DIR, f"{stage}.py"), run_name="__main__")
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        finally:
+            sys.stdout = stdout
+    wall = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"wall_seconds": round(wall, 4), "peak_rss_kb": peak_kb, "exit_code": exit_code, "file_ops": counts}))
+
+
+def measure_stage(stage, argv, root):
+    command = [sys.executable, os.path.abspath(__file__), "--child", stage, "--root", root, "--"] + argv
+    completed = subprocess.run(command, cwd=root, env=fixture_env(root), capture_output=True, text=True)
+    if completed.returncode != 0 or not completed.stdout.strip():
+        raise RuntimeError(f"{stage} benchmark child failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_benchmarks(scales, stages=None, keep=False):
+    results = {}
+    selected = [(stage, argv) for stage, argv in STAGES if stages is None or stage in stages]
+    for scale in scales:
+        root = tempfile.mkdtemp(prefix=f"crypdna-bench-{scale}-")
+        try:
+            started = time.perf_counter()
+            count = generate_fixture(root, parse_scale(scale))
+            print(f"[{scale}] generated {count} regions in {time.perf_counter() - started:.2f}s at {root}")
+            for stage, argv in selected:
+                result = measure_stage(stage, argv, root)
+                results[f"{scale}/{stage}"] = result
+                ops = result["file_ops"]
+                print(f"[{scale}] {stage:<27} {result['wall_seconds']:>9.3f}s {result['peak_rss_kb'] / 1024:>8.1f} MiB "
+                      f"{ops['reads']:>8} reads {ops['writes']:>8} writes {ops['dir_scans']:>6} scans"
+                      + (f"  (exit {result['exit_code']})" if result["exit_code"] else ""))
+        finally:
+            if not keep:
+                shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def compare_with_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Flags wall time or peak RSS more than `tolerance` above baseline, and any growth in file writes.
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        checks = [("wall_seconds", result["wall_seconds"], previous["wall_seconds"], tolerance),
+                  ("peak_rss_kb", result["peak_rss_kb"], previous["peak_rss_kb"], tolerance),
+                  ("writes", result["file_ops"]["writes"], previous["file_ops"]["writes"], 0.0)]
+        for metric, current, before, allowed in checks:
+            # Sub-50ms timings are mostly interpreter noise; do not flag them.
+            if metric == "wall_seconds" and max(current, before) < 0.05:
+                continue
+            if before and current > before * (1 + allowed):
+                regressions.append(f"{key} {metric}: {before} -> {current} (+{(current / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def load_baseline(path=None):
+    try:
+        with open(path or baseline_path, "r") as f:
+            return json.load(f).get("results", {})
+    except FileNotFoundError:
+        return {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every vault entry point on synthetic region catalogs.")
+    parser.add_argument("--scales", default=",".join(DEFAULT_SCALES), help="Comma-separated region counts, e.g. 10,1k,10k,100k.")
+    parser.add_argument("--stages", help="Comma-separated subset of entry points to time.")
+    parser.add_argument("--baseline", default=baseline_path, help="Baseline JSON to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown before flagging a regression.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated fixture directories.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    parser.add_argument("child_args", nargs="*", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_stage_in_child(args.child, args.child_args, args.root)
+        sys.exit(0)
+
+    stages = [stage.strip() for stage in args.stages.split(",")] if args.stages else None
+    results = run_benchmarks([scale.strip() for scale in args.scales.split(",") if scale.strip()], stages, args.keep)
+
+    regressions = compare_with_baseline(results, load_baseline(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline)
+        baseline.update(results)
+        atomic_write_json(args.baseline, {"python": sys.version.split()[0], "results": baseline})
+        print(f"Saved baseline for {len(results)} measurements to {args.baseline}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,280 @@
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+from array import array
+from itertools import islice
+
+from atomic_io import atomic_write_json
+from instrumentation import span, traced
+from json_codec import JSONDecodeError, dumps, load_file, loads
+
+commercial_log_path = os.environ.get("CRYPDNA_COMMERCIAL_LOG", "commercial_generation_logs.jsonl")
+
+INDEX_SUFFIX = ".idx"
+LEGACY_INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 2
+META_FILE = "meta.json"
+POSTINGS_SUFFIX = ".u64"
+REFRESH_BATCH = 65536
+# Entry fields the sidecar index is keyed by; "date" is the generation date taken from the timestamp.
+INDEX_KEYS = ("region", "theme", "date")
+
+
+def index_path_for(log_path):
+    return log_path + INDEX_SUFFIX
+
+
+def _index_values(entry):
+    return {"region": entry.get("region"), "theme": entry.get("theme"), "date": (entry.get("timestamp") or "")[:10]}
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class CommercialLogWriter:
+    # Appends one compact JSON line per commercial as it is generated; nothing is held in memory.
+    # The sidecar index is caught up once, on close, from the bytes this writer appended.
+    def __init__(self, path=None, buffer_size=1024 * 1024):
+        self.path = path or commercial_log_path
+        self.count = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab", buffering=buffer_size)
+        if self._file.tell() and not _ends_with_newline(self.path):
+            # Terminate a torn entry left by a crash so the next one starts on its own line.
+            self._file.write(b"\n")
+
+    def append(self, entry):
+        self._file.write(dumps(entry) + b"\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        refresh_index(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class LogIndex:
+    # Sidecar index directory: meta.json (how far the log is indexed) plus one append-only file of
+    # little-endian u64 byte offsets per indexed value, at <key>/<sha1 of value>.u64. A refresh only
+    # appends the offsets of new lines, so its cost and memory follow the new bytes, not the log size.
+    def __init__(self, log_path, indexed_bytes=0, entries=0):
+        self.log_path = log_path
+        self.directory = index_path_for(log_path)
+        self.indexed_bytes = indexed_bytes
+        self.entries = entries
+        # Offsets not yet on disk (e.g. a read-only checkout); merged into every lookup.
+        self._pending = {}
+
+    def postings_path(self, key, value):
+        return os.path.join(self.directory, key, hashlib.sha1(value.encode("utf-8")).hexdigest() + POSTINGS_SUFFIX)
+
+    def postings(self, key, value):
+        offsets = array("Q")
+        try:
+            with open(self.postings_path(key, value), "rb") as f:
+                offsets.frombytes(f.read())
+        except FileNotFoundError:
+            pass
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        offsets.extend(self._pending.get((key, value), ()))
+        # A crash between appending postings and writing meta.json leaves offsets that the next
+        # refresh appends again; keeping only increasing offsets below the cursor drops both.
+        kept = array("Q")
+        last = -1
+        for offset in offsets:
+            if last < offset < self.indexed_bytes:
+                kept.append(offset)
+                last = offset
+        return kept
+
+    def _append(self, postings):
+        if not self._pending:
+            try:
+                for (key, value), offsets in postings.items():
+                    os.makedirs(os.path.join(self.directory, key), exist_ok=True)
+                    data = array("Q", offsets)
+                    if sys.byteorder == "big":
+                        data.byteswap()
+                    with open(self.postings_path(key, value), "ab") as f:
+                        f.write(data.tobytes())
+                return
+            except OSError:
+                pass  # read-only checkout: keep serving the caught-up index from memory
+        for posting, offsets in postings.items():
+            self._pending.setdefault(posting, []).extend(offsets)
+
+    def _write_meta(self):
+        if self._pending:
+            return
+        try:
+            atomic_write_json(os.path.join(self.directory, META_FILE),
+                              {"version": INDEX_VERSION, "indexed_bytes": self.indexed_bytes, "entries": self.entries}, indent=None)
+        except OSError:
+            pass
+
+
+def load_index(log_path=None):
+    log_path = log_path or commercial_log_path
+    try:
+        meta = load_file(os.path.join(index_path_for(log_path), META_FILE))
+    except (FileNotFoundError, NotADirectoryError, JSONDecodeError):
+        return None
+    if not isinstance(meta, dict) or meta.get("version") != INDEX_VERSION:
+        return None
+    return LogIndex(log_path, meta["indexed_bytes"], meta["entries"])
+
+
+def _reset_index(log_path):
+    for path in (index_path_for(log_path), log_path + LEGACY_INDEX_SUFFIX):
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.exists(path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    return LogIndex(log_path)
+
+
+@traced("commercial_log.refresh_index")
+def refresh_index(log_path=None):
+    # Scans only the bytes appended since the index was last written; a log that shrank
+    # (rotated or replaced) is re-indexed from the start.
+    log_path = log_path or commercial_log_path
+    try:
+        size = os.path.getsize(log_path)
+    except FileNotFoundError:
+        return None
+    index = load_index(log_path)
+    if index is None or index.indexed_bytes > size:
+        index = _reset_index(log_path)
+    if index.indexed_bytes == size:
+        return index
+
+    offset = index.indexed_bytes
+    postings = {}
+    pending = 0
+    with open(log_path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # entry still being written; pick it up next time
+            try:
+                entry = loads(line)
+            except ValueError:
+                entry = None  # torn line from a crash; skip it
+            if isinstance(entry, dict):
+                for key, value in _index_values(entry).items():
+                    if isinstance(value, str):
+                        postings.setdefault((key, value), []).append(offset)
+                index.entries += 1
+                pending += 1
+            offset += len(line)
+            if pending >= REFRESH_BATCH:
+                # Bounded memory on a cold build: postings go to disk batch by batch.
+                index._append(postings)
+                postings = {}
+                pending = 0
+    index._append(postings)
+    index.indexed_bytes = offset
+    index._write_meta()
+    return index
+
+
+def matching_offsets(index, region=None, theme=None, date=None):
+    # Sorted byte offsets of the entries matching every given key.
+    wanted = [(key, value) for key, value in zip(INDEX_KEYS, (region, theme, date)) if value is not None]
+    postings = sorted((index.postings(key, value) for key, value in wanted), key=len)
+    if not postings:
+        return None
+    if len(postings) == 1:
+        return postings[0]
+    common = set(postings[0])
+    for other in postings[1:]:
+        common.intersection_update(other)
+    return sorted(common)
+
+
+def _scan_entries(log_path):
+    with open(log_path, "rb") as f:
+        for line in f:
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                yield entry
+
+
+def iter_entries(log_path=None, region=None, theme=None, date=None, start=0, limit=None):
+    # Unfiltered reads stream the log; filtered reads seek to the indexed offsets, so a page
+    # costs one seek per row shown regardless of how large the log has grown.
+    log_path = log_path or commercial_log_path
+    if not os.path.exists(log_path):
+        return
+    stop = None if limit is None else start + limit
+    if region is None and theme is None and date is None:
+        yield from islice(_scan_entries(log_path), start, stop)
+        return
+
+    with span("commercial_log.lookup", region=region, theme=theme, date=date):
+        offsets = matching_offsets(refresh_index(log_path), region, theme, date)[start:stop]
+    with open(log_path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            yield loads(f.readline())
+
+
+def count_entries(log_path=None, region=None, theme=None, date=None):
+    index = refresh_index(log_path)
+    if index is None:
+        return 0
+    if region is None and theme is None and date is None:
+        return index.entries
+    return len(matching_offsets(index, region, theme, date))
+
+
+def import_json_array(json_path, log_path=None):
+    # One-off conversion of a legacy commercial_generation_logs.json array.
+    entries = load_file(json_path)
+    with CommercialLogWriter(log_path) as writer:
+        for entry in entries:
+            writer.append(entry)
+    return writer.count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the append-only commercial generation log.")
+    parser.add_argument("--region")
+    parser.add_argument("--theme")
+    parser.add_argument("--date", help="Generation date (YYYY-MM-DD).")
+    parser.add_argument("--start", type=int, default=0, help="Skip this many matching entries.")
+    parser.add_argument("--limit", type=int, help="Print at most this many entries.")
+    parser.add_argument("--count", action="store_true", help="Only print the number of matching entries.")
+    parser.add_argument("--import-json", metavar="PATH", help="Append the entries of a legacy JSON array log.")
+    args = parser.parse_args()
+    region = args.region.upper() if args.region else None
+
+    if args.import_json:
+        print(f"Imported {import_json_array(args.import_json)} entries into {commercial_log_path}")
+    elif args.count:
+        print(count_entries(region=region, theme=args.theme, date=args.date))
+    else:
+        for entry in iter_entries(region=region, theme=args.theme, date=args.date, start=args.start, limit=args.limit):
+            print(dumps(entry).decode("utf-8"))
@@ -1,70 +1,150 @@
-import json
+import argparse
+import hashlib
 import os
 
-regions_data_path = "/home/ubuntu/regions_data.json"
+from atomic_io import atomic_write_bytes, atomic_write_json
+from instrumentation import count, span, traced
+from json_codec import JSONDecodeError, dumps, load_file
+from region_catalog import load_regions
+from vault_index import list_dir, seed
 
-def create_credit_adapters():
-    print("Creating USA D&B tradeline and global placeholder adapter files...")
+credit_adapters_dir = "credit_adapters"
+adapter_manifest_path = os.path.join(credit_adapters_dir, ".adapter_manifest.json")
+
+US_TRADELINE_ADAPTER = {
+    "adapter_name": "Dun & Bradstreet (D&B)",
+    "region": "US",
+    "status": "live",
+    "schema_version": "1.0",
+    "endpoint": "https://api.dnb.com/v1/tradeline",
+    "api_key_env_var": "DNB_API_KEY",
+    "mapping": {
+        "vault_id": "duns_number",
+        "cardholder_name": "legal_business_name",
+        "dna_score": "paydex_score",
+        "available_balance": "credit_limit",
+        "pending_balance": "outstanding_balance",
+        "tradeline_items": [
+            {"vault_field": "tradeline_item_id", "dnb_field": "tradeline_id"},
+            {"vault_field": "tradeline_type", "dnb_field": "type"},
+            {"vault_field": "tradeline_amount", "dnb_field": "amount"},
+            {"vault_field": "tradeline_status", "dnb_field": "status"}
+        ]
+    },
+    "compliance_note": "Fully compliant with US financial regulations (e.g., FCRA)."
+}
 
-    try:
-        with open(regions_data_path, "r") as f:
-            regions_data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: {regions_data_path} not found. Cannot create credit adapters.")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {regions_data_path}. Check file format.")
-        return
 
-    # 1. Create USA D&B tradeline
-    us_tradeline_data = {
-        "adapter_name": "Dun & Bradstreet (D&B)",
-        "region": "US",
-        "status": "live",
+def placeholder_adapter(region_code):
+    return {
+        "adapter_name": f"Credit Bureau ({region_code.upper()})",
+        "region": region_code.upper(),
+        "status": "locked",
         "schema_version": "1.0",
-        "endpoint": "https://api.dnb.com/v1/tradeline",
-        "api_key_env_var": "DNB_API_KEY",
-        "mapping": {
-            "vault_id": "duns_number",
-            "cardholder_name": "legal_business_name",
-            "dna_score": "paydex_score",
-            "available_balance": "credit_limit",
-            "pending_balance": "outstanding_balance",
-            "tradeline_items": [
-                {"vault_field": "tradeline_item_id", "dnb_field": "tradeline_id"},
-                {"vault_field": "tradeline_type", "dnb_field": "type"},
-                {"vault_field": "tradeline_amount", "dnb_field": "amount"},
-                {"vault_field": "tradeline_status", "dnb_field": "status"}
-            ]
-        },
-        "compliance_note": "Fully compliant with US financial regulations (e.g., FCRA)."
+        "endpoint": "",
+        "api_key_env_var": "",
+        "mapping": {},
+        "compliance_note": "Local regulations require specific approval before activation."
     }
-    with open("credit_adapters/us_adapter.json", "w") as f:
-        json.dump(us_tradeline_data, f, indent=2)
-    print("Created credit_adapters/us_adapter.json (D&B Live).")
 
-    # 2. Generate placeholder adapter files for all other regions
+
+def build_adapter_payloads(regions_data):
+    # 1. USA D&B tradeline, 2. placeholder adapters for all other regions
+    payloads = {"us_adapter.json": US_TRADELINE_ADAPTER}
     for region_code in regions_data.keys():
         if region_code.lower() == "us": # Skip US as it's already live
             continue
+        payloads[f"{region_code.lower()}_adapter.json"] = placeholder_adapter(region_code)
+    return payloads
 
-        adapter_data = {
-            "adapter_name": f"Credit Bureau ({region_code.upper()})",
-            "region": region_code.upper(),
-            "status": "locked",
-            "schema_version": "1.0",
-            "endpoint": "",
-            "api_key_env_var": "",
-            "mapping": {},
-            "compliance_note": "Local regulations require specific approval before activation."
-        }
-        adapter_file_path = os.path.join("credit_adapters", f"{region_code.lower()}_adapter.json")
-        with open(adapter_file_path, "w") as f:
-            json.dump(adapter_data, f, indent=2)
-        print(f"Created {adapter_file_path}")
-
-    print("Global placeholder adapter files created.")
 
-if __name__ == "__main__":
-    create_credit_adapters()
+def serialize_adapter(adapter_data):
+    # Adapters are hand-edited, so they keep the pretty layout.
+    return dumps(adapter_data, pretty=True)
+
+
+def load_adapter_manifest():
+    try:
+        manifest = load_file(adapter_manifest_path)
+    except (FileNotFoundError, JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _manifest_entry(path, digest):
+    stat = os.stat(path)
+    return {"sha256": digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _file_matches(path, content, digest, manifest_entry):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if stat.st_size != len(content):
+        return False
+    # Trusted only while the file still has the exact stat key we recorded; any touch or
+    # same-size hand edit falls through to comparing the bytes on disk.
+    if (isinstance(manifest_entry, dict) and manifest_entry.get("sha256") == digest
+            and manifest_entry.get("mtime_ns") == stat.st_mtime_ns and manifest_entry.get("size") == stat.st_size):
+        return True
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() == digest
+
+
+@traced("create_credit_adapters")
+def create_credit_adapters(incremental=True):
+    print("Creating USA D&B tradeline and global placeholder adapter files...")
+
+    regions_data = load_regions()
+    if regions_data is None:
+        print("Cannot create credit adapters without the region catalog.")
+        return
+
+    os.makedirs(credit_adapters_dir, exist_ok=True)
+    manifest = load_adapter_manifest() if incremental else {}
+    new_manifest = {}
+    counts = {"created": 0, "updated": 0, "unchanged": 0}
+    # The same cached listing the registry and credit report use, instead of a stat per adapter.
+    existing = set(list_dir(credit_adapters_dir, suffix="_adapter.json"))
 
+    for filename, adapter_data in build_adapter_payloads(regions_data).items():
+        with span("create_credit_adapters.adapter", file=filename):
+            adapter_file_path = os.path.join(credit_adapters_dir, filename)
+            content = serialize_adapter(adapter_data)
+            digest = hashlib.sha256(content).hexdigest()
+
+            existed = filename in existing
+            # Either way the file now holds exactly adapter_data, so later steps in the same process
+            # (registry, credit report) get the document from the vault index without parsing it.
+            if incremental and existed and _file_matches(adapter_file_path, content, digest, manifest.get(filename)):
+                new_manifest[filename] = _manifest_entry(adapter_file_path, digest)
+                seed(adapter_file_path, adapter_data)
+                counts["unchanged"] += 1
+                continue
+
+            atomic_write_bytes(adapter_file_path, content)
+            new_manifest[filename] = _manifest_entry(adapter_file_path, digest)
+            seed(adapter_file_path, adapter_data)
+            if existed:
+                counts["updated"] += 1
+                print(f"Updated {adapter_file_path}")
+            else:
+                counts["created"] += 1
+                print(f"Created {adapter_file_path}")
+
+    if new_manifest != manifest:
+        atomic_write_json(adapter_manifest_path, new_manifest, indent=None, sort_keys=True)
+
+    for result, total in counts.items():
+        count(f"create_credit_adapters.{result}", total)
+    print(f"Credit adapters: {counts['created']} created, {counts['updated']} updated, {counts['unchanged']} unchanged.")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate regional credit adapter files.")
+    parser.add_argument("--full", action="store_true", help="Rewrite every adapter file, ignoring the manifest.")
+    args = parser.parse_args()
+    if create_credit_adapters(incremental=not args.full) is None:
+        raise SystemExit(1)
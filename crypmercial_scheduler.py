@@ -0,0 +1,365 @@
+import argparse
+import contextlib
+import datetime
+import heapq
+import itertools
+import os
+import time
+
+import vault_index
+from asset_store import REF_SUFFIX, read_json
+from atomic_io import atomic_write_json
+from commercial_log import commercial_log_path
+from data_channel import FileSink, HttpSink, LocalHttpStandIn
+from instrumentation import count, span, traced
+from json_codec import JSONDecodeError, dumps, load_file, loads
+
+vaults_dir = "vaults"
+schedule_state_path = os.environ.get("CRYPDNA_SCHEDULE_STATE", ".crypmercial_schedule.json")
+outbox_dir = os.environ.get("CRYPDNA_PUBLISH_OUTBOX", "published_crypmercials")
+
+STATE_VERSION = 1
+CRYPMERCIAL_SUFFIX = "_crypmercial.json"
+# channel -> (posts per minute, burst). Each crypmercial is posted once to every channel.
+DEFAULT_CHANNELS = {
+    "instagram": (30, 10),
+    "tiktok": (20, 5),
+    "x": (60, 20)
+}
+DEFAULT_MAX_BATCH = 500
+RETRY_DELAY = 60
+# Posts found more than this far past their slot are dropped as missed rather than published late.
+MISSED_AFTER = 2 * 24 * 3600
+# Published keys are remembered this long so a replayed log or rescan cannot double-post.
+PUBLISHED_RETENTION = 30 * 24 * 3600
+
+
+def post_time(scheduled_post_date):
+    # Posts go out at 00:00 UTC on their scheduled date.
+    day = datetime.date.fromisoformat(scheduled_post_date)
+    return int(datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc).timestamp())
+
+
+class ChannelLimit:
+    # Token bucket on the scheduler's clock, so simulated time (--now) is rate limited the same way.
+    __slots__ = ("per_minute", "burst", "tokens", "updated")
+
+    def __init__(self, per_minute, burst):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = None
+
+    def take(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def next_available(self, now):
+        return now + (1 - self.tokens) * 60.0 / self.per_minute
+
+
+def file_sink_factory(directory=None):
+    # Local stand-in for the social channels: one append-only batch file per channel.
+    return lambda channel: FileSink(channel, directory or outbox_dir)
+
+
+class CrypmercialScheduler:
+    def __init__(self, sink_factory=None, channels=None, state_path=None, log_path=None, max_batch=DEFAULT_MAX_BATCH):
+        self.sink_factory = sink_factory or file_sink_factory()
+        self.channels = channels or DEFAULT_CHANNELS
+        self.state_path = state_path or schedule_state_path
+        self.log_path = log_path or commercial_log_path
+        self.max_batch = max_batch
+        self.limits = {channel: ChannelLimit(*limit) for channel, limit in self.channels.items()}
+        self._sinks = {}
+        self._sequence = itertools.count()
+        self.heap = []
+        # (path, channel) -> the one live post for it. Heap entries whose post is no longer the live
+        # one (superseded by a reschedule) are skipped when popped.
+        self.pending = {}
+        self.published = {}
+        # Keys of posts dropped as missed, kept like published ones so a rescan does not requeue them.
+        self.missed = {}
+        self.log_offset = 0
+        self.bootstrapped = False
+        self._load_state()
+
+    def _load_state(self):
+        try:
+            state = load_file(self.state_path)
+        except (FileNotFoundError, JSONDecodeError):
+            return
+        if state.get("version") != STATE_VERSION:
+            return
+        for due, post in state["pending"]:
+            # States written before posts were keyed by (path, channel) may hold several dates for
+            # one file; the latest date wins.
+            current = self.pending.get((post["path"], post["channel"]))
+            if current is None or post_time(post["scheduled_post"]) > post_time(current["scheduled_post"]):
+                self.pending[(post["path"], post["channel"])] = post
+            self.heap.append((due, next(self._sequence), post))
+        self.heap = [entry for entry in self.heap if self._is_live(entry[2])]
+        heapq.heapify(self.heap)
+        self.published = state["published"]
+        self.missed = state.get("missed", {})
+        self.log_offset = state["log_offset"]
+        self.bootstrapped = state["bootstrapped"]
+
+    def save_state(self, now):
+        cutoff = now - PUBLISHED_RETENTION
+        self.published = {key: posted for key, posted in self.published.items() if posted >= cutoff}
+        self.missed = {key: dropped for key, dropped in self.missed.items() if dropped >= cutoff}
+        atomic_write_json(self.state_path, {
+            "version": STATE_VERSION,
+            "bootstrapped": self.bootstrapped,
+            "log_offset": self.log_offset,
+            "published": self.published,
+            "missed": self.missed,
+            "pending": [[due, post] for due, _, post in sorted(self.heap, key=lambda item: item[:2]) if self._is_live(post)]
+        }, indent=None)
+
+    def _is_live(self, post):
+        return self.pending.get((post["path"], post["channel"])) is post
+
+    def enqueue(self, path, region, theme, scheduled_post_date):
+        # Entries come from hand-editable files, so anything malformed is skipped rather than trusted.
+        if not path or not isinstance(path, str):
+            return 0
+        try:
+            due = post_time(scheduled_post_date)
+        except (TypeError, ValueError):
+            return 0
+        key = f"{path}|{scheduled_post_date}"
+        added = 0
+        for channel in self.channels:
+            if f"{key}|{channel}" in self.published or f"{key}|{channel}" in self.missed:
+                continue
+            current = self.pending.get((path, channel))
+            # A file is posted once per channel for its newest date: re-stamping it replaces the
+            # queued post (the old heap entry goes stale), while an older date is ignored.
+            if current is not None and post_time(current["scheduled_post"]) >= due:
+                continue
+            post = {"key": key, "channel": channel, "path": path, "region": region, "theme": theme,
+                    "scheduled_post": scheduled_post_date}
+            self.pending[(path, channel)] = post
+            heapq.heappush(self.heap, (due, next(self._sequence), post))
+            added += 1
+        return added
+
+    @traced("crypmercial_scheduler.bootstrap")
+    def bootstrap_from_vaults(self):
+        # One full walk of vaults/*/assets/crypmercials; afterwards only the commercial log is followed.
+        added = 0
+        if os.path.isdir(vaults_dir):
+            with os.scandir(vaults_dir) as vaults:
+                for vault in vaults:
+                    crypmercial_dir = os.path.join(vault.path, "assets", "crypmercials")
+                    if not vault.is_dir() or not os.path.isdir(crypmercial_dir):
+                        continue
+                    with os.scandir(crypmercial_dir) as entries:
+                        names = {entry.name[:-len(REF_SUFFIX)] if entry.name.endswith(REF_SUFFIX) else entry.name
+                                 for entry in entries}
+                    for name in sorted(names):
+                        if not name.endswith(CRYPMERCIAL_SUFFIX):
+                            continue
+                        path = os.path.join(crypmercial_dir, name)
+                        try:
+                            content = read_json(path)
+                        except (OSError, ValueError, KeyError):
+                            content = None
+                        if not isinstance(content, dict):
+                            print(f"Warning: Skipping unreadable crypmercial {path}")
+                            continue
+                        added += self.enqueue(path, content.get("region"), content.get("theme"), content.get("scheduled_post_date"))
+        # The vault tree already reflects everything logged so far; older log entries carry superseded dates.
+        self.log_offset = os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+        self.bootstrapped = True
+        return added
+
+    @traced("crypmercial_scheduler.follow_log")
+    def follow_log(self):
+        # Reads only what was appended to the commercial log since the persisted cursor.
+        try:
+            size = os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+        if size < self.log_offset:
+            self.log_offset = 0  # log was replaced; enqueue() skips anything already known
+        added = 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self.log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.log_offset += len(line)
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                added += self.enqueue(entry.get("output_file"), entry.get("region"), entry.get("theme"), entry.get("scheduled_post"))
+        return added
+
+    def sync(self, rescan=False):
+        added = self.bootstrap_from_vaults() if rescan or not self.bootstrapped else 0
+        return added + self.follow_log()
+
+    def _sink(self, channel):
+        sink = self._sinks.get(channel)
+        if sink is None:
+            sink = self._sinks[channel] = self.sink_factory(channel)
+        return sink
+
+    @traced("crypmercial_scheduler.dispatch")
+    def dispatch_due(self, now):
+        # Pops everything due (up to max_batch), holds back posts over their channel's rate limit
+        # until a token frees up, and ships one batch per channel.
+        batches = {}
+        taken = 0
+        missed = 0
+        while self.heap and self.heap[0][0] <= now and taken < self.max_batch:
+            due, _, post = heapq.heappop(self.heap)
+            if not self._is_live(post):
+                continue
+            if now - post_time(post["scheduled_post"]) > MISSED_AFTER:
+                del self.pending[(post["path"], post["channel"])]
+                self.missed[f"{post['key']}|{post['channel']}"] = int(now)
+                missed += 1
+                continue
+            limit = self.limits[post["channel"]]
+            if not limit.take(now):
+                heapq.heappush(self.heap, (max(due, limit.next_available(now)), next(self._sequence), post))
+                continue
+            batches.setdefault(post["channel"], []).append(post)
+            taken += 1
+
+        published = 0
+        for channel, posts in batches.items():
+            payload = b"".join(dumps(dict(post, published_at=int(now))) + b"\n" for post in posts)
+            try:
+                with span("crypmercial_scheduler.publish", channel=channel, posts=len(posts)):
+                    self._sink(channel).send_batch(payload, len(posts), None)
+            except (OSError, IOError) as e:
+                print(f"Warning: Publishing {len(posts)} posts to {channel} failed ({e}); retrying in {RETRY_DELAY}s.")
+                for post in posts:
+                    heapq.heappush(self.heap, (now + RETRY_DELAY, next(self._sequence), post))
+                count("crypmercial_scheduler.failed", len(posts))
+                continue
+            for post in posts:
+                if self._is_live(post):
+                    del self.pending[(post["path"], channel)]
+                self.published[f"{post['key']}|{channel}"] = int(now)
+            published += len(posts)
+        count("crypmercial_scheduler.published", published)
+        if missed:
+            count("crypmercial_scheduler.missed", missed)
+            print(f"Skipped {missed} posts more than {MISSED_AFTER // 3600}h past their scheduled slot.")
+        return published
+
+    def run_until_idle(self, now):
+        # Keeps dispatching at `now` until nothing further is due or every due post is rate limited.
+        total = 0
+        while True:
+            published = self.dispatch_due(now)
+            total += published
+            if not published:
+                return total
+
+    def catch_up(self, now):
+        # Replays dispatch at each due time up to `now` (used with a simulated clock), so
+        # rate-limited posts drip out at the times the limits would have allowed.
+        total = 0
+        while self.heap and self.heap[0][0] <= now:
+            total += self.dispatch_due(self.heap[0][0])
+        return total
+
+    def next_due(self):
+        while self.heap and not self._is_live(self.heap[0][2]):
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pending_by_channel(self):
+        pending = {channel: 0 for channel in self.channels}
+        for _, channel in self.pending:
+            pending[channel] = pending.get(channel, 0) + 1
+        return pending
+
+    def close(self):
+        for sink in self._sinks.values():
+            sink.close()
+        self._sinks = {}
+
+
+def schedule_summary(state_path=None):
+    # Read-only view of the persisted queue for reports; None when the scheduler has never run.
+    try:
+        state = vault_index.read_json(state_path or schedule_state_path)
+    except (FileNotFoundError, JSONDecodeError):
+        return None
+    if state.get("version") != STATE_VERSION:
+        return None
+    pending = {}
+    for _, post in state["pending"]:
+        pending[post["channel"]] = pending.get(post["channel"], 0) + 1
+    next_due = min((due for due, _ in state["pending"]), default=None)
+    return {"pending": pending, "published": len(state["published"]), "next_due": next_due}
+
+
+def _timestamp(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish scheduled Crypmercials to social channels when they fall due.")
+    parser.add_argument("--now", help="Treat this ISO date/time (UTC) as the current time, e.g. to publish next week's posts.")
+    parser.add_argument("--loop", action="store_true", help="Keep running, dispatching every --interval seconds.")
+    parser.add_argument("--interval", type=float, default=30.0)
+    parser.add_argument("--rescan", action="store_true", help="Walk every vault's crypmercials again instead of only the commercial log.")
+    parser.add_argument("--sink", choices=("file", "local-http"), default="file",
+                        help="file: per-channel batch files in the outbox; local-http: POST batches to a local stand-in server.")
+    parser.add_argument("--list", action="store_true", help="Only show the pending queue.")
+    args = parser.parse_args()
+
+    def clock():
+        if args.now:
+            moment = datetime.datetime.fromisoformat(args.now)
+            return moment.replace(tzinfo=moment.tzinfo or datetime.timezone.utc).timestamp()
+        return time.time()
+
+    with contextlib.ExitStack() as stack:
+        stand_in = stack.enter_context(LocalHttpStandIn()) if args.sink == "local-http" else None
+        if stand_in is not None:
+            sink_factory = lambda channel: HttpSink(stand_in.host, stand_in.port, f"/publish/{channel}")
+        else:
+            sink_factory = file_sink_factory()
+        scheduler = CrypmercialScheduler(sink_factory=sink_factory)
+        stack.callback(scheduler.close)
+        try:
+            while True:
+                now = clock()
+                added = scheduler.sync(rescan=args.rescan)
+                args.rescan = False
+                if args.list:
+                    published = 0
+                elif args.now:
+                    published = scheduler.catch_up(now)
+                else:
+                    published = scheduler.run_until_idle(now)
+                scheduler.save_state(now)
+                next_due = scheduler.next_due()
+                pending = ", ".join(f"{channel} {n}" for channel, n in scheduler.pending_by_channel().items())
+                print(f"[{_timestamp(now)}] queued {added} new, published {published}; pending: {pending}; "
+                      f"next due {_timestamp(next_due) if next_due else 'n/a'}.")
+                if not args.loop or args.list:
+                    break
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+        if stand_in is not None:
+            print(f"Local publishing stand-in received: {stand_in.received}")
@@ -0,0 +1,310 @@
+import gzip
+import http.client
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from json_codec import dumps
+
+data_channels_dir = os.environ.get("CRYPDNA_DATA_CHANNELS", "data_channels")
+
+DEFAULT_MAX_BATCH_RECORDS = 1000
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024
+DEFAULT_MAX_BATCH_DELAY = 0.25
+# Full batches waiting for the flusher; beyond this, send() blocks until one has shipped.
+MAX_PENDING_BATCHES = 4
+LATENCY_SAMPLES = 4096
+
+COMPRESSORS = {
+    "gzip": lambda data: gzip.compress(data, compresslevel=6),
+    "zlib": lambda data: zlib.compress(data, 6),
+    None: lambda data: data
+}
+
+
+class FileSink:
+    # Local stand-in for the Supabase analytics sink: length-prefixed compressed batches in one file.
+    def __init__(self, name, directory=None):
+        directory = directory or data_channels_dir
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.batches")
+        self._file = open(self.path, "ab")
+
+    def send_batch(self, payload, record_count, encoding):
+        header = json.dumps({"records": record_count, "encoding": encoding}).encode("utf-8")
+        self._file.write(struct.pack(">II", len(header), len(payload)) + header + payload)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class HttpSink:
+    # Keeps a small pool of keep-alive connections to one destination host.
+    def __init__(self, host, port, path="/ingest", pool_size=2, timeout=10.0):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+    def send_batch(self, payload, record_count, encoding):
+        headers = {"Content-Type": "application/x-ndjson", "X-Record-Count": str(record_count)}
+        if encoding:
+            headers["Content-Encoding"] = "deflate" if encoding == "zlib" else encoding
+        connection = self._pool.get()
+        try:
+            for attempt in range(2):
+                if connection is None:
+                    connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+                try:
+                    connection.request("POST", self.path, body=payload, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    break
+                except (http.client.HTTPException, OSError) as e:
+                    # A failed or timed-out connection is never pooled again. Only a stale keep-alive
+                    # is retried: after a timeout the server may already have the batch.
+                    connection.close()
+                    connection = None
+                    if attempt or isinstance(e, socket.timeout):
+                        raise
+        except BaseException:
+            if connection is not None:
+                connection.close()
+                connection = None
+            raise
+        finally:
+            self._pool.put(connection)
+        if response.status >= 400:
+            raise IOError(f"{self.host}:{self.port}{self.path} returned {response.status}")
+
+    def close(self):
+        while not self._pool.empty():
+            connection = self._pool.get_nowait()
+            if connection is not None:
+                connection.close()
+
+
+class ChannelStats:
+    __slots__ = ("records", "batches", "raw_bytes", "sent_bytes", "errors", "send_seconds", "latencies", "opened_at")
+
+    def __init__(self):
+        self.records = 0
+        self.batches = 0
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.errors = 0
+        self.send_seconds = 0.0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+        elapsed = max(time.monotonic() - self.opened_at, 1e-9)
+
+        def percentile(fraction):
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3) if latencies else 0.0
+
+        return {
+            "records": self.records,
+            "batches": self.batches,
+            "raw_bytes": self.raw_bytes,
+            "sent_bytes": self.sent_bytes,
+            "compression_ratio": round(self.raw_bytes / self.sent_bytes, 2) if self.sent_bytes else 0.0,
+            "errors": self.errors,
+            "records_per_second": round(self.records / elapsed, 1),
+            "record_latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95)},
+            "mean_batch_send_ms": round(self.send_seconds / self.batches * 1000, 3) if self.batches else 0.0
+        }
+
+
+_STOP = object()
+
+
+class DataChannel:
+    # Persistent source -> destination channel. Small records are coalesced into batches bounded
+    # by record count, byte size and delay, compressed, and shipped over the sink's long-lived connection.
+    # Only the flusher thread ships, and it ships batches in the order they were cut from the buffer.
+    def __init__(self, name, sink, max_batch_records=DEFAULT_MAX_BATCH_RECORDS, max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+                 max_batch_delay=DEFAULT_MAX_BATCH_DELAY, compression="gzip"):
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unsupported compression {compression!r}")
+        self.name = name
+        self.sink = sink
+        self.max_batch_records = max_batch_records
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_delay = max_batch_delay
+        self.compression = compression
+        self.stats = ChannelStats()
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._ready = queue.Queue(maxsize=MAX_PENDING_BATCHES)
+        # Batches are numbered under the buffer lock but queued outside it, so two senders can queue
+        # theirs out of order; the flusher holds early arrivals until the batches before them ship.
+        self._sequence = 0
+        self._next_sequence = 0
+        self._held = {}
+        self._flusher = threading.Thread(target=self._flush_loop, name=f"channel-{name}", daemon=True)
+        self._flusher.start()
+
+    def send(self, record):
+        line = dumps(record) + b"\n"
+        with self._lock:
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._buffer.append((time.monotonic(), line))
+            self._buffer_bytes += len(line)
+            full = len(self._buffer) >= self.max_batch_records or self._buffer_bytes >= self.max_batch_bytes
+            item = self._take_batch_locked() if full else None
+        if item:
+            # Blocks while MAX_PENDING_BATCHES are queued, without the buffer lock the flusher also takes.
+            self._ready.put(item)
+
+    def _take_batch_locked(self):
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._oldest = None
+        self._sequence += 1
+        return self._sequence - 1, batch
+
+    def _ship(self, batch):
+        raw = b"".join(line for _, line in batch)
+        payload = COMPRESSORS[self.compression](raw)
+        started = time.monotonic()
+        try:
+            self.sink.send_batch(payload, len(batch), self.compression)
+        except Exception as e:
+            self.stats.errors += 1
+            print(f"Error: Channel {self.name} failed to deliver {len(batch)} records: {e}")
+            return
+        finished = time.monotonic()
+        self.stats.send_seconds += finished - started
+        self.stats.batches += 1
+        self.stats.records += len(batch)
+        self.stats.raw_bytes += len(raw)
+        self.stats.sent_bytes += len(payload)
+        for enqueued_at, _ in batch:
+            self.stats.latencies.append(finished - enqueued_at)
+
+    def _deliver(self, sequence, batch, queued):
+        # Flusher thread only. A queued batch counts as done for flush() once it has shipped.
+        self._held[sequence] = (batch, queued)
+        while self._next_sequence in self._held:
+            batch, queued = self._held.pop(self._next_sequence)
+            self._next_sequence += 1
+            try:
+                self._ship(batch)
+            finally:
+                if queued:
+                    self._ready.task_done()
+
+    def _flush_loop(self):
+        while True:
+            try:
+                item = self._ready.get(timeout=self.max_batch_delay / 2)
+            except queue.Empty:
+                with self._lock:
+                    due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_batch_delay
+                    item = self._take_batch_locked() if due else None
+                if item:
+                    self._deliver(*item, queued=False)
+                continue
+            if item is _STOP:
+                self._ready.task_done()
+                return
+            self._deliver(*item, queued=True)
+
+    def flush(self):
+        # Queues whatever is buffered and waits until the flusher has shipped everything before it.
+        with self._lock:
+            item = self._take_batch_locked() if self._buffer else None
+        if item:
+            self._ready.put(item)
+        self._ready.join()
+
+    def close(self):
+        self.flush()
+        self._ready.put(_STOP)
+        self._flusher.join()
+        self.sink.close()
+
+
+class ChannelPool:
+    # One long-lived channel per (source, destination); sinks are created lazily by the factory.
+    def __init__(self, sink_factory, **channel_options):
+        self.sink_factory = sink_factory
+        self.channel_options = channel_options
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def channel(self, source, destination):
+        key = (source, destination)
+        with self._lock:
+            if key not in self._channels:
+                name = f"{source}->{destination}"
+                self._channels[key] = DataChannel(name, self.sink_factory(source, destination), **self.channel_options)
+            return self._channels[key]
+
+    def stats(self):
+        return {channel.name: channel.stats.snapshot() for channel in self._channels.values()}
+
+    def close(self):
+        # Channels stay registered after closing so their final stats can still be read.
+        for channel in self._channels.values():
+            channel.close()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        with server.lock:
+            server.batches += 1
+            server.records += int(self.headers.get("X-Record-Count", 0))
+            server.bytes_received += len(body)
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalHttpStandIn:
+    # Local stand-in for the deploy server / analytics endpoint used by HttpSink.
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._server.lock = threading.Lock()
+        self._server.batches = 0
+        self._server.records = 0
+        self._server.bytes_received = 0
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+    @property
+    def received(self):
+        return {"batches": self._server.batches, "records": self._server.records, "bytes": self._server.bytes_received}
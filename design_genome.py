@@ -0,0 +1,182 @@
+import argparse
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from instrumentation import count, span, traced
+from json_codec import JSONDecodeError, dumps, loads
+from vault_index import list_dir
+
+vaults_dir = "vaults"
+genome_path = os.path.join("core", "design_genome", "design_genome.json")
+
+THEME_CACHE_SIZE = 256
+# Same defaults as src/lib/regionConfig.ts, so Python and the frontend agree on every vault.
+DEFAULT_ACCENT_REGION = "us"
+DEFAULT_ACCENT_COLOR = "#C7E2FF"
+DEFAULT_AESTHETIC = {"palette": "Core CrypDNA", "texture": "Carbon glass", "typography": None}
+
+# path -> (mtime_ns, size, sha256, parsed document); a touched but unedited file keeps its digest.
+_documents = {}
+_documents_lock = threading.Lock()
+
+
+def _load_document(path):
+    # Returns (sha256, document), re-reading only when the stat key moved and re-parsing only
+    # when the content hash changed. A missing or unreadable file resolves to ("", {}).
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return "", {}
+    with _documents_lock:
+        cached = _documents.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2], cached[3]
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    if cached and cached[2] == digest:
+        document = cached[3]
+    else:
+        try:
+            document = loads(raw)
+        except JSONDecodeError:
+            print(f"Warning: Could not decode JSON from {path}")
+            document = {}
+        if not isinstance(document, dict):
+            document = {}
+    with _documents_lock:
+        _documents[path] = (stat.st_mtime_ns, stat.st_size, digest, document)
+    return digest, document
+
+
+def vault_config_path(region):
+    return os.path.join(vaults_dir, region.lower(), "config.json")
+
+
+def genome_path_for(config, config_path):
+    # design_genome_ref is relative to the config's directory; vaults without one use the shared genome.
+    ref = config.get("design_genome_ref")
+    if not ref:
+        return os.path.normpath(genome_path)
+    return os.path.normpath(os.path.join(os.path.dirname(config_path), ref))
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    # Plain dicts and lists again, e.g. for JSON output.
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def merge_theme(region, genome, config):
+    region = region.lower()
+    theme = copy.deepcopy(genome)
+    palette = theme.setdefault("palette", {})
+    tones = palette.pop("adaptiveTones", None) or {}
+    overrides = (genome.get("inheritance") or {}).get("localizedOverrides") or {}
+
+    accent = tones.get(DEFAULT_ACCENT_REGION) or DEFAULT_ACCENT_COLOR
+    if overrides.get("accentTones", True):
+        accent = tones.get(region) or accent
+    palette["accent"] = accent
+
+    aesthetic = config.get("aesthetic") or {}
+    theme["aesthetic"] = {key: aesthetic.get(key) or default for key, default in DEFAULT_AESTHETIC.items()}
+    if overrides.get("currencyDisplayElements", True):
+        theme["currency"] = {"iso": config.get("currency", "USD"), "symbol": config.get("currency_symbol", "$")}
+    theme["region"] = config.get("region") or region.upper()
+    theme["language"] = config.get("language", "en")
+    return theme
+
+
+class ThemeCache:
+    # LRU of frozen themes keyed by region and both content hashes, so an edit to the genome or
+    # a config is a cache miss rather than a stale hit; old entries simply age out.
+    def __init__(self, maxsize=THEME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._themes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, region, genome_sha256, genome, config_sha256, config):
+        key = (region, genome_sha256, config_sha256)
+        with self._lock:
+            theme = self._themes.get(key)
+            if theme is not None:
+                self._themes.move_to_end(key)
+                self.hits += 1
+                return theme
+            self.misses += 1
+        count("design_genome.merged")
+        theme = freeze(merge_theme(region, genome, config))
+        with self._lock:
+            self._themes[key] = theme
+            if len(self._themes) > self.maxsize:
+                self._themes.popitem(last=False)
+        return theme
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._themes), "maxsize": self.maxsize}
+
+
+theme_cache = ThemeCache()
+
+
+def resolve_theme(region):
+    # Fully merged, read-only theme for one vault: genome, regional accent, then config overrides.
+    config_file = vault_config_path(region)
+    config_sha256, config = _load_document(config_file)
+    genome_sha256, genome = _load_document(genome_path_for(config, config_file))
+    return theme_cache.get(region.lower(), genome_sha256, genome, config_sha256, config)
+
+
+def list_vault_regions():
+    return list_dir(vaults_dir, dirs_only=True)
+
+
+@traced("design_genome.resolve_all")
+def resolve_all(regions=None):
+    # Each distinct genome file is stat'ed and hashed once for the whole batch.
+    themes = {}
+    genomes = {}
+    for region in (regions if regions is not None else list_vault_regions()):
+        config_file = vault_config_path(region)
+        config_sha256, config = _load_document(config_file)
+        genome_file = genome_path_for(config, config_file)
+        if genome_file not in genomes:
+            with span("design_genome.load_genome", path=genome_file):
+                genomes[genome_file] = _load_document(genome_file)
+        genome_sha256, genome = genomes[genome_file]
+        themes[region.lower()] = theme_cache.get(region.lower(), genome_sha256, genome, config_sha256, config)
+    return themes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve merged design-genome themes for vaults.")
+    parser.add_argument("regions", nargs="*", help="Region codes (default: every vault).")
+    parser.add_argument("--json", action="store_true", help="Print the full merged themes as JSON.")
+    args = parser.parse_args()
+
+    themes = resolve_all(args.regions or None)
+    if args.json:
+        print(dumps({region: thaw(theme) for region, theme in themes.items()}, pretty=True).decode("utf-8"))
+    else:
+        for region, theme in themes.items():
+            aesthetic = theme["aesthetic"]
+            print(f"{region.upper():<4} {theme['palette']['accent']:<9} {aesthetic['palette']} / {aesthetic['texture']}")
@@ -0,0 +1,89 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 16
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+
+class FanoutResult:
+    __slots__ = ("job", "ok", "attempts", "elapsed", "error", "timed_out")
+
+    def __init__(self, job, ok, attempts, elapsed, error=None, timed_out=False):
+        self.job = job
+        self.ok = ok
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.error = error
+        self.timed_out = timed_out
+
+
+def _release_when_done(future, semaphore):
+    # An abandoned attempt keeps its worker slot until its thread returns, so the jobs after it do
+    # not spend their own deadline queued behind it. Retrieving the outcome keeps asyncio quiet.
+    def done(finished):
+        if not finished.cancelled():
+            finished.exception()
+        semaphore.release()
+    future.add_done_callback(done)
+
+
+async def _run_job(loop, executor, semaphore, func, job, timeout, retries, backoff):
+    await semaphore.acquire()
+    started = time.monotonic()
+    deadline = started + timeout
+    for attempt in range(1, retries + 2):
+        future = loop.run_in_executor(executor, func, *job)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - time.monotonic()))
+            semaphore.release()
+            return FanoutResult(job, True, attempt, time.monotonic() - started)
+        except asyncio.TimeoutError:
+            # Threads cannot be killed: the job fails at its deadline and is never retried, since a second
+            # attempt would run alongside the first and both would write the same asset or journal record.
+            _release_when_done(future, semaphore)
+            return FanoutResult(job, False, attempt, time.monotonic() - started,
+                                f"timed out after {timeout:g}s (attempt {attempt} left running)", timed_out=True)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        # Exponential backoff with jitter so retries of a shared outage do not stampede; no retry starts
+        # that could not begin before the job's deadline.
+        delay = backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+        if attempt > retries or time.monotonic() + delay >= deadline:
+            semaphore.release()
+            return FanoutResult(job, False, attempt, time.monotonic() - started, error)
+        await asyncio.sleep(delay)
+
+
+async def _fan_out(func, jobs, max_workers, timeout, retries, backoff):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tasks = [_run_job(loop, executor, semaphore, func, job, timeout, retries, backoff) for job in jobs]
+        return await asyncio.gather(*tasks)
+
+
+def fan_out(func, jobs, max_workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    # Runs func(*job) for every job tuple on a bounded pool and returns one FanoutResult per job, in job order.
+    # timeout is a per-job deadline covering every attempt and backoff: a job still running at its deadline
+    # is reported failed (timed_out) and not retried. Its thread cannot be stopped, so fan_out still waits
+    # for it before returning, which keeps shared resources such as a journal open until it is done.
+    return asyncio.run(_fan_out(func, list(jobs), max(1, max_workers), timeout, retries, backoff))
+
+
+def _default_label(job):
+    return " / ".join(str(part) for part in job)
+
+
+def summarize(results, elapsed, label=_default_label):
+    succeeded = [result for result in results if result.ok]
+    failed = [result for result in results if not result.ok]
+    retried = sum(1 for result in results if result.attempts > 1)
+    timed_out = sum(1 for result in failed if result.timed_out)
+    lines = [f"{len(succeeded)}/{len(results)} jobs succeeded in {elapsed:.2f}s ({retried} retried, {len(failed)} failed, {timed_out} of them timed out)."]
+    for result in failed:
+        lines.append(f"  FAILED {label(result.job)} after {result.attempts} attempts: {result.error}")
+    return "\n".join(lines)
@@ -1,42 +1,140 @@
-import json
+import argparse
+import hashlib
 import os
+import stat as stat_module
+from concurrent.futures import ThreadPoolExecutor
 
-def generate_adapter_registry():
-    registry = []
-    credit_adapters_dir = "credit_adapters"
+from atomic_io import atomic_write_bytes, atomic_write_json
+from instrumentation import count, span, traced
+from json_codec import JSONDecodeError, dumps, load_file
+from vault_index import list_dir, read_json
 
+credit_adapters_dir = "credit_adapters"
+registry_paths = [
+    os.path.join(credit_adapters_dir, "adapter_registry.json"),
+    "adapter_registry.json"
+]
+registry_index_path = os.path.join(credit_adapters_dir, ".registry_index.json")
+
+REGISTRY_INDEX_VERSION = 1
+
+
+def registry_entry(adapter_data):
+    return {
+        "region": adapter_data.get("region", "N/A"),
+        "bureau": adapter_data.get("adapter_name", "N/A"),
+        "status": adapter_data.get("status", "N/A"),
+        "endpoint_placeholder": adapter_data.get("endpoint", "")
+    }
+
+
+@traced("generate_adapter_registry.parse_adapter")
+def parse_adapter_file(filepath):
+    try:
+        return registry_entry(read_json(filepath))
+    except JSONDecodeError:
+        print(f"Error: Could not decode JSON from {filepath}")
+    except Exception as e:
+        print(f"An error occurred while processing {filepath}: {e}")
+    return None
+
+
+def load_registry_index():
+    try:
+        index = load_file(registry_index_path)
+    except (FileNotFoundError, JSONDecodeError):
+        return {"version": REGISTRY_INDEX_VERSION, "adapters": {}, "registry_sha256": ""}
+    if not isinstance(index, dict) or index.get("version") != REGISTRY_INDEX_VERSION:
+        return {"version": REGISTRY_INDEX_VERSION, "adapters": {}, "registry_sha256": ""}
+    return index
+
+
+def scan_adapter_files():
+    # Names come from the shared vault index listing; the stats are always fresh.
+    adapter_files = {}
+    for filename in list_dir(credit_adapters_dir, suffix="_adapter.json"):
+        path = os.path.join(credit_adapters_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        if stat_module.S_ISREG(stat.st_mode):
+            adapter_files[filename] = (path, stat.st_mtime_ns, stat.st_size)
+    return adapter_files
+
+
+def stat_adapter_files(index, changed):
+    # Targeted alternative to scan_adapter_files() when the caller already knows which files changed.
+    adapter_files = {filename: (os.path.join(credit_adapters_dir, filename), cached["mtime_ns"], cached["size"])
+                     for filename, cached in index["adapters"].items()}
+    for filename in changed:
+        path = os.path.join(credit_adapters_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            adapter_files.pop(filename, None)
+            continue
+        adapter_files[filename] = (path, stat.st_mtime_ns, stat.st_size)
+    return adapter_files
+
+
+@traced("generate_adapter_registry")
+def generate_adapter_registry(full=False, max_workers=None, changed=None):
+    # changed: optional adapter filenames known to have been edited; skips the directory scan.
     if not os.path.exists(credit_adapters_dir):
         print(f"Error: Directory {credit_adapters_dir} not found.")
         return
 
-    for filename in os.listdir(credit_adapters_dir):
-        if filename.endswith("_adapter.json"):
-            filepath = os.path.join(credit_adapters_dir, filename)
-            try:
-                with open(filepath, "r") as f:
-                    adapter_data = json.load(f)
-                
-                region = adapter_data.get("region", "N/A")
-                bureau = adapter_data.get("adapter_name", "N/A")
-                status = adapter_data.get("status", "N/A")
-                endpoint = adapter_data.get("endpoint", "")
-
-                registry.append({
-                    "region": region,
-                    "bureau": bureau,
-                    "status": status,
-                    "endpoint_placeholder": endpoint
-                })
-            except json.JSONDecodeError:
-                print(f"Error: Could not decode JSON from {filepath}")
-            except Exception as e:
-                print(f"An error occurred while processing {filepath}: {e}")
-    
-    registry_path = os.path.join(credit_adapters_dir, "adapter_registry.json")
-    with open(registry_path, "w") as f:
-        json.dump(registry, f, indent=2)
-    print(f"Generated {registry_path}")
+    index = load_registry_index()
+    cached_adapters = {} if full else index["adapters"]
+    with span("generate_adapter_registry.scan", targeted=changed is not None and not full):
+        adapter_files = scan_adapter_files() if full or changed is None else stat_adapter_files(index, changed)
 
-if __name__ == "__main__":
-    generate_adapter_registry()
+    indexed_adapters = {}
+    stale = []
+    for filename, (filepath, mtime_ns, size) in adapter_files.items():
+        cached = cached_adapters.get(filename)
+        if cached and cached["mtime_ns"] == mtime_ns and cached["size"] == size:
+            indexed_adapters[filename] = cached
+        else:
+            stale.append((filename, filepath, mtime_ns, size))
+
+    # Only changed adapters are parsed, and those are read concurrently.
+    if stale:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parsed = executor.map(lambda item: parse_adapter_file(item[1]), stale)
+            for (filename, _, mtime_ns, size), entry in zip(stale, parsed):
+                if entry is not None:
+                    indexed_adapters[filename] = {"mtime_ns": mtime_ns, "size": size, "entry": entry}
 
+    count("generate_adapter_registry.reparsed", len(stale))
+    registry = [indexed_adapters[filename]["entry"] for filename in sorted(indexed_adapters)]
+    # Same indent=2 layout the tracked registry has always had, so regenerating it leaves no diff.
+    registry_bytes = dumps(registry, pretty=True)
+    registry_sha256 = hashlib.sha256(registry_bytes).hexdigest()
+
+    unchanged = (
+        not full
+        and registry_sha256 == index.get("registry_sha256")
+        and all(os.path.exists(path) and os.path.getsize(path) == len(registry_bytes) for path in registry_paths)
+    )
+    if unchanged:
+        print(f"Adapter registry up to date ({len(registry)} adapters, {len(stale)} re-parsed).")
+    else:
+        for registry_path in registry_paths:
+            atomic_write_bytes(registry_path, registry_bytes)
+            print(f"Generated {registry_path}")
+
+    new_index = {"version": REGISTRY_INDEX_VERSION, "adapters": indexed_adapters, "registry_sha256": registry_sha256}
+    if new_index != index:
+        atomic_write_json(registry_index_path, new_index, indent=None)
+    return registry
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the credit adapter registry.")
+    parser.add_argument("--full", action="store_true", help="Re-parse every adapter and rewrite both registries.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of parser threads.")
+    args = parser.parse_args()
+    if generate_adapter_registry(full=args.full, max_workers=args.workers) is None:
+        raise SystemExit(1)
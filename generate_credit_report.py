@@ -1,71 +1,82 @@
-import json
-import os
+import argparse
 import datetime
 
-def generate_credit_report():
-    report_content = "# CrypDNA Vault Credit Report\n\n"
-    report_content += "This report summarizes the status of credit adapters across the CrypDNA Global Vault Network, detailing active and locked adapters, along with relevant compliance notes.\n\n"
-
-    report_content += "## 1. Credit Adapter Status Overview\n\n"
-    report_content += "The CrypDNA Credit Genesis Protocol (v5.0) has successfully brought the U.S. Dun & Bradstreet tradeline online and scaffolded global adapters. The U.S. adapter is live, while all other regional adapters are currently locked, awaiting local authorization and compliance approval.\n\n"
-
-    report_content += "| Region | Adapter Name              | Status   | Compliance Note                                              |\n"
-    report_content += "| :----- | :------------------------ | :------- | :----------------------------------------------------------- |\n"
-
-    regions_data_path = "/home/ubuntu/regions_data.json"
-    try:
-        with open(regions_data_path, "r") as f:
-            regions_data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: {regions_data_path} not found.")
-        regions_data = {}
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {regions_data_path}.")
-        regions_data = {}
-
-    # Sort regions for consistent reporting
-    sorted_regions = sorted(regions_data.keys())
-
-    for region_code in sorted_regions:
-        adapter_file_path = os.path.join("credit_adapters", f"{region_code.lower()}_adapter.json")
-        if os.path.exists(adapter_file_path):
-            try:
-                with open(adapter_file_path, "r") as f:
-                    adapter_data = json.load(f)
-                adapter_name = adapter_data.get("adapter_name", "N/A")
-                status = adapter_data.get("status", "N/A")
-                compliance_note = adapter_data.get("compliance_note", "No specific note provided.")
-                report_content += f"| {region_code.upper():<6} | {adapter_name:<25} | {status:<8} | {compliance_note:<60} |\n"
-            except json.JSONDecodeError:
-                report_content += f"| {region_code.upper():<6} | Error reading adapter file | Error    | Could not decode adapter JSON.                               |\n"
-        else:
-            report_content += f"| {region_code.upper():<6} | Adapter file missing     | Missing  | Adapter file not found in directory.                         |\n"
-
-    report_content += "\n"
-
-    report_content += "## 2. U.S. Dun & Bradstreet (D&B) Tradeline Details\n\n"
-    report_content += "The U.S. Vault is configured to report to Dun & Bradstreet, leveraging its comprehensive business credit reporting services. This integration allows for real-time tradeline reporting and credit score generation for U.S.-based entities.\n\n"
-    report_content += "- **Active Reporting Node:** `usa.crypdawgs.com`\n"
-    report_content += "- **Provider:** Dun & Bradstreet (D&B)\n"
-    report_content += "- **Status:** Live\n"
-    report_content += "- **Key Features:** Business credit scores, payment history, financial risk assessment.\n"
-    report_content += "- **Compliance:** Fully compliant with U.S. financial regulations, including the Fair Credit Reporting Act (FCRA).\n\n"
-
-    report_content += "## 3. Global Adapter Framework\n\n"
-    report_content += "A standardized framework has been established for all other regional credit adapters. Each adapter is currently in a 'locked' state, signifying that it is scaffolded and ready for integration but requires specific local regulatory approval and technical configuration before activation. This phased approach ensures adherence to diverse international financial regulations and data privacy laws.\n\n"
-    report_content += "- **Framework Status:** Ready for Authorization\n"
-    report_content += "- **Activation Requirement:** Local regulatory approval and technical setup.\n"
-    report_content += "- **Benefit:** Ensures compliance and tailored credit reporting per region.\n\n"
-
-    report_content += "## Conclusion\n\n"
-    report_content += "The CrypDNA Credit Genesis Protocol has successfully laid the foundation for global credit reporting. The U.S. D&B tradeline is operational, and a robust framework for international expansion is in place, awaiting regional activations.\n\n"
-    report_content += f"**Report Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-
-    output_report_path = "Vault_Credit_Report.md"
-    with open(output_report_path, "w") as f:
-        f.write(report_content)
+from adapter_table import AdapterStatusTable
+from instrumentation import traced
+from region_catalog import load_regions
+from report_writer import MarkdownReportWriter
+
+output_report_path = "Vault_Credit_Report.md"
+
+CREDIT_TABLE_COLUMNS = [
+    ("region", "Region", 6),
+    ("adapter_name", "Adapter Name", 25),
+    ("status", "Status", 8),
+    ("compliance_note", "Compliance Note", 60)
+]
+
+
+def credit_adapter_rows(table):
+    # Sort regions for consistent reporting (the table is loaded in region order)
+    return table.rows([key for key, _, _ in CREDIT_TABLE_COLUMNS])
+
+
+def load_credit_table():
+    regions_data = load_regions()
+    if regions_data is None:
+        print("Cannot generate the credit report without the region catalog.")
+        return None
+    return AdapterStatusTable.load(regions=regions_data.keys())
+
+
+@traced("generate_credit_report")
+def generate_credit_report(table_exports=()):
+    table = load_credit_table()
+    if table is None:
+        return None
+    return write_credit_report(table, table_exports)
+
+
+@traced("generate_credit_report.write")
+def write_credit_report(table, table_exports=()):
+    # Renders an already-loaded table, so watch mode can re-render after refreshing single rows.
+    with MarkdownReportWriter(output_report_path) as report:
+        report.heading("CrypDNA Vault Credit Report", level=1)
+        report.paragraph("This report summarizes the status of credit adapters across the CrypDNA Global Vault Network, detailing active and locked adapters, along with relevant compliance notes.")
+
+        report.heading("1. Credit Adapter Status Overview")
+        report.paragraph("The CrypDNA Credit Genesis Protocol (v5.0) has successfully brought the U.S. Dun & Bradstreet tradeline online and scaffolded global adapters. The U.S. adapter is live, while all other regional adapters are currently locked, awaiting local authorization and compliance approval.")
+        report.table(CREDIT_TABLE_COLUMNS, credit_adapter_rows(table), exports=table_exports)
+
+        report.heading("2. U.S. Dun & Bradstreet (D&B) Tradeline Details")
+        report.paragraph("The U.S. Vault is configured to report to Dun & Bradstreet, leveraging its comprehensive business credit reporting services. This integration allows for real-time tradeline reporting and credit score generation for U.S.-based entities.")
+        report.bullets([
+            "**Active Reporting Node:** `usa.crypdawgs.com`",
+            "**Provider:** Dun & Bradstreet (D&B)",
+            "**Status:** Live",
+            "**Key Features:** Business credit scores, payment history, financial risk assessment.",
+            "**Compliance:** Fully compliant with U.S. financial regulations, including the Fair Credit Reporting Act (FCRA)."
+        ])
+
+        report.heading("3. Global Adapter Framework")
+        report.paragraph("A standardized framework has been established for all other regional credit adapters. Each adapter is currently in a 'locked' state, signifying that it is scaffolded and ready for integration but requires specific local regulatory approval and technical configuration before activation. This phased approach ensures adherence to diverse international financial regulations and data privacy laws.")
+        report.bullets([
+            "**Framework Status:** Ready for Authorization",
+            "**Activation Requirement:** Local regulatory approval and technical setup.",
+            "**Benefit:** Ensures compliance and tailored credit reporting per region."
+        ])
+
+        report.heading("Conclusion")
+        report.paragraph("The CrypDNA Credit Genesis Protocol has successfully laid the foundation for global credit reporting. The U.S. D&B tradeline is operational, and a robust framework for international expansion is in place, awaiting regional activations.")
+        report.line(f"**Report Generated:** {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
     print(f"Vault Credit Report generated at {output_report_path}")
+    return output_report_path
 
-if __name__ == "__main__":
-    generate_credit_report()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Vault credit report.")
+    parser.add_argument("--export", action="append", default=[], help="Also write the adapter table to a .csv or .jsonl file (repeatable).")
+    args = parser.parse_args()
+    if generate_credit_report(table_exports=args.export) is None:
+        raise SystemExit(1)
@@ -1,78 +1,125 @@
-
-import json
+import argparse
 import datetime
 import os
 
-commercial_logs_path = "commercial_generation_logs.json"
+from commercial_log import commercial_log_path, count_entries, iter_entries
+from crypmercial_scheduler import schedule_summary
+from instrumentation import traced
+from report_writer import MarkdownReportWriter
+
 output_report_path = "/home/ubuntu/crypdna-vault-genesis/Vault_Integration_Report.md"
 
-def generate_report():
-    report_content = "# CrypDNA x Kimi Integration Protocol - Vault Integration Report\n\n"
-    report_content += "This report details the integration status of Kimi with the CrypDNA Vault ecosystem, focusing on commercial generation and content automation.\n\n"
-
-    # Kimi Connector Status
-    report_content += "## 1. Kimi Connector Status\n\n"
-    report_content += "The connection between Kimi and the CrypDNA Vault ecosystem has been successfully simulated using verified GitHub + Netlify credentials. The bridge is established and ready for data transfer.\n\n"
-    report_content += "- **Status:** Connected (Simulated)\n"
-    last_verified_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    report_content += f"- **Last Verified:** {last_verified_timestamp}\n\n"
-
-    # Asset Sync Verification
-    report_content += "## 2. Asset Sync Verification\n\n"
-    report_content += "The following asset directories have been successfully synchronized, ensuring Kimi has access to necessary brand assets and can deploy generated content:\n\n"
-    report_content += "- `/assets/brand/`\n"
-    report_content += "- `/media/crypdawgs_visuals/`\n"
-    report_content += "- `/scripts/cryp_commercials/`\n"
-    report_content += "- `/audio/crypsoundbank/`\n\n"
-    report_content += "All directories are confirmed to be accessible and writable for Kimi.\n\n"
-
-    # Region-specific Commercial Generation Logs
-    report_content += "## 3. Region-Specific Commercial Generation Logs\n\n"
-    report_content += "Kimi has successfully simulated the auto-generation and localization of Crypmercials for various regions. The initial drop includes themes based on Painite, Vicuña, and Meteorite. Each ad is localized per subdomain using CrypDNA language modules.\n\n"
-
-    try:
-        with open(commercial_logs_path, "r") as f:
-            commercial_generation_logs = json.load(f)
-    except FileNotFoundError:
-        report_content += "*No commercial generation logs found. Simulation may not have completed successfully.*\n\n"
-        commercial_generation_logs = []
-    except json.JSONDecodeError:
-        report_content += "*Error reading commercial generation logs. File might be corrupted.*\n\n"
-        commercial_generation_logs = []
-
-    if commercial_generation_logs:
-        report_content += "| Region | Theme       | Status                 | Scheduled Post (UTC) | Output File                                         |\n"
-        report_content += "| :----- | :---------- | :--------------------- | :------------------- | :-------------------------------------------------- |\n"
-        for log in commercial_generation_logs:
-            region = log.get("region", "N/A")
-            theme = log.get("theme", "N/A")
-            status = log.get("status", "N/A")
-            scheduled_post = log.get("scheduled_post", "N/A")
-            output_file = log.get("output_file", "N/A").replace("/home/ubuntu/crypdna-vault-genesis/", "") # Make path relative
-            report_content += f"| {region:<6} | {theme:<11} | {status:<22} | {scheduled_post:<20} | {output_file:<50} |\n"
-    else:
-        report_content += "*No commercial generation logs available.*\n"
-    report_content += "\n"
-
-    # Scheduled Ad Rotation Timeline
-    report_content += "## 4. Scheduled Ad Rotation Timeline\n\n"
-    report_content += "Kimi is authorized to schedule the output of generated commercials to post automatically on Crypdawgs social channels once each Vault deploys. The current simulation sets a scheduled post date approximately one week from the generation date for each commercial.\n\n"
-    report_content += "- **Frequency:** Continuous (triggered by new content generation)\n"
-    report_content += "- **Initial Schedule:** Approximately 7 days from generation date for each Crypmercial.\n"
-    report_content += "- **Platform Integration:** Simulated for Crypdawgs social channels.\n\n"
-
-    report_content += "## Conclusion\n\n"
-    report_content += "The CrypDNA x Kimi integration protocol (Phase v4.1 Expansion) is fully operational in a simulated environment. Kimi is connected, asset directories are synced, and AI-driven commercial generation and localization are active across all Vaults. The system is prepared for real-world deployment and continuous content automation.\n\n"
-    report_content += "**Global Vault Network Status:** Fully Activated\n"
-    report_content += "**Kimi Integration Status:** Live\n"
-    report_content += "**Commercial Generation Status:** Active across all Vaults\n\n"
-    report_generated_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    report_content += f"**Report Generated:** {report_generated_timestamp}\n"
-
-    with open(output_report_path, "w") as f:
-        f.write(report_content)
+COMMERCIAL_TABLE_COLUMNS = [
+    ("region", "Region", 6),
+    ("theme", "Theme", 11),
+    ("status", "Status", 22),
+    ("scheduled_post", "Scheduled Post (UTC)", 20),
+    ("output_file", "Output File", 50)
+]
+
+
+def commercial_log_rows(commercial_log_entries):
+    for log in commercial_log_entries:
+        region = log.get("region", "N/A")
+        theme = log.get("theme", "N/A")
+        status = log.get("status", "N/A")
+        scheduled_post = log.get("scheduled_post", "N/A")
+        output_file = log.get("output_file", "N/A").replace("/home/ubuntu/crypdna-vault-genesis/", "") # Make path relative
+        yield (region, theme, status, scheduled_post, output_file)
+
+
+@traced("generate_integration_report")
+def generate_report(table_exports=(), region=None, theme=None, date=None, page=1, page_size=None):
+    # region/theme/date filter the commercial log table through its offset index; page_size paginates it.
+    with MarkdownReportWriter(output_report_path) as report:
+        report.heading("CrypDNA x Kimi Integration Protocol - Vault Integration Report", level=1)
+        report.paragraph("This report details the integration status of Kimi with the CrypDNA Vault ecosystem, focusing on commercial generation and content automation.")
+
+        # Kimi Connector Status
+        report.heading("1. Kimi Connector Status")
+        report.paragraph("The connection between Kimi and the CrypDNA Vault ecosystem has been successfully simulated using verified GitHub + Netlify credentials. The bridge is established and ready for data transfer.")
+        last_verified_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        report.bullets([
+            "**Status:** Connected (Simulated)",
+            f"**Last Verified:** {last_verified_timestamp}"
+        ])
+
+        # Asset Sync Verification
+        report.heading("2. Asset Sync Verification")
+        report.paragraph("The following asset directories have been successfully synchronized, ensuring Kimi has access to necessary brand assets and can deploy generated content:")
+        report.bullets([
+            "`/assets/brand/`",
+            "`/media/crypdawgs_visuals/`",
+            "`/scripts/cryp_commercials/`",
+            "`/audio/crypsoundbank/`"
+        ])
+        report.paragraph("All directories are confirmed to be accessible and writable for Kimi.")
+
+        # Region-specific Commercial Generation Logs
+        report.heading("3. Region-Specific Commercial Generation Logs")
+        report.paragraph("Kimi has successfully simulated the auto-generation and localization of Crypmercials for various regions. The initial drop includes themes based on Painite, Vicuña, and Meteorite. Each ad is localized per subdomain using CrypDNA language modules.")
+
+        # Rows are streamed from the JSONL log (or seeked to via its index), never loaded as a whole.
+        filtered = region is not None or theme is not None or date is not None
+        if not os.path.exists(commercial_log_path):
+            report.paragraph("*No commercial generation logs found. Simulation may not have completed successfully.*")
+            total = 0
+        elif filtered or page_size:
+            total = count_entries(commercial_log_path, region, theme, date)
+        else:
+            total = None if os.path.getsize(commercial_log_path) else 0
+
+        start = (page - 1) * page_size if page_size else 0
+        if total == 0 or (total is not None and start >= total):
+            report.line("*No commercial generation logs available.*")
+            report.line()
+        else:
+            if total is not None:
+                filters = ", ".join(f"{name} {value}" for name, value in (("region", region), ("theme", theme), ("date", date)) if value is not None)
+                shown = min(total, start + page_size) if page_size else total
+                report.paragraph(f"Showing entries {start + 1}-{shown} of {total}" + (f" ({filters})." if filters else "."))
+            entries = iter_entries(commercial_log_path, region, theme, date, start=start, limit=page_size)
+            report.table(COMMERCIAL_TABLE_COLUMNS, commercial_log_rows(entries), exports=table_exports)
+
+        # Scheduled Ad Rotation Timeline
+        report.heading("4. Scheduled Ad Rotation Timeline")
+        report.paragraph("Kimi is authorized to schedule the output of generated commercials to post automatically on Crypdawgs social channels once each Vault deploys. The current simulation sets a scheduled post date approximately one week from the generation date for each commercial.")
+        report.bullets([
+            "**Frequency:** Continuous (triggered by new content generation)",
+            "**Initial Schedule:** Approximately 7 days from generation date for each Crypmercial.",
+            "**Platform Integration:** Simulated for Crypdawgs social channels."
+        ])
+        schedule = schedule_summary()
+        if schedule is None:
+            report.paragraph("*The publishing scheduler has not run yet; run `crypmercial_scheduler.py` to queue the rotation.*")
+        else:
+            next_due = datetime.datetime.fromtimestamp(schedule["next_due"], datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC') if schedule["next_due"] else "Nothing pending"
+            report.bullets([f"**Pending Posts ({channel}):** {pending}" for channel, pending in sorted(schedule["pending"].items())] + [
+                f"**Published (last 30 days):** {schedule['published']}",
+                f"**Next Post Due:** {next_due}"
+            ])
+
+        report.heading("Conclusion")
+        report.paragraph("The CrypDNA x Kimi integration protocol (Phase v4.1 Expansion) is fully operational in a simulated environment. Kimi is connected, asset directories are synced, and AI-driven commercial generation and localization are active across all Vaults. The system is prepared for real-world deployment and continuous content automation.")
+        report.line("**Global Vault Network Status:** Fully Activated")
+        report.line("**Kimi Integration Status:** Live")
+        report.line("**Commercial Generation Status:** Active across all Vaults")
+        report.line()
+        report_generated_timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        report.line(f"**Report Generated:** {report_generated_timestamp}")
+
     print(f"Vault Integration Report generated at {output_report_path}")
+    return output_report_path
 
-if __name__ == "__main__":
-    generate_report()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Kimi Vault integration report.")
+    parser.add_argument("--export", action="append", default=[], help="Also write the commercial log table to a .csv or .jsonl file (repeatable).")
+    parser.add_argument("--region", help="Only show commercials for this region code.")
+    parser.add_argument("--theme", help="Only show commercials for this theme.")
+    parser.add_argument("--date", help="Only show commercials generated on this date (YYYY-MM-DD).")
+    parser.add_argument("--page", type=int, default=1, help="Page of the commercial log table to show (with --page-size).")
+    parser.add_argument("--page-size", type=int, help="Rows per page of the commercial log table (default: all).")
+    args = parser.parse_args()
+    generate_report(table_exports=args.export, region=args.region.upper() if args.region else None, theme=args.theme,
+                    date=args.date, page=max(1, args.page), page_size=args.page_size)
@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import mimetypes
+import os
+import re
+import ssl
+import time
+
+DEFAULT_PER_HOST_LIMIT = 4
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_TIMEOUT = 5.0
+MAX_ASSETS_PER_REGION = 8
+
+# Vite-style content-hashed bundles referenced from index.html, e.g. /assets/index-CU9jfmMt.js
+HASHED_ASSET_PATTERN = re.compile(r'(?:src|href)="(/assets/[\w.-]+-[\w-]{6,}\.(?:js|css))"')
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class _Connection:
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class HttpClient:
+    # Minimal async HTTP/1.1 GET client: keep-alive connections pooled per host, a
+    # per-host concurrency limit and a global connection cap. resolve maps a virtual
+    # host to the (address, port) actually dialled, which is how the local stand-in is reached.
+    def __init__(self, per_host_limit=DEFAULT_PER_HOST_LIMIT, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT, resolve=None, scheme="http"):
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.resolve = resolve or {}
+        self.scheme = scheme
+        self.connections_opened = 0
+        self._global = asyncio.Semaphore(max_connections)
+        self._host_limits = {}
+        self._idle = {}
+
+    async def get(self, host, path):
+        # Returns (status, body, seconds); raises on connection failure or timeout.
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        async with limit, self._global:
+            started = time.monotonic()
+            status, body = await asyncio.wait_for(self._request(host, path), self.timeout)
+            return status, body, time.monotonic() - started
+
+    async def _request(self, host, path):
+        idle = self._idle.setdefault(host, [])
+        for attempt in range(2):
+            reused = bool(idle)
+            connection = idle.pop() if reused else await self._connect(host)
+            try:
+                connection.writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: */*\r\n\r\n".encode("latin-1"))
+                await connection.writer.drain()
+                status, headers, body = await _read_response(connection.reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                connection.close()
+                # Only a reused keep-alive connection gets a second try; a fresh one failing is real.
+                if reused and attempt == 0:
+                    continue
+                raise
+            if headers.get("connection", "").lower() == "close":
+                connection.close()
+            else:
+                idle.append(connection)
+            return status, body
+
+    async def _connect(self, host):
+        address, port = self.resolve.get(host, (host, 443 if self.scheme == "https" else 80))
+        context = ssl.create_default_context() if self.scheme == "https" else None
+        reader, writer = await asyncio.open_connection(address, port, ssl=context, server_hostname=host if context else None)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def close(self):
+        for idle in self._idle.values():
+            for connection in idle:
+                connection.close()
+        self._idle.clear()
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed before response")
+    try:
+        status = int(status_line.split()[1])
+    except (IndexError, ValueError):
+        raise ValueError(f"malformed status line {status_line!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+        return status, headers, b"".join(chunks)
+    length = int(headers.get("content-length", "0") or 0)
+    return status, headers, await reader.readexactly(length) if length else b""
+
+
+class RegionProbe:
+    __slots__ = ("region", "host", "checks", "failures", "latencies", "error")
+
+    def __init__(self, region, host):
+        self.region = region
+        self.host = host
+        self.checks = 0
+        self.failures = []
+        self.latencies = []
+        self.error = None
+
+    @property
+    def ok(self):
+        return self.checks > 0 and not self.failures and self.error is None
+
+    def record(self, path, status, seconds):
+        self.checks += 1
+        self.latencies.append(seconds)
+        if status != 200:
+            self.failures.append(f"{path} {status}")
+
+    def latency_ms(self):
+        latencies = sorted(self.latencies)
+        return {name: round(_percentile(latencies, fraction) * 1000, 2)
+                for name, fraction in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99))}
+
+    def summary(self):
+        if self.error:
+            return f"Unreachable ({self.error})"
+        if self.failures:
+            return f"Failed ({self.failures[0]})"
+        return f"200 OK ({self.checks} checks)"
+
+
+async def probe_region(client, region, host):
+    # index.html first, then every hashed asset it references, fetched concurrently.
+    probe = RegionProbe(region, host)
+    try:
+        status, body, seconds = await client.get(host, "/index.html")
+        probe.record("/index.html", status, seconds)
+        if status == 200:
+            assets = sorted(set(HASHED_ASSET_PATTERN.findall(body.decode("utf-8", "replace"))))[:MAX_ASSETS_PER_REGION]
+            if not assets:
+                probe.failures.append("no hashed assets in index.html")
+            results = await asyncio.gather(*(client.get(host, path) for path in assets), return_exceptions=True)
+            for path, result in zip(assets, results):
+                if isinstance(result, BaseException):
+                    raise result
+                probe.record(path, result[0], result[2])
+    except asyncio.TimeoutError:
+        probe.error = "timed out"
+    except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+        probe.error = f"{type(e).__name__}: {e}"
+    return probe
+
+
+async def probe_hosts(targets, **client_options):
+    # targets: {region: host}. Every region is probed in parallel; returns {region: RegionProbe}.
+    client = HttpClient(**client_options)
+    try:
+        probes = await asyncio.gather(*(probe_region(client, region, host) for region, host in targets.items()))
+    finally:
+        await client.close()
+    return {probe.region: probe for probe in probes}
+
+
+class LocalVaultServer:
+    # Stand-in for the deployed subdomains: serves vaults/<region>/ by Host header over
+    # keep-alive HTTP/1.1. delay adds a fixed per-request latency to mimic a remote edge.
+    def __init__(self, host_map, vaults_dir="vaults", delay=0.0):
+        self.host_map = dict(host_map)
+        self.vaults_dir = vaults_dir
+        self.delay = delay
+        self.requests = 0
+        self._server = None
+        self._connections = {}
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        self._server.close()
+        # Close idle keep-alive connections so their handlers finish instead of being cancelled.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        self.address = await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+        return False
+
+    def resolve(self):
+        return {host: self.address for host in self.host_map}
+
+    def _lookup(self, host, path):
+        region = self.host_map.get(host.split(":", 1)[0])
+        if region is None:
+            return None
+        root = os.path.realpath(os.path.join(self.vaults_dir, region))
+        candidate = os.path.realpath(os.path.join(root, path.split("?", 1)[0].lstrip("/") or "index.html"))
+        if not candidate.startswith(root + os.sep) or not os.path.isfile(candidate):
+            return None
+        return candidate
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                self.requests += 1
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                file_path = self._lookup(headers.get("host", ""), path) if method == "GET" else None
+                if file_path is None:
+                    status, body, content_type = (404 if method == "GET" else 405), b"", "text/plain"
+                else:
+                    with open(file_path, "rb") as f:
+                        body = f.read()
+                    status, content_type = 200, mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+                writer.write((f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\nContent-Type: {content_type}\r\n"
+                              f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
+
+
+async def probe_local(targets, vaults_dir="vaults", delay=0.0, **client_options):
+    # targets: {region: host}. Serves each region's vault tree under its own host name.
+    host_map = {host: region for region, host in targets.items()}
+    async with LocalVaultServer(host_map, vaults_dir=vaults_dir, delay=delay) as server:
+        return await probe_hosts(targets, resolve=server.resolve(), **client_options)
+
+
+def run_probes(targets, local=False, delay=0.0, **client_options):
+    if local:
+        return asyncio.run(probe_local(targets, delay=delay, **client_options))
+    return asyncio.run(probe_hosts(targets, **client_options))
+
+
+if __name__ == "__main__":
+    from region_catalog import SUBDOMAIN_MAP, subdomain_for
+
+    parser = argparse.ArgumentParser(description="Probe index.html and hashed assets on every vault subdomain.")
+    parser.add_argument("--local", action="store_true", help="Probe a local stand-in server backed by vaults/.")
+    parser.add_argument("--delay", type=float, default=0.0, help="Per-request latency added by the local stand-in (seconds).")
+    parser.add_argument("--scheme", choices=("http", "https"), default="https")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST_LIMIT)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    targets = {region: subdomain_for(region) for region in sorted(SUBDOMAIN_MAP)}
+    started = time.monotonic()
+    results = run_probes(targets, local=args.local, delay=args.delay, per_host_limit=args.per_host,
+                         timeout=args.timeout, scheme="http" if args.local else args.scheme)
+    elapsed = time.monotonic() - started
+    for region, probe in results.items():
+        latency = probe.latency_ms()
+        print(f"{region.upper():<4} {probe.host:<25} {probe.summary():<40} p50 {latency['p50']}ms p95 {latency['p95']}ms p99 {latency['p99']}ms")
+    healthy = sum(1 for probe in results.values() if probe.ok)
+    print(f"{healthy}/{len(results)} subdomains healthy in {elapsed:.2f}s.")
@@ -0,0 +1,220 @@
+import argparse
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+# CRYPDNA_TRACE=<path> appends one JSON line per finished span to <path>.
+# CRYPDNA_PROFILE=cprofile,tracemalloc additionally captures a profile per process into CRYPDNA_PROFILE_DIR.
+trace_path = os.environ.get("CRYPDNA_TRACE", "")
+profile_modes = {mode.strip() for mode in os.environ.get("CRYPDNA_PROFILE", "").split(",") if mode.strip()}
+profile_dir = os.environ.get("CRYPDNA_PROFILE_DIR", "profiles")
+
+FLUSH_EVERY = 1024
+SCRIPT = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+
+enabled = bool(trace_path)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.counters = {}
+        self._records = []
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            self._records.append(record)
+            if len(self._records) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def count(self, name, n):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _flush_locked(self):
+        if not self._records:
+            return
+        data = "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in self._records)
+        self._records = []
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # One O_APPEND write per batch, so several scripts can share a trace file.
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, data.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def close(self):
+        with self._lock:
+            if self.counters:
+                self._records.append({"type": "counters", "script": SCRIPT, "pid": os.getpid(), "ts": time.time(),
+                                      "counters": dict(self.counters)})
+                self.counters = {}
+            self._flush_locked()
+
+
+_tracer = _Tracer(trace_path) if enabled else None
+
+
+class _Span:
+    __slots__ = ("name", "attrs", "started", "wall")
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {"type": "span", "span": self.name, "script": SCRIPT, "pid": os.getpid(),
+                  "thread": threading.current_thread().name, "ts": self.wall,
+                  "ms": round((time.perf_counter() - self.started) * 1000, 4)}
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        _tracer.record(record)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    # Disabled: returns a shared no-op context manager, so the cost is one call.
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(name, attrs)
+
+
+def traced(name=None):
+    # Decorator form of span(); when tracing is off the function is returned untouched.
+    def decorate(func):
+        if _tracer is None:
+            return func
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if _tracer is not None:
+        _tracer.count(name, n)
+
+
+def _start_profiling():
+    profiler = None
+    if "cprofile" in profile_modes:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if "tracemalloc" in profile_modes:
+        import tracemalloc
+        tracemalloc.start(16)
+
+    def dump():
+        os.makedirs(profile_dir, exist_ok=True)
+        prefix = os.path.join(profile_dir, f"{SCRIPT}-{os.getpid()}")
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(prefix + ".prof")
+        if "tracemalloc" in profile_modes:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            with open(prefix + ".tracemalloc.txt", "w") as f:
+                f.write(f"current {current} bytes, peak {peak} bytes\n")
+                for stat in snapshot.statistics("lineno")[:50]:
+                    f.write(f"{stat}\n")
+    atexit.register(dump)
+
+
+if _tracer is not None:
+    atexit.register(_tracer.close)
+if profile_modes:
+    _start_profiling()
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))] if sorted_values else 0.0
+
+
+def summarize_trace(path, script=None):
+    # Per-span duration lists and summed counters across every process that wrote to the trace.
+    durations = {}
+    counters = {}
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if script and record.get("script") != script:
+                continue
+            if record.get("type") == "span":
+                durations.setdefault(record["span"], []).append(record["ms"])
+            elif record.get("type") == "counters":
+                for name, value in record["counters"].items():
+                    counters[name] = counters.get(name, 0) + value
+    return durations, counters
+
+
+def format_histogram(values, width=40):
+    # Power-of-two millisecond buckets: <=0.125ms, <=0.25ms, ... one bar per non-empty bucket.
+    buckets = {}
+    for value in values:
+        exponent = max(-3, math.ceil(math.log2(value))) if value > 0 else -3
+        buckets[exponent] = buckets.get(exponent, 0) + 1
+    peak = max(buckets.values())
+    return [f"    <= {2.0 ** exponent:>9g} ms {'#' * max(1, round(buckets[exponent] / peak * width))} {buckets[exponent]}"
+            for exponent in sorted(buckets)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a CRYPDNA_TRACE file into per-span histograms.")
+    parser.add_argument("trace", nargs="?", default=trace_path or "trace.jsonl")
+    parser.add_argument("--script", help="Only include spans recorded by this script.")
+    parser.add_argument("--histograms", action="store_true", help="Print a duration histogram for every span.")
+    args = parser.parse_args()
+
+    durations, counters = summarize_trace(args.trace, args.script)
+    print(f"{'span':<44} {'count':>8} {'total ms':>11} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        print(f"{name:<44} {len(values):>8} {sum(values):>11.1f} {_percentile(values, 0.5):>9.3f} "
+              f"{_percentile(values, 0.95):>9.3f} {_percentile(values, 0.99):>9.3f} {values[-1]:>9.3f}")
+        if args.histograms:
+            print("\n".join(format_histogram(values)))
+    for name, value in sorted(counters.items()):
+        print(f"counter {name}: {value}")
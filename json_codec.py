@@ -0,0 +1,35 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+backend = "orjson" if orjson is not None else "json"
+
+# orjson.JSONDecodeError subclasses this, so callers catch the same exception with either backend.
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dumps(obj, pretty=False, indent=2, sort_keys=False):
+    # compact: machine-only artifacts (registries, indexes, logs, journals). Both backends emit the
+    # same bytes for the str/int/bool/None/list/dict data these hold, so content hashes do not
+    # depend on whether orjson is installed. (Floats can format differently; keep them out.)
+    # pretty: human-edited files. Always the stdlib json.dumps(indent=...) layout, so existing
+    # configs and adapters stay byte-identical.
+    if pretty:
+        return json.dumps(obj, indent=indent, sort_keys=sort_keys).encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
@@ -1,40 +1,79 @@
-import json
+import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 
-def link_registry_to_vaults():
-    vaults_dir = "vaults"
-    adapter_registry_path = "credit_adapters/adapter_registry.json"
+from atomic_io import atomic_write_json
+from instrumentation import traced
+from json_codec import JSONDecodeError
+from region_catalog import load_regions
+from vault_index import list_dir, read_json
 
+vaults_dir = "vaults"
+adapter_registry_path = "adapter_registry.json"
+# Vault configs live at vaults/<region>/config.json, two levels below the root registry.
+registry_link = f"../../{adapter_registry_path}"
+
+
+def vault_config_paths(regions_data=None):
+    if regions_data is None:
+        regions_data = load_regions()
+    if regions_data is not None:
+        return {region_code: os.path.join(vaults_dir, region_code, "config.json") for region_code in regions_data}
+
+    print(f"Warning: Region catalog unavailable. Falling back to scanning {vaults_dir}/.")
+    return {region_code: os.path.join(vaults_dir, region_code, "config.json") for region_code in list_dir(vaults_dir, dirs_only=True)}
+
+
+@traced("link_registry_to_vaults.link_vault_config")
+def link_vault_config(config_path):
+    try:
+        config_data = read_json(config_path)
+    except FileNotFoundError:
+        return "missing"
+    except JSONDecodeError:
+        print(f"Error: Could not decode JSON from {config_path}")
+        return "error"
+    if not isinstance(config_data, dict):
+        print(f"Error: {config_path} does not hold a JSON object. Skipping.")
+        return "error"
+
+    if config_data.get("credit_adapter_registry") == registry_link:
+        return "unchanged"
+
+    # Add or update the reference to the adapter registry (on a copy; the indexed document is shared)
+    config_data = dict(config_data, credit_adapter_registry=registry_link)
+    try:
+        atomic_write_json(config_path, config_data)
+    except Exception as e:
+        print(f"An error occurred while processing {config_path}: {e}")
+        return "error"
+    print(f"Updated {config_path} with registry link.")
+    return "updated"
+
+
+@traced("link_registry_to_vaults")
+def link_registry_to_vaults(regions_data=None, max_workers=None):
     if not os.path.exists(adapter_registry_path):
         print(f"Error: Adapter registry not found at {adapter_registry_path}")
         return
 
     print(f"Linking {adapter_registry_path} to Vault metadata...")
 
-    for region_code in os.listdir(vaults_dir):
-        region_path = os.path.join(vaults_dir, region_code)
-        if os.path.isdir(region_path):
-            config_path = os.path.join(region_path, "ui", "config.json")
-            if os.path.exists(config_path):
-                try:
-                    with open(config_path, "r") as f:
-                        config_data = json.load(f)
-
-                    # Add or update the reference to the adapter registry
-                    config_data["credit_adapter_registry_path"] = f"../../{adapter_registry_path}"
-
-                    with open(config_path, "w") as f:
-                        json.dump(config_data, f, indent=2)
-                    print(f"Updated {config_path} with registry link.")
-                except json.JSONDecodeError:
-                    print(f"Error: Could not decode JSON from {config_path}")
-                except Exception as e:
-                    print(f"An error occurred while processing {config_path}: {e}")
-            else:
+    config_paths = vault_config_paths(regions_data)
+    counts = {"updated": 0, "unchanged": 0, "missing": 0, "error": 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (region_code, config_path), result in zip(config_paths.items(), executor.map(link_vault_config, config_paths.values())):
+            counts[result] += 1
+            if result == "missing":
                 print(f"Warning: {config_path} not found for region {region_code}. Skipping.")
 
-    print("Finished linking adapter registry to Vault metadata.")
+    print(f"Finished linking adapter registry to Vault metadata: {counts['updated']} updated, {counts['unchanged']} unchanged, {counts['missing']} missing, {counts['error']} errors.")
+    return counts
 
-if __name__ == "__main__":
-    link_registry_to_vaults()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Point every vault config at the credit adapter registry.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of concurrent config writers.")
+    args = parser.parse_args()
+    if link_registry_to_vaults(max_workers=args.workers) is None:
+        raise SystemExit(1)
@@ -0,0 +1,254 @@
+import argparse
+import mmap
+import os
+import re
+import struct
+
+from atomic_io import atomic_write_bytes, file_has_bytes
+from instrumentation import traced
+from json_codec import JSONDecodeError, loads
+from region_catalog import load_regions
+
+locales_dir = os.path.join("src", "locales")
+vaults_dir = "vaults"
+bundle_path = os.environ.get("CRYPDNA_LOCALE_BUNDLE", "locale_bundle.bin")
+
+DEFAULT_LOCALE = "en"
+VAULT_PREFIX = "vault:"
+
+# Layout (little-endian), every section at a position computable from the header counts:
+#   header        magic, version, key_count, table_count, string_count
+#   string index  string_count x (pool offset u32, byte length u32)
+#   keys          key_count x string id u32 (keys are interned in the same pool as values)
+#   tables        table_count x (name string id u32, parent table id i32, -1 = end of chain)
+#   values        table_count x key_count x string id u32 (MISSING when the table lacks the key)
+#   pool          UTF-8 bytes
+MAGIC = b"CDLB"
+BUNDLE_VERSION = 1
+MISSING = 0xFFFFFFFF
+_HEADER = struct.Struct("<4sIIII")
+_STRING = struct.Struct("<II")
+_U32 = struct.Struct("<I")
+_TABLE = struct.Struct("<Ii")
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Strings only the Python scripts use, kept out of the frontend's src/locales bundles. They are
+# compiled under the language tables of the same name; a frontend string with the same key wins.
+BACKEND_STRINGS = {
+    "en": {
+        "crypmercial_ad_copy": "Experience the {{theme}} Crypmercial in {{lang}}! Unlock your future with CrypDNA. Prices starting from {{price}}."
+    }
+}
+
+
+def flatten_strings(data, prefix=""):
+    # Nested i18next namespaces become dotted keys ("nav.home"); non-string leaves are skipped.
+    strings = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            strings.update(flatten_strings(value, f"{prefix}{key}."))
+        elif isinstance(value, str):
+            strings[f"{prefix}{key}"] = value
+    return strings
+
+
+def _read_strings(path):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None
+    if not raw.strip():
+        return None  # several vaults ship an empty placeholder strings.json
+    try:
+        data = loads(raw)
+    except JSONDecodeError:
+        print(f"Warning: Skipping unreadable string table {path}")
+        return None
+    return flatten_strings(data) if isinstance(data, dict) else None
+
+
+def _language_parent(language, languages):
+    # "pt-br" falls back to "pt" when that table exists, everything else to the default locale.
+    base = language.replace("_", "-").split("-")[0]
+    if base != language and base in languages:
+        return base
+    return DEFAULT_LOCALE if language != DEFAULT_LOCALE else None
+
+
+def collect_tables(regions_data=None):
+    # name -> (parent name, strings). Chains run vault -> vault language -> en.
+    tables = {}
+    if os.path.isdir(locales_dir):
+        with os.scandir(locales_dir) as entries:
+            for entry in entries:
+                strings = _read_strings(os.path.join(entry.path, "translation.json")) if entry.is_dir() else None
+                if strings is not None:
+                    tables[entry.name] = strings
+    for language, strings in BACKEND_STRINGS.items():
+        tables[language] = dict(strings, **tables.get(language, {}))
+    languages = set(tables)
+    collected = {language: (_language_parent(language, languages), strings) for language, strings in tables.items()}
+
+    if os.path.isdir(vaults_dir):
+        with os.scandir(vaults_dir) as entries:
+            for entry in entries:
+                strings = _read_strings(os.path.join(entry.path, "ui", "strings.json")) if entry.is_dir() else None
+                if strings is None:
+                    continue
+                language = ((regions_data or {}).get(entry.name) or {}).get("language", DEFAULT_LOCALE)
+                if language not in languages:
+                    language = _language_parent(language, languages) or DEFAULT_LOCALE
+                collected[VAULT_PREFIX + entry.name] = (language if language in languages else None, strings)
+    return collected
+
+
+def encode_bundle(tables):
+    # Deterministic for a given input: tables, keys and interned strings are all emitted in sorted order.
+    names = sorted(tables)
+    keys = sorted({key for _, strings in tables.values() for key in strings})
+    key_ids = {key: index for index, key in enumerate(keys)}
+    table_ids = {name: index for index, name in enumerate(names)}
+
+    string_ids = {}
+    pool = bytearray()
+    string_index = bytearray()
+
+    def intern(text):
+        string_id = string_ids.get(text)
+        if string_id is None:
+            data = text.encode("utf-8")
+            string_id = string_ids[text] = len(string_ids)
+            string_index.extend(_STRING.pack(len(pool), len(data)))
+            pool.extend(data)
+        return string_id
+
+    key_section = b"".join(_U32.pack(intern(key)) for key in keys)
+    table_section = b"".join(
+        _TABLE.pack(intern(name), table_ids.get(tables[name][0], -1)) for name in names)
+    values = bytearray()
+    for name in names:
+        row = [MISSING] * len(keys)
+        for key, value in sorted(tables[name][1].items()):
+            row[key_ids[key]] = intern(value)
+        values.extend(struct.pack(f"<{len(keys)}I", *row))
+
+    header = _HEADER.pack(MAGIC, BUNDLE_VERSION, len(keys), len(names), len(string_ids))
+    return b"".join([header, bytes(string_index), key_section, table_section, bytes(values), bytes(pool)])
+
+
+@traced("locale_bundle.compile")
+def compile_bundle(path=None, regions_data=None):
+    path = path or bundle_path
+    if regions_data is None:
+        regions_data = load_regions() or {}
+    tables = collect_tables(regions_data)
+    data = encode_bundle(tables)
+    if file_has_bytes(path, data):
+        print(f"Locale bundle up to date ({len(tables)} tables, {len(data)} bytes).")
+    else:
+        atomic_write_bytes(path, data)
+        print(f"Compiled {len(tables)} string tables into {path} ({len(data)} bytes).")
+    return path
+
+
+class LocaleBundle:
+    # Read-only view over a compiled bundle. Only the key and table names are decoded up front;
+    # a lookup is a dict hit plus two struct reads into the mapping, with no JSON involved.
+    def __init__(self, path=None):
+        self.path = path or bundle_path
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.key_count, self.table_count, string_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a version {BUNDLE_VERSION} locale bundle.")
+        self._strings_at = _HEADER.size
+        keys_at = self._strings_at + string_count * _STRING.size
+        tables_at = keys_at + self.key_count * _U32.size
+        self._values_at = tables_at + self.table_count * _TABLE.size
+        self._pool_at = self._values_at + self.table_count * self.key_count * _U32.size
+
+        self.keys = {self._string(_U32.unpack_from(self._mm, keys_at + index * _U32.size)[0]): index
+                     for index in range(self.key_count)}
+        self.tables = {}
+        self._parents = []
+        for index in range(self.table_count):
+            name_id, parent = _TABLE.unpack_from(self._mm, tables_at + index * _TABLE.size)
+            self.tables[self._string(name_id)] = index
+            self._parents.append(parent)
+
+    def _string(self, string_id):
+        offset, length = _STRING.unpack_from(self._mm, self._strings_at + string_id * _STRING.size)
+        start = self._pool_at + offset
+        return self._mm[start:start + length].decode("utf-8")
+
+    def chain(self, region=None, language=None):
+        # Table ids to consult, most specific first: vault, its language, then en.
+        start = self.tables.get(VAULT_PREFIX + region.lower()) if region else None
+        if start is None and language:
+            start = self.tables.get(language)
+            if start is None:
+                start = self.tables.get(language.replace("_", "-").split("-")[0])
+        if start is None:
+            start = self.tables.get(DEFAULT_LOCALE)
+        chain = []
+        while start is not None and start >= 0 and start not in chain:
+            chain.append(start)
+            start = self._parents[start]
+        return chain
+
+    def lookup(self, key, chain):
+        key_id = self.keys.get(key)
+        if key_id is None:
+            return None
+        for table_id in chain:
+            string_id = _U32.unpack_from(self._mm, self._values_at + (table_id * self.key_count + key_id) * _U32.size)[0]
+            if string_id != MISSING:
+                return self._string(string_id)
+        return None
+
+    def translate(self, key, region=None, language=None, default=None, **params):
+        # Placeholders use the i18next "{{name}}" syntax shared with the frontend locales.
+        text = self.lookup(key, self.chain(region, language))
+        if text is None:
+            text = default if default is not None else key
+        if params:
+            text = PLACEHOLDER_PATTERN.sub(lambda m: str(params[m.group(1)]) if m.group(1) in params else m.group(0), text)
+        return text
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_bundle(path=None, regions_data=None, refresh=True):
+    # With refresh, the bundle is rebuilt from the current sources first; compile_bundle leaves the
+    # file alone when nothing changed, so an up-to-date bundle is never rewritten.
+    path = path or bundle_path
+    if refresh:
+        compile_bundle(path, regions_data)
+    return LocaleBundle(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile locale and vault string tables into one memory-mapped bundle.")
+    parser.add_argument("--lookup", metavar="KEY", help="Look up KEY in the compiled bundle instead of compiling.")
+    parser.add_argument("--region", help="Vault region code to resolve --lookup for.")
+    parser.add_argument("--language", help="Language to resolve --lookup for (when the vault has no table).")
+    args = parser.parse_args()
+
+    if args.lookup:
+        with open_bundle() as bundle:
+            print(bundle.translate(args.lookup, region=args.region, language=args.language))
+    else:
+        compile_bundle()
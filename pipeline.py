@@ -0,0 +1,226 @@
+import argparse
+import fnmatch
+import glob
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from atomic_io import atomic_write_json
+from json_codec import JSONDecodeError, load_file
+
+pipeline_state_path = os.environ.get("CRYPDNA_PIPELINE_STATE", ".pipeline_state.json")
+
+STATE_VERSION = 1
+
+
+class StageFailed(Exception):
+    pass
+
+
+class Stage:
+    # inputs/outputs are glob patterns; the DAG is derived from which outputs feed which inputs.
+    # run() must return None only on failure: the wrapped scripts print their error and return None.
+    def __init__(self, name, run, inputs, outputs):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def feeds(self, other):
+        return self is not other and any(
+            output == pattern or fnmatch.fnmatch(output, pattern) or fnmatch.fnmatch(pattern, output)
+            for output in self.outputs for pattern in other.inputs)
+
+
+def resolve_paths(patterns):
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern)
+        # A literal path that does not exist still counts, so creating it later changes the digest.
+        paths.update(matches if matches or glob.has_magic(pattern) else [pattern])
+    return sorted(paths)
+
+
+def content_digest(patterns):
+    digest = hashlib.sha256()
+    for path in resolve_paths(patterns):
+        digest.update(path.encode("utf-8") + b"\0")
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        except (FileNotFoundError, IsADirectoryError):
+            digest.update(b"<missing>")
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def outputs_present(stage):
+    return all(glob.glob(pattern) for pattern in stage.outputs)
+
+
+def load_state():
+    try:
+        state = load_file(pipeline_state_path)
+    except (FileNotFoundError, JSONDecodeError):
+        return {}
+    return state.get("stages", {}) if state.get("version") == STATE_VERSION else {}
+
+
+def build_dag(stages):
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Stage names must be unique")
+    upstream = {stage.name: {other.name for other in stages if other.feeds(stage)} for stage in stages}
+
+    # Kahn's algorithm, only to reject cycles up front.
+    remaining = {name: set(deps) for name, deps in upstream.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Stage dependency cycle among: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return upstream
+
+
+def is_up_to_date(stage, record):
+    # Fresh only if the inputs hash the same as after the last successful run and the
+    # outputs are still exactly what that run produced.
+    return (record is not None and outputs_present(stage)
+            and record.get("inputs") == content_digest(stage.inputs)
+            and record.get("outputs") == content_digest(stage.outputs))
+
+
+def run_pipeline(stages, force=False, only=None, max_workers=4):
+    # Runs every stage whose inputs or outputs changed, in dependency order; stages on
+    # independent branches run concurrently. Returns {stage name: ran/skipped/failed/blocked}.
+    upstream = build_dag(stages)
+    by_name = {stage.name: stage for stage in stages}
+    if only:
+        unknown = set(only) - set(by_name)
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    state = load_state()
+    state_lock = threading.Lock()
+    results = {}
+
+    def execute(stage):
+        record = state.get(stage.name)
+        selected = not only or stage.name in only
+        if not selected or (not force and is_up_to_date(stage, record)):
+            return "skipped", 0.0
+        started = time.monotonic()
+        try:
+            if stage.run() is None:
+                raise StageFailed("the stage reported an error")
+            missing = [pattern for pattern in stage.outputs if not glob.glob(pattern)]
+            if missing:
+                raise StageFailed(f"declared outputs missing: {', '.join(missing)}")
+        except Exception:
+            # Forget the last good run, so a failed stage is never skipped as up to date afterwards.
+            with state_lock:
+                if state.pop(stage.name, None) is not None:
+                    atomic_write_json(pipeline_state_path, {"version": STATE_VERSION, "stages": state})
+            raise
+        elapsed = time.monotonic() - started
+        # Digest inputs after the run: stages such as link rewrite files they also read.
+        with state_lock:
+            state[stage.name] = {"inputs": content_digest(stage.inputs), "outputs": content_digest(stage.outputs),
+                                 "finished_at": time.time(), "seconds": round(elapsed, 3)}
+            atomic_write_json(pipeline_state_path, {"version": STATE_VERSION, "stages": state})
+        return "ran", elapsed
+
+    pending = dict(upstream)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running = {}
+        while pending or running:
+            for name in [name for name, deps in pending.items() if deps <= set(results)]:
+                del pending[name]
+                if any(results[dep] in ("failed", "blocked") for dep in upstream[name]):
+                    results[name] = "blocked"
+                    print(f"[pipeline] {name}: blocked by a failed upstream stage")
+                    continue
+                running[executor.submit(execute, by_name[name])] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    outcome, elapsed = future.result()
+                except Exception as e:
+                    results[name] = "failed"
+                    print(f"[pipeline] {name}: failed: {type(e).__name__}: {e}")
+                    continue
+                results[name] = outcome
+                print(f"[pipeline] {name}: {'up to date' if outcome == 'skipped' else f'ran in {elapsed:.2f}s'}")
+    return {stage.name: results[stage.name] for stage in stages}
+
+
+def default_stages():
+    # Imported here so `pipeline.py --list` and DAG checks stay cheap.
+    import commercial_log
+    import create_credit_adapters
+    import generate_adapter_registry
+    import generate_credit_report
+    import generate_integration_report
+    import link_registry_to_vaults
+    import locale_bundle
+    import region_catalog
+    import simulate_kimi_commercials
+
+    regions = [region_catalog.regions_data_path, "region_catalog.py"]
+    adapters = os.path.join(create_credit_adapters.credit_adapters_dir, "*_adapter.json")
+    vault_configs = os.path.join(link_registry_to_vaults.vaults_dir, "*", "config.json")
+
+    return [
+        Stage("create-adapters", create_credit_adapters.create_credit_adapters,
+              inputs=regions + ["create_credit_adapters.py"],
+              outputs=[adapters]),
+        Stage("registry", generate_adapter_registry.generate_adapter_registry,
+              inputs=[adapters, "generate_adapter_registry.py"],
+              outputs=generate_adapter_registry.registry_paths),
+        Stage("link", link_registry_to_vaults.link_registry_to_vaults,
+              inputs=regions + [link_registry_to_vaults.adapter_registry_path, vault_configs, "link_registry_to_vaults.py"],
+              outputs=[vault_configs]),
+        Stage("credit-report", generate_credit_report.generate_credit_report,
+              inputs=regions + [adapters, os.path.join("vaults", "*", "tradeline_metadata.json"),
+                                "generate_credit_report.py", "adapter_table.py", "report_writer.py"],
+              outputs=[generate_credit_report.output_report_path]),
+        Stage("locale-bundle", locale_bundle.compile_bundle,
+              inputs=regions + [os.path.join(locale_bundle.locales_dir, "*", "translation.json"),
+                                os.path.join(locale_bundle.vaults_dir, "*", "ui", "strings.json"), "locale_bundle.py"],
+              outputs=[locale_bundle.bundle_path]),
+        Stage("commercials", simulate_kimi_commercials.simulate_commercial_generation_and_localization,
+              inputs=regions + [locale_bundle.bundle_path, "simulate_kimi_commercials.py", "asset_store.py", "commercial_log.py"],
+              outputs=[commercial_log.commercial_log_path]),
+        Stage("integration-report", generate_integration_report.generate_report,
+              inputs=[commercial_log.commercial_log_path, "generate_integration_report.py", "commercial_log.py", "report_writer.py"],
+              outputs=[generate_integration_report.output_report_path])
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild only the stale adapter, registry, report and commercial outputs.")
+    parser.add_argument("stages", nargs="*", help="Limit the run to these stages (default: all).")
+    parser.add_argument("--force", action="store_true", help="Run stages even if their inputs are unchanged.")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of stages running at once.")
+    parser.add_argument("--list", action="store_true", help="Print the stage DAG and exit.")
+    args = parser.parse_args()
+
+    stages = default_stages()
+    if args.list:
+        for name, deps in build_dag(stages).items():
+            print(f"{name} <- {', '.join(sorted(deps)) or '(sources)'}")
+    else:
+        started = time.monotonic()
+        results = run_pipeline(stages, force=args.force, only=args.stages, max_workers=args.workers)
+        counts = {outcome: sum(1 for result in results.values() if result == outcome) for outcome in ("ran", "skipped", "failed", "blocked")}
+        print(f"Pipeline finished in {time.monotonic() - started:.2f}s: " + ", ".join(f"{count} {outcome}" for outcome, count in counts.items()))
+        if counts["failed"] or counts["blocked"]:
+            raise SystemExit(1)
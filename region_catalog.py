@@ -0,0 +1,170 @@
+import hashlib
+import os
+from types import MappingProxyType
+
+from atomic_io import atomic_write_json
+from instrumentation import span, traced
+from json_codec import JSONDecodeError, load_file, loads
+
+regions_data_path = os.environ.get("CRYPDNA_REGIONS_DATA", "/home/ubuntu/regions_data.json")
+# The compiled-catalog cache lives in the user's cache directory, one JSON file per catalog path,
+# never in the working directory.
+catalog_cache_dir = os.environ.get("CRYPDNA_REGION_CACHE_DIR") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "crypdna")
+
+CATALOG_CACHE_VERSION = 2
+SUBDOMAIN_SUFFIX = "crypdawgs.com"
+
+# Subdomain prefixes for every region we deploy, including regions that are not
+# (yet) listed in regions_data.json. Regions missing here use their own code.
+SUBDOMAIN_MAP = {
+    "us": "usa", "ae": "dubai", "jp": "jp", "uk": "uk", "de": "de", "fr": "fr",
+    "ca": "ca", "kr": "kr", "ch": "ch", "it": "it", "es": "es", "sg": "sg",
+    "my": "my", "nl": "nl", "au": "au", "nz": "nz", "se": "se", "no": "no",
+    "pl": "pl", "be": "be", "at": "at", "dk": "dk", "ie": "ie", "il": "il",
+    "fi": "fi", "pt": "pt", "hk": "hk", "cz": "cz",
+    "ng": "ng", "br": "br", "mx": "mx", "sa": "sa", "in": "in", "cn": "cn",
+    "za": "za", "ar": "ar", "th": "th", "tr": "tr", "ru": "ru", "vn": "vn",
+    "id": "id"
+}
+
+# Per-process memo: absolute source path -> (mtime_ns, size, read-only regions)
+_loaded_catalogs = {}
+
+
+def subdomain_for(region_code):
+    prefix = SUBDOMAIN_MAP.get(region_code.lower(), region_code.lower())
+    return f"{prefix}.{SUBDOMAIN_SUFFIX}"
+
+
+def _validate_regions(raw_data, source_path):
+    if not isinstance(raw_data, dict):
+        print(f"Error: {source_path} must contain a JSON object keyed by region code.")
+        return None
+
+    regions = {}
+    for region_code, data in raw_data.items():
+        code = region_code.strip().lower() if isinstance(region_code, str) else ""
+        if not code:
+            print(f"Warning: Skipping invalid region code {region_code!r} in {source_path}.")
+            continue
+        if not isinstance(data, dict):
+            print(f"Warning: Skipping region {code.upper()} in {source_path}: entry is not an object.")
+            continue
+        if code in regions:
+            print(f"Warning: Duplicate region {code.upper()} in {source_path}. Keeping the first entry.")
+            continue
+
+        entry = dict(data)
+        entry.setdefault("subdomain_prefix", SUBDOMAIN_MAP.get(code, code))
+        entry.setdefault("subdomain", f"{entry['subdomain_prefix']}.{SUBDOMAIN_SUFFIX}")
+        regions[code] = entry
+    return regions
+
+
+def _read_only(value):
+    # The memo is shared by every caller in the process, so it is handed out immutable.
+    if isinstance(value, dict):
+        return MappingProxyType({key: _read_only(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_read_only(item) for item in value)
+    return value
+
+
+def cache_path_for(source_path):
+    return os.path.join(catalog_cache_dir, f"region_catalog-{hashlib.sha256(source_path.encode('utf-8')).hexdigest()[:16]}.json")
+
+
+def _read_cache(source_path):
+    try:
+        cache = load_file(cache_path_for(source_path))
+    except (OSError, JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != CATALOG_CACHE_VERSION:
+        return None
+    if cache.get("source_path") != source_path or not isinstance(cache.get("regions"), dict):
+        return None
+    return cache
+
+
+def _write_cache(cache):
+    cache_path = cache_path_for(cache["source_path"])
+    try:
+        atomic_write_json(cache_path, cache, indent=None)
+    except OSError as e:
+        # The cache is an optimisation only; a failed write just means a cold parse next run.
+        print(f"Warning: Could not write region catalog cache {cache_path}: {e}")
+
+
+@traced("region_catalog.load_regions")
+def load_regions(path=None):
+    source_path = os.path.abspath(path or regions_data_path)
+
+    try:
+        stat = os.stat(source_path)
+    except FileNotFoundError:
+        print(f"Error: {source_path} not found. Please ensure regions_data.json exists.")
+        return None
+
+    memo = _loaded_catalogs.get(source_path)
+    if memo and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+        return memo[2]
+
+    cache = _read_cache(source_path)
+    if cache and cache.get("mtime_ns") == stat.st_mtime_ns and cache.get("size") == stat.st_size:
+        regions = _read_only(cache["regions"])
+        _loaded_catalogs[source_path] = (stat.st_mtime_ns, stat.st_size, regions)
+        return regions
+
+    with open(source_path, "rb") as f:
+        raw_bytes = f.read()
+    digest = hashlib.sha256(raw_bytes).hexdigest()
+
+    if cache and cache.get("sha256") == digest:
+        # Touched but not edited: keep the compiled catalog, refresh the mtime key.
+        regions = cache["regions"]
+    else:
+        try:
+            with span("region_catalog.parse_json", bytes=len(raw_bytes)):
+                raw_data = loads(raw_bytes)
+        except (JSONDecodeError, UnicodeDecodeError):
+            print(f"Error: Could not decode JSON from {source_path}. Check file format.")
+            return None
+        regions = _validate_regions(raw_data, source_path)
+        if regions is None:
+            return None
+
+    _write_cache({
+        "version": CATALOG_CACHE_VERSION,
+        "source_path": source_path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": digest,
+        "regions": regions
+    })
+    regions = _read_only(regions)
+    _loaded_catalogs[source_path] = (stat.st_mtime_ns, stat.st_size, regions)
+    return regions
+
+
+def get_region(region_code, path=None):
+    regions = load_regions(path)
+    if regions is None:
+        return None
+    return regions.get(region_code.lower())
+
+
+def all_region_codes(path=None, include_subdomain_map=False):
+    regions = load_regions(path) or {}
+    codes = set(regions)
+    if include_subdomain_map:
+        codes.update(SUBDOMAIN_MAP)
+    return sorted(codes)
+
+
+if __name__ == "__main__":
+    regions = load_regions()
+    if regions is not None:
+        print(f"Loaded {len(regions)} regions from {regions_data_path}")
+        for region_code in sorted(regions):
+            print(f"  {region_code.upper():<4} {regions[region_code]['subdomain']}")
@@ -0,0 +1,140 @@
+import csv
+import io
+import os
+import tempfile
+
+from atomic_io import replace_keeping_mode
+from instrumentation import traced
+from json_codec import dumps
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class _StreamingFile:
+    # Buffered output that lands at `path` only once the writer is closed cleanly,
+    # so an interrupted report never replaces the previous one with a partial file.
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER_SIZE, newline=None):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        self._file = io.open(fd, "w", encoding="utf-8", buffering=buffer_size, newline=newline)
+
+    def close(self, commit=True):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if commit:
+            replace_keeping_mode(self._tmp_path, self.path)
+        else:
+            os.unlink(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+        return False
+
+
+class CsvTableWriter(_StreamingFile):
+    def __init__(self, path, columns, buffer_size=DEFAULT_BUFFER_SIZE):
+        super().__init__(path, buffer_size, newline="")
+        self.columns = columns
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([title for _, title, _ in columns])
+
+    def row(self, values):
+        self._writer.writerow(values)
+
+
+class JsonlTableWriter(_StreamingFile):
+    def __init__(self, path, columns, buffer_size=DEFAULT_BUFFER_SIZE):
+        super().__init__(path, buffer_size)
+        self.keys = [key for key, _, _ in columns]
+
+    def row(self, values):
+        self._file.write(dumps(dict(zip(self.keys, values))).decode("utf-8"))
+        self._file.write("\n")
+
+
+class JsonArrayWriter(_StreamingFile):
+    # Streams items into a JSON array laid out exactly like json.dump(items, f, indent=2),
+    # or with compact=True one compact item per line (for machine-only logs).
+    def __init__(self, path, buffer_size=DEFAULT_BUFFER_SIZE, compact=False):
+        super().__init__(path, buffer_size)
+        self.compact = compact
+        self.count = 0
+        self._file.write("[")
+
+    def append(self, item):
+        if self.compact:
+            self._file.write(",\n" if self.count else "\n")
+            self._file.write(dumps(item).decode("utf-8"))
+        else:
+            self._file.write(",\n  " if self.count else "\n  ")
+            self._file.write(dumps(item, pretty=True).decode("utf-8").replace("\n", "\n  "))
+        self.count += 1
+
+    def close(self, commit=True):
+        if self._file is not None:
+            self._file.write("\n]" if self.count else "]")
+        super().close(commit)
+
+
+TABLE_WRITERS = {
+    ".csv": CsvTableWriter,
+    ".jsonl": JsonlTableWriter
+}
+
+
+def open_table_writer(path, columns, buffer_size=DEFAULT_BUFFER_SIZE):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in TABLE_WRITERS:
+        raise ValueError(f"Unsupported table export format for {path}; use one of {', '.join(TABLE_WRITERS)}")
+    return TABLE_WRITERS[extension](path, columns, buffer_size)
+
+
+class MarkdownReportWriter(_StreamingFile):
+    def write(self, text):
+        self._file.write(text)
+
+    def line(self, text=""):
+        self._file.write(text)
+        self._file.write("\n")
+
+    def heading(self, text, level=2):
+        self.line(f"{'#' * level} {text}")
+        self.line()
+
+    def paragraph(self, text):
+        self.line(text)
+        self.line()
+
+    def bullets(self, items):
+        for item in items:
+            self.line(f"- {item}")
+        self.line()
+
+    @traced("report_writer.table")
+    def table(self, columns, rows, exports=()):
+        # columns: [(key, title, width)]; rows: any iterable of value sequences.
+        # Rows are formatted and flushed one at a time and mirrored to any CSV/JSONL exports.
+        exporters = [open_table_writer(path, columns) for path in exports]
+        committed = False
+        try:
+            self.line("| " + " | ".join(f"{title:<{width}}" for _, title, width in columns) + " |")
+            self.line("| " + " | ".join(":" + "-" * (max(width, 2) - 1) for _, _, width in columns) + " |")
+            count = 0
+            for values in rows:
+                self.line("| " + " | ".join(f"{str(value):<{width}}" for (_, _, width), value in zip(columns, values)) + " |")
+                for exporter in exporters:
+                    exporter.row(values)
+                count += 1
+            committed = True
+        finally:
+            for exporter in exporters:
+                exporter.close(commit=committed)
+        self.line()
+        return count
@@ -1,45 +1,66 @@
 
-import json
+import argparse
 import os
 import datetime
 
-regions_data_path = "/home/ubuntu/regions_data.json"
+from instrumentation import span, traced
+from region_catalog import load_regions
+from report_writer import MarkdownReportWriter
+from vault_manifest import changed_vaults, describe_change, plan_deploy, record_deployed_manifests
+
 output_report_path = "/home/ubuntu/Vault_Status_Report.md"
 
-def generate_vault_status_report(regions_data):
-    report_content = "## CrypDNA Global Vault Activation Status Report\n\n"
-    report_content += "This report summarizes the simulated deployment readiness and activation status of all regional CrypDNA Vault instances. Due to the sandboxed environment, direct deployment to external platforms like Netlify or Vercel is not possible. However, this simulation confirms the architectural readiness for deployment.\n\n"
-    report_content += "### Simulated Deployment Status\n\n"
-    report_content += "Each regional Vault is assumed to have successfully completed its production build and is ready for deployment. The subdomain mapping and Netlify API connection are simulated as successful, indicating that each Vault is prepared to go live.\n\n"
-    report_content += "### Regional Vaults and Mapped Subdomains\n\n"
-    report_content += "The following table outlines the regions, their simulated subdomain mappings, and their activation status:\n\n"
-    report_content += "| Region Code | Mapped Subdomain          | Activation Status    | Notes                                  |\n"
-    report_content += "| :---------- | :------------------------ | :------------------- | :------------------------------------- |\n"
+STATUS_TABLE_COLUMNS = [
+    ("region_code", "Region Code", 11),
+    ("subdomain", "Mapped Subdomain", 25),
+    ("activation_status", "Activation Status", 20),
+    ("manifest", "Manifest vs Last Deploy", 23),
+    ("notes", "Notes", 38)
+]
+
 
+def vault_status_rows(regions_data, manifest_diff=None):
+    manifest_diff = manifest_diff or {}
     for region_code, data in regions_data.items():
-        subdomain = f"{region_code}.crypdawgs.com"
+        subdomain = data["subdomain"]
         status = "Live and Accessible (Simulated)"
+        manifest = describe_change(manifest_diff.get(region_code))
         notes = "" if data.get("status") == "active" else "Dormant Vault: Adapter in standby"
-        report_content += f"| {region_code.upper()}          | {subdomain:<25} | {status:<20} | {notes:<38} |\n"
+        yield (region_code.upper(), subdomain, status, manifest, notes)
+
 
-    report_content += "\n### Deployment Verification (Simulated)\n\n"
-    report_content += "In a live deployment scenario, verification would involve checking each subdomain for successful loading of `index.html` and `assets` integrity. The simulated process confirms that these steps are architecturally sound and ready for execution on a real deployment platform.\n\n"
-    report_content += "### GitHub Commit and Tag (Simulated)\n\n"
-    report_content += f"A Git commit with the message `🌍 CrypDNA Global Vault Activation - All regional Vaults deployed.` and tag `v3.1-vault_activation` would be applied to the `crypdna-vault-genesis` repository upon successful deployment.\n\n"
-    report_content += "**Timestamp:** " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + "\n"
+@traced("simulate_deployment.report")
+def generate_vault_status_report(regions_data, table_exports=(), manifest_diff=None):
+    with MarkdownReportWriter(output_report_path) as report:
+        report.heading("CrypDNA Global Vault Activation Status Report")
+        report.paragraph("This report summarizes the simulated deployment readiness and activation status of all regional CrypDNA Vault instances. Due to the sandboxed environment, direct deployment to external platforms like Netlify or Vercel is not possible. However, this simulation confirms the architectural readiness for deployment.")
+        report.heading("Simulated Deployment Status", level=3)
+        report.paragraph("Each regional Vault is assumed to have successfully completed its production build and is ready for deployment. The subdomain mapping and Netlify API connection are simulated as successful, indicating that each Vault is prepared to go live.")
+        report.heading("Regional Vaults and Mapped Subdomains", level=3)
+        report.paragraph("The following table outlines the regions, their simulated subdomain mappings, and their activation status:")
+        report.table(STATUS_TABLE_COLUMNS, vault_status_rows(regions_data, manifest_diff), exports=table_exports)
+
+        report.heading("Deployment Verification (Simulated)", level=3)
+        report.paragraph("In a live deployment scenario, verification would involve checking each subdomain for successful loading of `index.html` and `assets` integrity. The simulated process confirms that these steps are architecturally sound and ready for execution on a real deployment platform.")
+        report.heading("GitHub Commit and Tag (Simulated)", level=3)
+        report.paragraph("A Git commit with the message `🌍 CrypDNA Global Vault Activation - All regional Vaults deployed.` and tag `v3.1-vault_activation` would be applied to the `crypdna-vault-genesis` repository upon successful deployment.")
+        report.line("**Timestamp:** " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    with open(output_report_path, "w") as f:
-        f.write(report_content)
     print(f"Vault Status Report generated at {output_report_path}")
 
-if __name__ == "__main__":
-    try:
-        with open(regions_data_path, "r") as f:
-            regions_data = json.load(f)
-        generate_vault_status_report(regions_data)
-    except FileNotFoundError:
-        print(f"Error: {regions_data_path} not found. Please ensure regions_data.json exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {regions_data_path}. Check file format.")
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the simulated Vault status report.")
+    parser.add_argument("--export", action="append", default=[], help="Also write the status table to a .csv or .jsonl file (repeatable).")
+    parser.add_argument("--record-manifest", action="store_true", help="Record the manifests of changed vaults as the deployed baseline.")
+    args = parser.parse_args()
+    regions_data = load_regions()
+    if regions_data is not None:
+        with span("simulate_deployment.plan_deploy"):
+            manifests, manifest_diff = plan_deploy(list(regions_data))
+        to_deploy = changed_vaults(manifest_diff)
+        print(f"{len(to_deploy)} of {len(manifests)} vault trees changed since the last deploy.")
+        generate_vault_status_report(regions_data, table_exports=args.export, manifest_diff=manifest_diff)
+        if args.record_manifest:
+            record_deployed_manifests(manifests, to_deploy)
 
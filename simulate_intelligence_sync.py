@@ -1,37 +1,93 @@
 
+import asyncio
 import datetime
 import random
+import re
 
-def simulate_github_webhook(repo_name, commit_tag, commit_type):
+from data_channel import ChannelPool, FileSink, HttpSink, LocalHttpStandIn
+from instrumentation import span, traced
+from webhook_ingest import WebhookIngestService, post_events
+
+DEPLOY_SERVER = "crypdawgs.com deployment server"
+
+def simulate_github_webhook(service, repo_name, commit_tag, commit_type):
+    # Routing is table-driven (commit type -> destination) inside the ingest service.
     print(f"\n--- GitHub Webhook Simulation: {repo_name} - {commit_tag} ({commit_type}) ---")
-    if commit_type == "creative":
-        print(f"  Forwarding creative commit to Kimi for content rendering...")
-        print(f"  Kimi received creative update for {repo_name} with tag {commit_tag}.")
-    elif commit_type == "backend":
-        print(f"  Forwarding backend commit to Manus for vault infrastructure updates...")
-        print(f"  Manus received backend update for {repo_name} with tag {commit_tag}.")
-    else:
+    result = service.submit({"repo": repo_name, "tag": commit_tag, "commit_type": commit_type})
+    if result == "queued":
+        print(f"  Forwarding {commit_type} commit to {service.routes[commit_type].capitalize()}...")
+    elif result == "unroutable":
         print(f"  Unknown commit type: {commit_type}. No action taken.")
+    else:
+        print(f"  Ingest queue full: {repo_name} {commit_tag} dropped.")
+    return result
 
-def simulate_data_channel(source, destination, data_type):
-    timestamp = datetime.datetime.now().isoformat()
-    print(f"  Data Channel: {source} -> {destination} - {data_type} data transferred at {timestamp}")
 
-if __name__ == "__main__":
-    print("\n--- Simulating GitHub Webhook Listener ---")
+async def simulate_webhook_listener():
+    service = WebhookIngestService()
+    await service.start()
     # Simulate creative commit
-    simulate_github_webhook("crypdna-vault-genesis", "v3.1-creative_update", "creative")
-    simulate_github_webhook("crypdna-translations", "v3.0-localized_aesthetic", "creative")
+    simulate_github_webhook(service, "crypdna-vault-genesis", "v3.1-creative_update", "creative")
+    simulate_github_webhook(service, "crypdna-translations", "v3.0-localized_aesthetic", "creative")
 
     # Simulate backend commit
-    simulate_github_webhook("crypdna-vault-genesis", "v3.2-infra_update", "backend")
+    simulate_github_webhook(service, "crypdna-vault-genesis", "v3.2-infra_update", "backend")
+    await service.drain()
+    await service.stop()
+
+
+async def _silent_destination(event):
+    pass
+
+
+async def simulate_webhook_burst(repo_count=1000):
+    # A mass re-tag across every vault repo, pushed through the local HTTP endpoint.
+    service = WebhookIngestService(destinations={"kimi": _silent_destination, "manus": _silent_destination})
+    host, port = await service.serve(port=0)
+    burst = [{"repository": {"name": f"crypdna-vault-{i:04d}"}, "ref": "refs/tags/v3.3-creative_update"} for i in range(repo_count)]
+    statuses = await post_events(host, port, burst)
+    await service.drain()
+    print(f"  Burst of {len(burst)} pushes: {statuses.count(202)} accepted, {statuses.count(503)} shed.")
+    print(f"  Ingest metrics: {service.metrics()}")
+    await service.stop()
+
+def channel_sink_factory(deploy_server):
+    # The deploy server is reached over pooled HTTP; every other destination uses the local file sink.
+    def sink_for(source, destination):
+        if destination == DEPLOY_SERVER:
+            return HttpSink(deploy_server.host, deploy_server.port, "/artifacts")
+        return FileSink(re.sub(r"[^a-z0-9]+", "_", f"{source}_to_{destination}".lower()).strip("_"))
+    return sink_for
+
+
+@traced("simulate_intelligence_sync.data_channel")
+def simulate_data_channel(channels, source, destination, data_type, records=1):
+    channel = channels.channel(source, destination)
+    for sequence in range(records):
+        channel.send({"type": data_type, "seq": sequence, "ts": datetime.datetime.now().isoformat()})
+    print(f"  Data Channel: {source} -> {destination} - {records} {data_type} record(s) queued on persistent channel")
+
+if __name__ == "__main__":
+    print("\n--- Simulating GitHub Webhook Listener ---")
+    with span("simulate_intelligence_sync.webhook_listener"):
+        asyncio.run(simulate_webhook_listener())
+    print("\n--- Simulating Webhook Burst ---")
+    with span("simulate_intelligence_sync.webhook_burst"):
+        asyncio.run(simulate_webhook_burst())
 
     print("\n--- Simulating Persistent Data Channels ---")
-    simulate_data_channel("Kimi's creative generator", "CrypDNA Vault Network", "creative assets")
-    simulate_data_channel("Manus's automation engine", "CrypDNA Vault Network", "infrastructure updates")
-    simulate_data_channel("Vault analytics (Supabase)", "Manus's automation engine", "performance data")
-    simulate_data_channel("CrypDNA Vault Network", "crypdawgs.com deployment server", "build artifacts")
-    simulate_data_channel("CrypDNA Vault Network", "Vault analytics (Supabase)", "user interaction logs")
+    with LocalHttpStandIn() as deploy_server:
+        channels = ChannelPool(channel_sink_factory(deploy_server))
+        simulate_data_channel(channels, "Kimi's creative generator", "CrypDNA Vault Network", "creative assets")
+        simulate_data_channel(channels, "Manus's automation engine", "CrypDNA Vault Network", "infrastructure updates")
+        simulate_data_channel(channels, "Vault analytics (Supabase)", "Manus's automation engine", "performance data")
+        simulate_data_channel(channels, "CrypDNA Vault Network", DEPLOY_SERVER, "build artifacts", records=50)
+        simulate_data_channel(channels, "CrypDNA Vault Network", "Vault analytics (Supabase)", "user interaction logs", records=20000)
+        channels.close()
+        for name, stats in channels.stats().items():
+            print(f"  {name}: {stats['records']} records in {stats['batches']} batches, "
+                  f"{stats['compression_ratio']}x compression, p95 latency {stats['record_latency_ms']['p95']} ms")
+        print(f"  Deploy server stand-in received: {deploy_server.received}")
 
     print("\nContinuous communication simulation complete.")
 
@@ -1,75 +1,142 @@
-
-import json
+import argparse
+import hashlib
 import os
+import re
 import datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+from asset_store import store_file, write_plain
+from commercial_log import CommercialLogWriter, commercial_log_path
+from instrumentation import traced
+from json_codec import dumps, load_file
+from locale_bundle import open_bundle
+from region_catalog import load_regions
+
+brand_assets_dir = "assets/brand"
+
+DEFAULT_CRYPMERCIAL_THEMES = ["Painite", "Vicuña", "Meteorite"]
+DEFAULT_WORKERS = 8
+
+
+def load_themes(themes_file):
+    themes = load_file(themes_file)
+    if not isinstance(themes, list) or not all(isinstance(theme, str) and theme for theme in themes):
+        raise ValueError(f"{themes_file} must contain a JSON array of theme names.")
+    return themes
+
+
+def theme_filename(theme):
+    # Themes come from the command line or a themes file, so they never reach a path unfiltered:
+    # anything but letters, digits, "-" and "_" becomes "_" ("Vicuña" -> "vicuña_crypmercial.json").
+    slug = re.sub(r"[^\w-]+", "_", theme.lower()).strip("_.")
+    if not slug:
+        slug = "theme_" + hashlib.sha1(theme.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}_crypmercial.json"
+
+
+def commercial_work_items(regions_data, themes):
+    # Produced lazily so only the in-flight window of (region, theme) pairs is ever materialised.
+    for region_code, data in regions_data.items():
+        crypmercial_dir = f"vaults/{region_code}/assets/crypmercials/"
+        os.makedirs(crypmercial_dir, exist_ok=True)
+        for theme in themes:
+            yield region_code, data, theme, crypmercial_dir
+
 
-regions_data_path = "/home/ubuntu/regions_data.json"
+@traced("simulate_kimi_commercials.generate_commercial")
+def generate_commercial(work_item, scheduled_post_date, bundle):
+    region_code, data, theme, crypmercial_dir = work_item
+    region_name = region_code.upper()
+    language = data.get("language", "en")
+    currency_symbol = data.get("currency_symbol", "$")
+    currency_iso = data.get("currency_iso", "USD")
 
-def simulate_commercial_generation_and_localization():
+    commercial_content = {
+        "region": region_name,
+        "language": language,
+        "currency": currency_iso,
+        "theme": theme,
+        # Resolved vault -> language -> en from the compiled locale bundle (see locale_bundle.BACKEND_STRINGS).
+        "ad_copy": bundle.translate("crypmercial_ad_copy", region=region_code, language=language,
+                                    theme=theme, lang=language.upper(), price=f"{currency_symbol}100"),
+        "video_url": f"https://media.crypdawgs.com/{region_code}/{theme}_commercial.mp4",
+        "scheduled_post_date": scheduled_post_date
+    }
+
+    # Unique per region, so a plain file served as-is; rewritten only when the payload changes.
+    commercial_file_path = os.path.join(crypmercial_dir, theme_filename(theme))
+    write_plain(commercial_file_path, dumps(commercial_content, pretty=True))
+
+    return {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "region": region_name,
+        "theme": theme,
+        "status": "Generated and Localized",
+        "output_file": commercial_file_path,
+        "scheduled_post": scheduled_post_date
+    }
+
+
+def generate_commercials(regions_data, themes, bundle, max_workers=DEFAULT_WORKERS):
+    # Yields log entries as commercials complete, keeping at most 2x workers items in flight.
+    scheduled_post_date = (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
+    work_items = commercial_work_items(regions_data, themes)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = set()
+        for work_item in work_items:
+            in_flight.add(executor.submit(generate_commercial, work_item, scheduled_post_date, bundle))
+            if len(in_flight) >= max_workers * 2:
+                # Whichever finished first frees a slot; one slow commercial no longer stalls the window.
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(in_flight):
+            yield future.result()
+
+
+def write_brand_asset(region_codes):
+    # Simulate pulling brand assets (already created as placeholders): one stable, deduplicated file per run
+    brand_asset_path = os.path.join(brand_assets_dir, "dummy_asset.txt")
+    content = f"Simulated brand asset for {', '.join(code.upper() for code in region_codes)}"
+    store_file(brand_asset_path, content.encode("utf-8"))
+    return brand_asset_path
+
+
+@traced("simulate_kimi_commercials")
+def simulate_commercial_generation_and_localization(themes=None, max_workers=DEFAULT_WORKERS, log_path=commercial_log_path):
     print("Simulating AI-driven commercial generation and localization...")
 
-    try:
-        with open(regions_data_path, "r") as f:
-            regions_data = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: {regions_data_path} not found. Cannot simulate commercial generation.")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {regions_data_path}. Check file format.")
+    regions_data = load_regions()
+    if regions_data is None:
+        print("Cannot simulate commercial generation without the region catalog.")
         return
 
-    crypmercial_themes = ["Painite", "Vicuña", "Meteorite"]
-    commercial_generation_logs = []
+    themes = themes or DEFAULT_CRYPMERCIAL_THEMES
+    write_brand_asset(regions_data.keys())
+
+    # Appended to the JSONL log as each commercial completes.
+    with open_bundle(regions_data=regions_data) as bundle, CommercialLogWriter(log_path) as log_writer:
+        for log_entry in generate_commercials(regions_data, themes, bundle, max_workers):
+            log_writer.append(log_entry)
+
+    print(f"AI-driven commercial generation and localization simulated successfully ({log_writer.count} commercials, {len(themes)} themes, {max_workers} workers).")
+    return log_writer.count
 
-    for region_code, data in regions_data.items():
-        region_name = region_code.upper()
-        language = data.get("language", "en")
-        currency_symbol = data.get("currency_symbol", "$")
-        currency_iso = data.get("currency_iso", "USD")
-
-        # Simulate pulling brand assets (already created as placeholders)
-        brand_asset_path = f"assets/brand/dummy_asset_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt"
-        if not os.path.exists(os.path.dirname(brand_asset_path)):
-            os.makedirs(os.path.dirname(brand_asset_path))
-        with open(brand_asset_path, "w") as f:
-            f.write(f"Simulated brand asset for {region_name}")
-
-        # Simulate generating regionalized Crypmercials
-        for theme in crypmercial_themes:
-            commercial_content = {
-                "region": region_name,
-                "language": language,
-                "currency": currency_iso,
-                "theme": theme,
-                "ad_copy": f"Experience the {theme} Crypmercial in {language.upper()}! Unlock your future with CrypDNA. Prices starting from {currency_symbol}100.",
-                "video_url": f"https://media.crypdawgs.com/{region_code}/{theme}_commercial.mp4",
-                "scheduled_post_date": (datetime.date.today() + datetime.timedelta(days=7)).isoformat()
-            }
-            
-            crypmercial_dir = f"vaults/{region_code}/assets/crypmercials/"
-            os.makedirs(crypmercial_dir, exist_ok=True)
-            commercial_file_path = os.path.join(crypmercial_dir, f"{theme.lower()}_crypmercial.json")
-            with open(commercial_file_path, "w") as f:
-                json.dump(commercial_content, f, indent=2)
-
-            log_entry = {
-                "timestamp": datetime.datetime.now().isoformat(),
-                "region": region_name,
-                "theme": theme,
-                "status": "Generated and Localized",
-                "output_file": commercial_file_path,
-                "scheduled_post": commercial_content["scheduled_post_date"]
-            }
-            commercial_generation_logs.append(log_entry)
-
-    print("AI-driven commercial generation and localization simulated successfully.")
-    return commercial_generation_logs
 
 if __name__ == "__main__":
-    logs = simulate_commercial_generation_and_localization()
-    # Optionally save logs to a file for the report
-    with open("commercial_generation_logs.json", "w") as f:
-        json.dump(logs, f, indent=2)
-    print(f"Commercial generation logs saved to commercial_generation_logs.json")
+    parser = argparse.ArgumentParser(description="Generate localized Crypmercials for every region.")
+    parser.add_argument("--themes", help="Comma-separated theme names (default: Painite,Vicuña,Meteorite).")
+    parser.add_argument("--themes-file", help="JSON file with an array of theme names.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of generator threads.")
+    args = parser.parse_args()
 
+    themes = None
+    if args.themes_file:
+        themes = load_themes(args.themes_file)
+    elif args.themes:
+        themes = [theme.strip() for theme in args.themes.split(",") if theme.strip()]
 
+    count = simulate_commercial_generation_and_localization(themes=themes, max_workers=max(1, args.workers))
+    if count is None:
+        raise SystemExit(1)
+    print(f"Commercial generation logs appended to {commercial_log_path}")
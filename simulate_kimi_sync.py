@@ -1,8 +1,10 @@
 
-import json
 import os
-import datetime
 
+from asset_store import store_file
+from instrumentation import span, traced
+
+@traced("simulate_kimi_sync")
 def simulate_kimi_connection_and_sync():
     print("Simulating Kimi connection to CrypDNA Vault ecosystem...")
     # Simulate connection using dummy credentials
@@ -19,11 +21,10 @@ def simulate_kimi_connection_and_sync():
 
     sync_results = {}
     for adir in asset_dirs:
-        # Simulate creation of a dummy file in each directory to show sync
-        dummy_file_path = os.path.join(adir, f"dummy_asset_{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}.txt")
-        os.makedirs(adir, exist_ok=True)
-        with open(dummy_file_path, "w") as f:
-            f.write("Simulated asset content.")
+        # Simulate a dummy file in each directory to show sync; identical content shares one blob
+        dummy_file_path = os.path.join(adir, "dummy_asset.txt")
+        with span("simulate_kimi_sync.asset_dir", dir=adir):
+            store_file(dummy_file_path, b"Simulated asset content.")
         sync_results[adir] = f"Synced: {dummy_file_path}"
         print(f"Simulated sync for {adir}")
     
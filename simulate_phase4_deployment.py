@@ -1,67 +1,124 @@
 
-import json
+import argparse
 import os
 import datetime
 
-regions_data_path = "/home/ubuntu/regions_data.json"
+from design_genome import resolve_all
+from health_probe import run_probes
+from instrumentation import span, traced
+from region_catalog import SUBDOMAIN_MAP, load_regions, subdomain_for
+from report_writer import MarkdownReportWriter
+from vault_manifest import changed_vaults, describe_change, plan_deploy, record_deployed_manifests
+
 output_report_path = "/home/ubuntu/crypdna-vault-genesis/Vault_Status_Report.md"
 
-def generate_vault_status_report(regions_data):
-    report_content = "## CrypDNA Global Vault Activation Status Report (v4.0)\n\n"
-    report_content += "This report summarizes the simulated deployment and verification of all regional CrypDNA Vault instances. Due to the sandboxed environment, direct deployment to external platforms like Netlify or Vercel with live DNS and SSL automation is not possible. However, this simulation confirms the architectural readiness and successful (simulated) activation for deployment.\n\n"
-    report_content += "### Simulated Deployment Status\n\n"
-    report_content += "Each regional Vault is assumed to have successfully completed its production build and is now (simulated) deployed to its respective subdomain. The subdomain mapping, Netlify API connection, SSL certificate auto-generation, and DNS propagation validation are all simulated as successful, indicating that each Vault is live and accessible.\n\n"
-    report_content += "### Regional Vaults and Mapped Subdomains\n\n"
-    report_content += "The following table outlines the regions, their simulated subdomain mappings, and their activation status:\n\n"
-    report_content += "| Region Code | Mapped Subdomain          | Activation Status    | SSL Status (Simulated) | DNS Status (Simulated) | Netlify Deploy (Simulated) |\n"
-    report_content += "| :---------- | :------------------------ | :------------------- | :--------------------- | :--------------------- | :------------------------- |\n"
-
-    subdomain_map = {
-        "us": "usa", "ae": "dubai", "jp": "jp", "uk": "uk", "de": "de", "fr": "fr",
-        "ca": "ca", "kr": "kr", "ch": "ch", "it": "it", "es": "es", "sg": "sg",
-        "my": "my", "nl": "nl", "au": "au", "nz": "nz", "se": "se", "no": "no",
-        "pl": "pl", "be": "be", "at": "at", "dk": "dk", "ie": "ie", "il": "il",
-        "fi": "fi", "pt": "pt", "hk": "hk", "cz": "cz",
-        # Additional regions from the prompt that might not be in regions_data.json
-        "ng": "ng", "br": "br", "mx": "mx", "sa": "sa", "in": "in", "cn": "cn",
-        "za": "za", "ar": "ar", "th": "th", "tr": "tr", "ru": "ru", "vn": "vn",
-        "id": "id"
-    }
-
-    # Combine regions from regions_data.json and the prompt to ensure all are covered
-    all_regions = list(regions_data.keys()) + [r for r in subdomain_map.keys() if r not in regions_data]
-    all_regions = sorted(list(set(all_regions))) # Remove duplicates and sort
-
-    for region_code in all_regions:
-        subdomain_prefix = subdomain_map.get(region_code, region_code) # Use region_code if not explicitly mapped
-        subdomain = f"{subdomain_prefix}.crypdawgs.com"
+STATUS_TABLE_COLUMNS = [
+    ("region_code", "Region Code", 11),
+    ("subdomain", "Mapped Subdomain", 25),
+    ("activation_status", "Activation Status", 20),
+    ("ssl_status", "SSL Status (Simulated)", 22),
+    ("dns_status", "DNS Status (Simulated)", 22),
+    ("netlify_deploy", "Netlify Deploy (Simulated)", 26),
+    ("manifest", "Manifest vs Last Deploy", 23)
+]
+
+# Used instead of STATUS_TABLE_COLUMNS when a health probe ran: the deploy column carries real results.
+PROBED_STATUS_TABLE_COLUMNS = STATUS_TABLE_COLUMNS[:5] + [
+    ("netlify_deploy", "Deploy Probe", 26),
+    ("latency_p50", "p50 ms", 8),
+    ("latency_p95", "p95 ms", 8),
+    ("latency_p99", "p99 ms", 8),
+    STATUS_TABLE_COLUMNS[6]
+]
+
+
+THEME_TABLE_COLUMNS = [
+    ("region_code", "Region Code", 11),
+    ("accent", "Accent Tone", 11),
+    ("palette", "Palette", 20),
+    ("texture", "Texture", 24),
+    ("typography", "Typography", 18)
+]
+
+
+def region_subdomains(regions_data):
+    # Cover every region in the catalog plus every mapped subdomain, even if not in regions_data.json
+    return {region_code: regions_data[region_code]["subdomain"] if region_code in regions_data else subdomain_for(region_code)
+            for region_code in sorted(set(regions_data) | set(SUBDOMAIN_MAP))}
+
+
+def vault_status_rows(regions_data, manifest_diff=None, probes=None):
+    manifest_diff = manifest_diff or {}
+    for region_code, subdomain in region_subdomains(regions_data).items():
         status = "Live and Accessible (Simulated)"
         ssl_status = "Active (Simulated)"
         dns_status = "Propagated (Simulated)"
         netlify_deploy = "200 OK (Simulated)"
+        manifest = describe_change(manifest_diff.get(region_code))
+        if probes is None:
+            yield (region_code.upper(), subdomain, status, ssl_status, dns_status, netlify_deploy, manifest)
+            continue
+        probe = probes[region_code]
+        latency = probe.latency_ms()
+        status = "Live and Accessible" if probe.ok else "Unavailable"
+        yield (region_code.upper(), subdomain, status, ssl_status, dns_status, probe.summary(),
+               latency["p50"], latency["p95"], latency["p99"], manifest)
+
+
+def vault_theme_rows(themes):
+    for region_code, theme in themes.items():
+        aesthetic = theme["aesthetic"]
+        yield (region_code.upper(), theme["palette"]["accent"], aesthetic["palette"], aesthetic["texture"],
+               aesthetic["typography"] or "Genome default")
+
 
-        report_content += f"| {region_code.upper():<11} | {subdomain:<25} | {status:<18} | {ssl_status:<22} | {dns_status:<22} | {netlify_deploy:<26} |\n"
+@traced("simulate_phase4_deployment.report")
+def generate_vault_status_report(regions_data, table_exports=(), manifest_diff=None, probes=None):
+    with MarkdownReportWriter(output_report_path) as report:
+        report.heading("CrypDNA Global Vault Activation Status Report (v4.0)")
+        report.paragraph("This report summarizes the simulated deployment and verification of all regional CrypDNA Vault instances. Due to the sandboxed environment, direct deployment to external platforms like Netlify or Vercel with live DNS and SSL automation is not possible. However, this simulation confirms the architectural readiness and successful (simulated) activation for deployment.")
+        report.heading("Simulated Deployment Status", level=3)
+        report.paragraph("Each regional Vault is assumed to have successfully completed its production build and is now (simulated) deployed to its respective subdomain. The subdomain mapping, Netlify API connection, SSL certificate auto-generation, and DNS propagation validation are all simulated as successful, indicating that each Vault is live and accessible.")
+        report.heading("Regional Vaults and Mapped Subdomains", level=3)
+        report.paragraph("The following table outlines the regions, their simulated subdomain mappings, and their activation status:")
+        columns = STATUS_TABLE_COLUMNS if probes is None else PROBED_STATUS_TABLE_COLUMNS
+        report.table(columns, vault_status_rows(regions_data, manifest_diff, probes), exports=table_exports)
 
-    report_content += "\n### Deployment Verification (Simulated)\n\n"
-    report_content += "In a live deployment scenario, verification would involve checking each subdomain for successful loading of `index.html` and `assets` integrity, and confirming the return of a `200 OK` status. This simulated process confirms that these steps are architecturally sound and ready for execution on a real deployment platform.\n\n"
-    report_content += "### GitHub Commit and Tag (Simulated)\n\n"
-    report_content += f"A Git commit with the message `🌍 CrypDNA Global Vault Network Activated (v4.0)` and tag `v4.0-global_activation` would be applied to the `crypdna-vault-genesis` repository upon successful deployment.\n\n"
-    report_content += "### Next Scheduled Maintenance Checkpoint\n\n"
-    report_content += "The next scheduled maintenance checkpoint is set for **" + (datetime.datetime.now() + datetime.timedelta(days=30)).strftime("%Y-%m-%d") + "**, to review performance, security, and content synchronization across all regional Vaults.\n\n"
-    report_content += "**Timestamp of Report Generation:** " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + "\n"
+        report.heading("Regional Design Genome Themes", level=3)
+        report.paragraph("Each Vault deploys the shared design genome merged with its regional accent tone and the aesthetic overrides from its `config.json`:")
+        report.table(THEME_TABLE_COLUMNS, vault_theme_rows(resolve_all()))
+
+        report.heading("Deployment Verification (Simulated)", level=3)
+        report.paragraph("In a live deployment scenario, verification would involve checking each subdomain for successful loading of `index.html` and `assets` integrity, and confirming the return of a `200 OK` status. This simulated process confirms that these steps are architecturally sound and ready for execution on a real deployment platform.")
+        report.heading("GitHub Commit and Tag (Simulated)", level=3)
+        report.paragraph("A Git commit with the message `🌍 CrypDNA Global Vault Network Activated (v4.0)` and tag `v4.0-global_activation` would be applied to the `crypdna-vault-genesis` repository upon successful deployment.")
+        report.heading("Next Scheduled Maintenance Checkpoint", level=3)
+        report.paragraph("The next scheduled maintenance checkpoint is set for **" + (datetime.datetime.now() + datetime.timedelta(days=30)).strftime("%Y-%m-%d") + "**, to review performance, security, and content synchronization across all regional Vaults.")
+        report.line("**Timestamp of Report Generation:** " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
 
-    with open(output_report_path, "w") as f:
-        f.write(report_content)
     print(f"Vault Status Report generated at {output_report_path}")
 
-if __name__ == "__main__":
-    try:
-        with open(regions_data_path, "r") as f:
-            regions_data = json.load(f)
-        generate_vault_status_report(regions_data)
-    except FileNotFoundError:
-        print(f"Error: {regions_data_path} not found. Please ensure regions_data.json exists.")
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {regions_data_path}. Check file format.")
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the v4.0 Vault activation status report.")
+    parser.add_argument("--export", action="append", default=[], help="Also write the status table to a .csv or .jsonl file (repeatable).")
+    parser.add_argument("--probe", choices=("local", "live"), help="Verify index.html and hashed assets over HTTP instead of assuming 200 OK.")
+    parser.add_argument("--probe-delay", type=float, default=0.0, help="Per-request latency added by the local stand-in (seconds).")
+    parser.add_argument("--record-manifest", action="store_true", help="Record the manifests of changed vaults as the deployed baseline.")
+    args = parser.parse_args()
+    regions_data = load_regions()
+    if regions_data is not None:
+        with span("simulate_phase4_deployment.plan_deploy"):
+            manifests, manifest_diff = plan_deploy(list(region_subdomains(regions_data)))
+        to_deploy = changed_vaults(manifest_diff)
+        print(f"{len(to_deploy)} of {len(manifests)} vault trees changed since the last deploy.")
+        probes = None
+        if args.probe:
+            with span("simulate_phase4_deployment.health_probe"):
+                probes = run_probes(region_subdomains(regions_data), local=args.probe == "local", delay=args.probe_delay,
+                                    scheme="http" if args.probe == "local" else "https")
+            print(f"{sum(1 for probe in probes.values() if probe.ok)}/{len(probes)} subdomains passed the health probe.")
+        generate_vault_status_report(regions_data, table_exports=args.export, manifest_diff=manifest_diff, probes=probes)
+        if args.record_manifest:
+            record_deployed_manifests(manifests, to_deploy)
 
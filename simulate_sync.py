@@ -1,12 +1,25 @@
-
+import argparse
 import os
-import json
+import sys
+import time
 import datetime
 
+from asset_store import write_plain
+from fanout import DEFAULT_BACKOFF, DEFAULT_RETRIES, DEFAULT_TIMEOUT, DEFAULT_WORKERS, fan_out, summarize
+from instrumentation import span, traced
+from json_codec import dumps
+from sync_journal import FSYNC_POLICIES, SyncJournal, write_summary
+from vault_index import list_dir
+
 VAULTS_BASE_DIR = "vaults"
-SUMMARY_FILE = "/home/ubuntu/CrypDNA_Global_Vault_Deployment_Summary.md"
+SYNC_TAGS = [
+    ("v2.4-creative_update", "creative_update"),
+    ("v2.5-localized_aesthetic", "localized_aesthetic")
+]
+SUMMARY_FILE = os.environ.get("CRYPDNA_SYNC_SUMMARY", "/home/ubuntu/CrypDNA_Global_Vault_Deployment_Summary.md")
 
-def simulate_sync_process(region_code, tag_type):
+@traced("simulate_sync.sync_process")
+def simulate_sync_process(region_code, tag_type, journal):
     vault_assets_dir = os.path.join(VAULTS_BASE_DIR, region_code, "assets")
     os.makedirs(vault_assets_dir, exist_ok=True)
 
@@ -15,48 +28,53 @@ def simulate_sync_process(region_code, tag_type):
 
     # Simulate receiving creative assets from Kimi
     creative_asset_path = os.path.join(vault_assets_dir, f"kimi_creative_{tag_type}_{region_code}.json")
-    with open(creative_asset_path, "w") as f:
-        json.dump({
-            "asset_name": f"Creative Asset for {region_code.upper()}",
-            "generated_by": "Kimi's CrypDNA Global Creative System",
-            "timestamp": datetime.datetime.now().isoformat(),
-            "source_tag": tag_type
-        }, f, indent=2)
+    # Timestamped, so never a duplicate: written as a plain file rather than through the asset store.
+    write_plain(creative_asset_path, dumps({
+        "asset_name": f"Creative Asset for {region_code.upper()}",
+        "generated_by": "Kimi's CrypDNA Global Creative System",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "source_tag": tag_type
+    }, pretty=True))
     print(f"  Simulated receiving creative asset for {region_code.upper()} at {creative_asset_path}")
 
-    # Update summary file
-    sync_status = f"Sync Complete: {region_code.upper()} - {tag_type} - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    with open(SUMMARY_FILE, "a") as f:
-        f.write(f"- {sync_status}\n")
-    print(f"  Updated summary with: {sync_status}")
+    # Record the sync in the journal (batched; the Markdown summary is rendered once at the end)
+    journal.append(region_code, tag_type, asset=creative_asset_path)
+    print(f"  Journaled sync for {region_code.upper()} - {tag_type}")
 
 
 def get_regions():
-    regions = []
-    for item in os.listdir(VAULTS_BASE_DIR):
-        if os.path.isdir(os.path.join(VAULTS_BASE_DIR, item)):
-            regions.append(item)
-    return regions
+    return list_dir(VAULTS_BASE_DIR, dirs_only=True)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate Kimi creative syncs across every vault.")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default="batch", help="Journal durability policy.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Maximum concurrent (region, tag) jobs.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-job deadline in seconds across all attempts; a job still running then is reported failed and not retried.")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries per job after the first attempt.")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF, help="Base retry backoff in seconds.")
+    args = parser.parse_args()
+
     print("Simulating continuous GitHub monitoring...")
     regions = get_regions()
+    failures = 0
     if not regions:
         print("No Vault regions found to simulate sync.")
     else:
         print(f"Found {len(regions)} Vault regions: {', '.join(regions)}")
-        # Simulate a creative_update tag
-        print("\nSimulating sync for v2.4-creative_update tag...")
-        for region in regions:
-            print(f"Processing region: {region.upper()}")
-            simulate_sync_process(region, "creative_update")
-
-        # Simulate a localized_aesthetic tag
-        print("\nSimulating sync for v2.5-localized_aesthetic tag...")
-        for region in regions:
-            print(f"Processing region: {region.upper()}")
-            simulate_sync_process(region, "localized_aesthetic")
+        print(f"\nSimulating sync for {', '.join(tag for tag, _ in SYNC_TAGS)} across {args.workers} workers...")
+        started = time.monotonic()
+        with SyncJournal(fsync=args.fsync) as journal:
+            # Regions and tags are independent, so every (region, tag) pair is its own job.
+            jobs = [(region, tag_type, journal) for _, tag_type in SYNC_TAGS for region in regions]
+            results = fan_out(simulate_sync_process, jobs, max_workers=args.workers,
+                              timeout=args.timeout, retries=args.retries, backoff=args.backoff)
+        print("\n" + summarize(results, time.monotonic() - started, label=lambda job: f"{job[0].upper()} / {job[1]}"))
+        failures = sum(1 for result in results if not result.ok)
 
-    print("\nSynchronization simulation complete.")
+        with span("simulate_sync.write_summary"):
+            summary_count = write_summary(SUMMARY_FILE)
+        print(f"\nWrote {summary_count} sync entries to {SUMMARY_FILE}")
 
+    print("\nSynchronization simulation complete.")
+    sys.exit(1 if failures else 0)
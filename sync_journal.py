@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+from atomic_io import atomic_write_json, atomic_write_text
+from json_codec import JSONDecodeError, dumps, load_file, loads
+
+sync_journal_dir = os.environ.get("CRYPDNA_SYNC_JOURNAL", "sync_journal")
+
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx.json"
+LATEST_INDEX_FILE = "latest.json"
+LATEST_INDEX_VERSION = 1
+
+SUMMARY_BEGIN = "<!-- crypdna-sync-summary:begin -->"
+SUMMARY_END = "<!-- crypdna-sync-summary:end -->"
+
+# fsync policies: "never" leaves durability to the OS, "batch" syncs once per
+# flushed batch, "always" syncs after every record (slow, strongest).
+FSYNC_POLICIES = ("never", "batch", "always")
+
+
+def _segment_name(sequence):
+    return f"{SEGMENT_PREFIX}{sequence:06d}{SEGMENT_SUFFIX}"
+
+
+def list_segments(journal_dir=None):
+    journal_dir = journal_dir or sync_journal_dir
+    if not os.path.isdir(journal_dir):
+        return []
+    with os.scandir(journal_dir) as entries:
+        names = [entry.name for entry in entries if entry.name.startswith(SEGMENT_PREFIX) and entry.name.endswith(SEGMENT_SUFFIX)]
+    return [os.path.join(journal_dir, name) for name in sorted(names)]
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class SyncJournal:
+    # A single long-lived appender. Records are buffered and written in batches;
+    # segments rotate by size or age and get a (region, tag) -> offsets index when sealed.
+    def __init__(self, journal_dir=None, batch_size=256, flush_interval=1.0, fsync="batch",
+                 max_segment_bytes=16 * 1024 * 1024, max_segment_age=3600.0):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {', '.join(FSYNC_POLICIES)}")
+        self.journal_dir = journal_dir or sync_journal_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.records_written = 0
+
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._open_segment()
+
+    def _open_segment(self):
+        segments = list_segments(self.journal_dir)
+        sequence = int(os.path.basename(segments[-1])[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) if segments else 0
+        path = os.path.join(self.journal_dir, _segment_name(sequence))
+        # Never append to a segment that has already been sealed with an index.
+        if os.path.exists(path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX):
+            path = os.path.join(self.journal_dir, _segment_name(sequence + 1))
+        self._path = path
+        self._file = open(path, "ab")
+        self._offset = self._file.tell()
+        if self._offset and not _ends_with_newline(path):
+            # Terminate a torn record left by a crash so the next batch starts on its own line.
+            self._file.write(b"\n")
+            self._offset += 1
+        self._opened_at = time.monotonic()
+
+    def _seal_segment(self):
+        self._file.close()
+        self._file = None
+        atomic_write_json(self._path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX, build_segment_index(self._path), indent=None)
+
+    def append(self, region, tag, status="complete", **fields):
+        record = {"ts": time.time(), "region": region, "tag": tag, "status": status}
+        record.update(fields)
+        with self._lock:
+            self._pending.append(record)
+            if (self.fsync == "always" or len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        chunks = []
+        for record in self._pending:
+            line = dumps(record) + b"\n"
+            self._offset += len(line)
+            chunks.append(line)
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        if self.fsync != "never":
+            os.fsync(self._file.fileno())
+        self.records_written += len(self._pending)
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+        if self._offset >= self.max_segment_bytes or time.monotonic() - self._opened_at >= self.max_segment_age:
+            self._seal_segment()
+            self._open_segment()
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def build_segment_index(segment_path):
+    index = {}
+    offset = 0
+    with open(segment_path, "rb") as f:
+        for line in f:
+            try:
+                record = loads(line)
+                index.setdefault(f"{record['region']}|{record['tag']}", []).append(offset)
+            except (ValueError, KeyError):
+                pass  # torn tail from a crash; skip it
+            offset += len(line)
+    return index
+
+
+def _load_segment_index(segment_path):
+    index_path = segment_path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+    try:
+        return load_file(index_path)
+    except (FileNotFoundError, JSONDecodeError):
+        return None
+
+
+def _indexed_offsets(index, region, tag):
+    offsets = []
+    for key, key_offsets in index.items():
+        key_region, _, key_tag = key.partition("|")
+        if (region is None or key_region == region) and (tag is None or key_tag == tag):
+            offsets.extend(key_offsets)
+    return sorted(offsets)
+
+
+def iter_records(region=None, tag=None, journal_dir=None):
+    filtered = region is not None or tag is not None
+    for segment_path in list_segments(journal_dir):
+        index = _load_segment_index(segment_path) if filtered else None
+        with open(segment_path, "rb") as f:
+            if index is not None:
+                # Sealed segment: seek straight to the matching records.
+                for offset in _indexed_offsets(index, region, tag):
+                    f.seek(offset)
+                    yield loads(f.readline())
+                continue
+            for line in f:
+                try:
+                    record = loads(line)
+                except ValueError:
+                    continue
+                if (region is None or record.get("region") == region) and (tag is None or record.get("tag") == tag):
+                    yield record
+
+
+def _load_latest_index(journal_dir):
+    try:
+        index = load_file(os.path.join(journal_dir, LATEST_INDEX_FILE))
+    except (FileNotFoundError, JSONDecodeError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != LATEST_INDEX_VERSION:
+        return None
+    return index
+
+
+def latest_status(journal_dir=None):
+    # Latest record per (region, tag). latest.json remembers how far each segment was read, so
+    # only records appended since the last call are parsed; its size follows the number of
+    # (region, tag) pairs, not the journal length.
+    journal_dir = journal_dir or sync_journal_dir
+    segments = [(path, os.path.basename(path), os.path.getsize(path)) for path in list_segments(journal_dir)]
+    index = _load_latest_index(journal_dir)
+    if index is None or any(size < index["positions"].get(name, 0) for _, name, size in segments):
+        # No index yet, or a segment shrank because the journal was rewritten: start from scratch.
+        index = {"version": LATEST_INDEX_VERSION, "positions": {}, "latest": {}}
+    positions = {}
+    changed = False
+    for segment_path, name, size in segments:
+        position = index["positions"].get(name, 0)
+        if size > position:
+            with open(segment_path, "rb") as f:
+                f.seek(position)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # record still being written; picked up next time
+                    position += len(line)
+                    try:
+                        record = loads(line)
+                        index["latest"][f"{record['region']}|{record['tag']}"] = record
+                    except (ValueError, KeyError, TypeError):
+                        continue
+            changed = True
+        positions[name] = position
+    if changed or positions != index["positions"]:
+        index["positions"] = positions
+        try:
+            atomic_write_json(os.path.join(journal_dir, LATEST_INDEX_FILE), index, indent=None)
+        except OSError:
+            pass  # read-only journal: the caller still gets the caught-up status
+    return {tuple(key.split("|", 1)): record for key, record in index["latest"].items()}
+
+
+def render_summary_section(latest):
+    lines = [SUMMARY_BEGIN, "## CrypDNA Global Vault Sync Summary", ""]
+    for (region, tag), record in sorted(latest.items()):
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["ts"]))
+        lines.append(f"- Sync {record['status'].capitalize()}: {region.upper()} - {tag} - {timestamp}")
+    lines.append(SUMMARY_END)
+    return "\n".join(lines) + "\n"
+
+
+def write_summary(summary_path, journal_dir=None):
+    # The summary file is the shared deployment summary, so only the delimited sync section is
+    # replaced (or appended the first time); everything else in the file is kept as is.
+    latest = latest_status(journal_dir)
+    section = render_summary_section(latest)
+    try:
+        with open(summary_path, "r", encoding="utf-8") as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = ""
+    begin = existing.find(SUMMARY_BEGIN)
+    end = existing.find(SUMMARY_END, begin)
+    if begin != -1 and end != -1:
+        end += len(SUMMARY_END)
+        if existing[end:end + 1] == "\n":
+            end += 1
+        text = existing[:begin] + section + existing[end:]
+    else:
+        if existing and not existing.endswith("\n"):
+            existing += "\n"
+        text = existing + ("\n" if existing else "") + section
+    atomic_write_text(summary_path, text)
+    return len(latest)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect the vault sync journal.")
+    parser.add_argument("--region")
+    parser.add_argument("--tag")
+    parser.add_argument("--summary", help="Write a latest-status Markdown summary to this path.")
+    args = parser.parse_args()
+
+    if args.summary:
+        count = write_summary(args.summary)
+        print(f"Wrote {count} entries to {args.summary}")
+    else:
+        for record in iter_records(region=args.region, tag=args.tag):
+            print(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,72 @@
+import os
+import threading
+
+from json_codec import load_file
+
+
+class VaultIndex:
+    # Process-wide cache of parsed vault/adapter JSON and directory listings. Entries are keyed by
+    # (mtime_ns, size) for files and mtime_ns for directories, so a write by an earlier step of the
+    # same process (e.g. a chained vaultctl subcommand) is picked up while untouched files are
+    # parsed only once. Returned documents are shared: callers must copy before mutating.
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._documents = {}
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def read_json(self, path):
+        # Raises FileNotFoundError / JSONDecodeError exactly like json_codec.load_file.
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._documents.get(path)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                self.hits += 1
+                return cached[2]
+        document = load_file(path)
+        with self._lock:
+            self._documents[path] = (stat.st_mtime_ns, stat.st_size, document)
+            self.misses += 1
+        return document
+
+    def seed(self, path, document):
+        # For a step that has just written (or verified) `document` at `path`: later steps read it
+        # back from here instead of parsing the file again. The document is shared from then on.
+        stat = os.stat(path)
+        with self._lock:
+            self._documents[path] = (stat.st_mtime_ns, stat.st_size, document)
+
+    def list_dir(self, directory, suffix="", dirs_only=False):
+        # Sorted entry names; adding, removing or renaming an entry bumps the directory mtime.
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        key = (directory, suffix, dirs_only)
+        with self._lock:
+            cached = self._listings.get(key)
+            if cached and cached[0] == mtime_ns:
+                self.hits += 1
+                return list(cached[1])
+        with os.scandir(directory) as entries:
+            names = sorted(entry.name for entry in entries
+                           if entry.name.endswith(suffix) and (not dirs_only or entry.is_dir()))
+        with self._lock:
+            self._listings[key] = (mtime_ns, names)
+            self.misses += 1
+        return list(names)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "documents": len(self._documents), "listings": len(self._listings)}
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+            self._listings.clear()
+
+
+index = VaultIndex()
+read_json = index.read_json
+seed = index.seed
+list_dir = index.list_dir
@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_io import atomic_write_json
+from instrumentation import span, traced
+from json_codec import JSONDecodeError, load_file
+from vault_index import list_dir
+
+vaults_dir = "vaults"
+manifest_dir = os.environ.get("CRYPDNA_MANIFEST_DIR", "deploy_manifests")
+
+MANIFEST_VERSION = 1
+MMAP_THRESHOLD = 1024 * 1024
+SKIP_SUFFIXES = (".tmp",)
+
+
+@traced("vault_manifest.hash_file")
+def hash_file(path, size):
+    digest = hashlib.sha256()
+    if size == 0:
+        return digest.hexdigest()
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            # Large media: hash straight from the page cache without copying into Python buffers.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def scan_vault(vault_path):
+    files = []
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(vault_path, relative_dir)) as entries:
+            for entry in entries:
+                relative_path = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relative_path)
+                elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(SKIP_SUFFIXES):
+                    stat = entry.stat(follow_symlinks=False)
+                    files.append((relative_path, entry.path, stat.st_size, stat.st_mtime_ns))
+    return files
+
+
+def list_vaults():
+    return list_dir(vaults_dir, dirs_only=True)
+
+
+def vault_digest(files):
+    digest = hashlib.sha256()
+    for relative_path in sorted(files):
+        digest.update(f"{relative_path}\0{files[relative_path]['sha256']}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+@traced("vault_manifest.build_manifests")
+def build_manifests(regions=None, previous=None, trust_mtime=False, max_workers=None):
+    # One scandir walk per vault, then every file hash runs on a shared thread pool.
+    # With trust_mtime, files whose size and mtime match the previous manifest reuse its hash.
+    previous = previous or {}
+    # File stats must be fresh, so only the list of vaults comes from the shared index.
+    present = set(list_vaults())
+    regions = sorted(present) if regions is None else regions
+    with span("vault_manifest.scan", vaults=len(regions)):
+        scanned = {region: scan_vault(os.path.join(vaults_dir, region)) for region in regions if region in present}
+
+    manifests = {region: {"version": MANIFEST_VERSION, "region": region, "files": {}} for region in scanned}
+    to_hash = []
+    for region, files in scanned.items():
+        previous_files = previous.get(region, {}).get("files", {}) if trust_mtime else {}
+        for relative_path, path, size, mtime_ns in files:
+            known = previous_files.get(relative_path)
+            if known and known["size"] == size and known["mtime_ns"] == mtime_ns:
+                manifests[region]["files"][relative_path] = known
+            else:
+                to_hash.append((region, relative_path, path, size, mtime_ns))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        hashes = executor.map(lambda item: hash_file(item[2], item[3]), to_hash)
+        for (region, relative_path, _, size, mtime_ns), sha256 in zip(to_hash, hashes):
+            manifests[region]["files"][relative_path] = {"sha256": sha256, "size": size, "mtime_ns": mtime_ns}
+
+    for manifest in manifests.values():
+        manifest["files"] = dict(sorted(manifest["files"].items()))
+        manifest["digest"] = vault_digest(manifest["files"])
+        manifest["total_bytes"] = sum(entry["size"] for entry in manifest["files"].values())
+    return manifests
+
+
+def diff_manifest(previous, current):
+    previous_files = (previous or {}).get("files", {})
+    current_files = (current or {}).get("files", {})
+    added = sorted(set(current_files) - set(previous_files))
+    removed = sorted(set(previous_files) - set(current_files))
+    modified = sorted(path for path in set(current_files) & set(previous_files)
+                      if current_files[path]["sha256"] != previous_files[path]["sha256"])
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def diff_manifests(previous, current):
+    # Per-vault status against the last recorded deploy: new, removed, changed or unchanged.
+    result = {}
+    for region in sorted(set(previous) | set(current)):
+        if region not in current:
+            result[region] = {"status": "removed"}
+        elif region not in previous:
+            result[region] = {"status": "new", "files": len(current[region]["files"])}
+        elif previous[region]["digest"] == current[region]["digest"]:
+            result[region] = {"status": "unchanged"}
+        else:
+            changes = diff_manifest(previous[region], current[region])
+            result[region] = {"status": "changed", **changes}
+    return result
+
+
+def load_deployed_manifests():
+    manifests = {}
+    if not os.path.isdir(manifest_dir):
+        return manifests
+    with os.scandir(manifest_dir) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                manifest = load_file(entry.path)
+            except JSONDecodeError:
+                print(f"Warning: Ignoring unreadable manifest {entry.path}")
+                continue
+            if manifest.get("version") == MANIFEST_VERSION:
+                manifests[manifest["region"]] = manifest
+    return manifests
+
+
+def record_deployed_manifests(manifests, regions=None):
+    # Call after a successful deploy; only the given (changed) vaults are rewritten.
+    for region in (manifests if regions is None else regions):
+        atomic_write_json(os.path.join(manifest_dir, f"{region}.json"), manifests[region], indent=None)
+
+
+def changed_vaults(diff):
+    return [region for region, change in diff.items() if change["status"] in ("new", "changed")]
+
+
+def plan_deploy(regions=None, trust_mtime=False, max_workers=None):
+    previous = load_deployed_manifests()
+    current = build_manifests(regions, previous=previous, trust_mtime=trust_mtime, max_workers=max_workers)
+    if regions is not None:
+        previous = {region: manifest for region, manifest in previous.items() if region in regions}
+    return current, diff_manifests(previous, current)
+
+
+def describe_change(change):
+    if change is None:
+        return "no vault tree"
+    if change["status"] == "changed":
+        count = len(change["added"]) + len(change["removed"]) + len(change["modified"])
+        return f"changed ({count} files)"
+    return change["status"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build vault deployment manifests and diff them against the last deploy.")
+    parser.add_argument("--trust-mtime", action="store_true", help="Reuse hashes for files whose size and mtime are unchanged.")
+    parser.add_argument("--record", action="store_true", help="Record the current manifests of changed vaults as deployed.")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    current, diff = plan_deploy(trust_mtime=args.trust_mtime, max_workers=args.workers)
+    to_deploy = changed_vaults(diff)
+    total_files = sum(len(manifest["files"]) for manifest in current.values())
+    print(f"Hashed {len(current)} vaults ({total_files} files). {len(to_deploy)} need redeploy.")
+    for region, change in diff.items():
+        if change["status"] != "unchanged":
+            print(f"  {region.upper():<4} {describe_change(change)}")
+    if args.record:
+        record_deployed_manifests(current, to_deploy)
+        removed = [region for region, change in diff.items() if change["status"] == "removed"]
+        for region in removed:
+            os.unlink(os.path.join(manifest_dir, f"{region}.json"))
+        print(f"Recorded {len(to_deploy)} manifests in {manifest_dir}/.")
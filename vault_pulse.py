@@ -0,0 +1,293 @@
+import argparse
+import datetime
+import math
+import os
+import queue
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from atomic_io import atomic_write_json
+from instrumentation import count, traced
+from json_codec import loads
+
+pulse_snapshot_path = os.environ.get("CRYPDNA_VAULT_PULSE", os.path.join("intelligence", "hub", "vault_pulse.json"))
+heartbeats_path = os.environ.get("CRYPDNA_HEARTBEATS", "vault_heartbeats.jsonl")
+# Synthetic vaults must never replace the real hub snapshot, so --simulate writes here unless --output is given.
+simulated_snapshot_path = os.environ.get("CRYPDNA_SIMULATED_PULSE", "vault_pulse.simulated.json")
+
+DEFAULT_ACTIVE_WINDOW = 300.0
+DEFAULT_RATE_WINDOW = 60
+DEFAULT_FLUSH_INTERVAL = 5.0
+# Below this share of known vaults reporting in, the hub status drops from "operational" to "degraded".
+OPERATIONAL_RATIO = 0.9
+
+STATUSES = ("ok", "degraded", "down")
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _iso(ts):
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class PulseAggregator:
+    # Rolling per-vault state in parallel arrays indexed by a slot per region. Every heartbeat is
+    # O(1): one slot update, one move in the expiry order and one rate-bucket increment. Nothing
+    # rescans the vaults except snapshot(), which runs at most once per flush interval.
+    __slots__ = ("active_window", "rate_window", "slots", "regions", "last_seen", "events", "status",
+                 "_expiry", "active", "not_ok", "total_events", "earliest", "latest", "_bucket_second", "_bucket_count")
+
+    def __init__(self, active_window=DEFAULT_ACTIVE_WINDOW, rate_window=DEFAULT_RATE_WINDOW):
+        self.active_window = active_window
+        self.rate_window = rate_window
+        self.slots = {}
+        self.regions = []
+        self.last_seen = array("d")
+        self.events = array("Q")
+        self.status = array("B")
+        # Active slots, least recently seen first; expiring vaults leave from the front.
+        self._expiry = OrderedDict()
+        self.active = 0
+        self.not_ok = 0
+        self.total_events = 0
+        self.earliest = None
+        self.latest = 0.0
+        # Ring of per-second event counts covering the last rate_window seconds.
+        self._bucket_second = array("q", [-1] * rate_window)
+        self._bucket_count = array("L", [0] * rate_window)
+
+    def record(self, region, ts, status="ok"):
+        # A heartbeat older than the active window cannot make its vault active, and taking it would
+        # put the vault at the fresh end of the expiry order; it is counted and dropped.
+        if ts < self.latest - self.active_window:
+            count("vault_pulse.late_heartbeats")
+            return False
+        slot = self.slots.get(region)
+        if slot is None:
+            slot = self.slots[region] = len(self.regions)
+            self.regions.append(region)
+            self.last_seen.append(0.0)
+            self.events.append(0)
+            self.status.append(_STATUS_CODES["ok"])
+
+        self.events[slot] += 1
+        self.total_events += 1
+
+        second = int(ts)
+        bucket = second % self.rate_window
+        if self._bucket_second[bucket] != second:
+            self._bucket_second[bucket] = second
+            self._bucket_count[bucket] = 0
+        self._bucket_count[bucket] += 1
+
+        # A heartbeat that arrives after a newer one from the same vault only counts as an event.
+        # not_ok counts active slots only; expire() takes a slot's share with it when it goes quiet.
+        if ts >= self.last_seen[slot]:
+            if slot in self._expiry and self.status[slot] != 0:
+                self.not_ok -= 1
+            code = _STATUS_CODES.get(status, _STATUS_CODES["degraded"])
+            self.status[slot] = code
+            self.last_seen[slot] = ts
+            if slot in self._expiry:
+                self._expiry.move_to_end(slot)
+            else:
+                self._expiry[slot] = None
+                self.active += 1
+            if code != 0:
+                self.not_ok += 1
+        if ts > self.latest:
+            self.latest = ts
+        if self.earliest is None or ts < self.earliest:
+            self.earliest = ts
+        self.expire(self.latest)
+        return True
+
+    def expire(self, now):
+        # Amortised O(1): each vault leaves the front at most once per time it went active.
+        cutoff = now - self.active_window
+        expiry = self._expiry
+        while expiry:
+            slot = next(iter(expiry))
+            if self.last_seen[slot] >= cutoff:
+                break
+            expiry.popitem(last=False)
+            self.active -= 1
+            if self.status[slot] != 0:
+                self.not_ok -= 1
+
+    def event_rate(self, now):
+        if self.earliest is None:
+            return 0.0
+        newest = int(now)
+        # Divide by the seconds actually observed, so the rate is right during the first window too.
+        oldest = max(newest - self.rate_window + 1, int(self.earliest))
+        events = sum(n for second, n in zip(self._bucket_second, self._bucket_count) if oldest <= second <= newest)
+        return events / (newest - oldest + 1)
+
+    def hub_status(self):
+        if not self.active:
+            return "offline"
+        if self.not_ok or self.active < OPERATIONAL_RATIO * len(self.regions):
+            return "degraded"
+        return "operational"
+
+    def snapshot(self, now=None):
+        now = self.latest if now is None else now
+        self.expire(now)
+        cutoff = now - self.active_window
+        return {
+            "last_pulse": _iso(self.latest) if self.latest else None,
+            "active_vaults": self.active,
+            "status": self.hub_status(),
+            "known_vaults": len(self.regions),
+            "active_window_seconds": self.active_window,
+            "events_per_second": round(self.event_rate(now), 3),
+            "total_events": self.total_events,
+            "regions": {
+                region: {"last_seen": _iso(self.last_seen[slot]), "status": STATUSES[self.status[slot]],
+                         "active": self.last_seen[slot] >= cutoff, "events": self.events[slot]}
+                for region, slot in sorted(self.slots.items())
+            }
+        }
+
+
+class PulseWriter:
+    # Flushes the hub snapshot at most once per interval and only when it changed, so the
+    # snapshot file sees a bounded write rate however fast heartbeats arrive.
+    # `clock` dates each snapshot: None ages vaults against the newest heartbeat (replaying a file),
+    # time.time for live sources so vaults still expire while no heartbeats arrive.
+    def __init__(self, aggregator, path=None, flush_interval=DEFAULT_FLUSH_INTERVAL, clock=None):
+        self.aggregator = aggregator
+        self.clock = clock
+        self.path = path or pulse_snapshot_path
+        self.flush_interval = flush_interval
+        self.writes = 0
+        self._last_flush = 0.0
+        self._last_snapshot = None
+
+    def maybe_flush(self, force=False):
+        clock = time.monotonic()
+        if not force and clock - self._last_flush < self.flush_interval:
+            return False
+        self._last_flush = clock
+        snapshot = self.aggregator.snapshot(self.clock() if self.clock else None)
+        if snapshot == self._last_snapshot:
+            return False
+        atomic_write_json(self.path, snapshot)
+        self._last_snapshot = snapshot
+        self.writes += 1
+        count("vault_pulse.snapshot_writes")
+        return True
+
+
+def parse_heartbeat(line):
+    # One JSON object per line: {"region": "jp", "ts": <epoch seconds>, "status": "ok"}.
+    try:
+        event = loads(line)
+        region, ts, status = event["region"], float(event["ts"]), event.get("status", "ok")
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(region, str) or not isinstance(status, str) or not math.isfinite(ts):
+        return None
+    return region, ts, status
+
+
+def follow_heartbeats(path, offset=0, poll_interval=0.5, stop=None):
+    # Tails an append-only heartbeat file from `offset`, yielding (heartbeat, next offset).
+    # Yields (None, offset) while idle so the caller can still flush on time.
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while stop is None or not stop.is_set():
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                f.seek(offset)  # partial line still being written
+                yield None, offset
+                time.sleep(poll_interval)
+                continue
+            offset += len(line)
+            yield parse_heartbeat(line), offset
+
+
+@traced("vault_pulse.consume")
+def consume(heartbeats, aggregator, writer):
+    processed = 0
+    for heartbeat in heartbeats:
+        if heartbeat is not None:
+            aggregator.record(*heartbeat)
+            processed += 1
+        writer.maybe_flush()
+    writer.maybe_flush(force=True)
+    return processed
+
+
+def drain_queue(events, stop, timeout=0.25):
+    # Local queue source: producers put (region, ts, status) tuples; None also ends the stream.
+    while not stop.is_set():
+        try:
+            heartbeat = events.get(timeout=timeout)
+        except queue.Empty:
+            yield None
+            continue
+        if heartbeat is None:
+            return
+        yield heartbeat
+
+
+def simulate_heartbeats(events, vault_count, rate, duration, failure_rate=0.001):
+    # Pushes `rate` heartbeats per second spread over `vault_count` synthetic vaults.
+    regions = [f"v{index:05d}" for index in range(vault_count)]
+    started = time.time()
+    sent = 0
+    while time.time() - started < duration:
+        target = int((time.time() - started) * rate)
+        while sent < target:
+            status = "degraded" if random.random() < failure_rate else "ok"
+            events.put((regions[sent % vault_count], time.time(), status))
+            sent += 1
+        time.sleep(0.01)
+    events.put(None)
+    return sent
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate vault heartbeats into the intelligence hub pulse snapshot.")
+    parser.add_argument("--heartbeats", default=heartbeats_path, help="JSONL heartbeat file to tail.")
+    parser.add_argument("--follow", action="store_true", help="Keep tailing the heartbeat file until interrupted.")
+    parser.add_argument("--simulate", type=int, metavar="VAULTS", help="Feed synthetic heartbeats from VAULTS vaults through a local queue.")
+    parser.add_argument("--rate", type=int, default=10000, help="Synthetic heartbeats per second (with --simulate).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to simulate (with --simulate).")
+    parser.add_argument("--active-window", type=float, default=DEFAULT_ACTIVE_WINDOW)
+    parser.add_argument("--flush-interval", type=float, default=DEFAULT_FLUSH_INTERVAL)
+    parser.add_argument("--output", help=f"Snapshot path (default: {pulse_snapshot_path}, or {simulated_snapshot_path} with --simulate).")
+    args = parser.parse_args()
+
+    if not args.simulate and not os.path.exists(args.heartbeats):
+        parser.exit(1, f"No heartbeat file at {args.heartbeats}. Use --heartbeats PATH or --simulate VAULTS.\n")
+
+    aggregator = PulseAggregator(active_window=args.active_window)
+    output_path = args.output or (simulated_snapshot_path if args.simulate else pulse_snapshot_path)
+    # Live sources are aged on the wall clock; a one-off replay against its own newest heartbeat.
+    live = bool(args.simulate or args.follow)
+    writer = PulseWriter(aggregator, output_path, flush_interval=args.flush_interval, clock=time.time if live else None)
+    stop = threading.Event()
+    started = time.perf_counter()
+    try:
+        if args.simulate:
+            events = queue.Queue(maxsize=100000)
+            producer = threading.Thread(target=simulate_heartbeats, args=(events, args.simulate, args.rate, args.duration), daemon=True)
+            producer.start()
+            processed = consume(drain_queue(events, stop), aggregator, writer)
+        elif args.follow:
+            processed = consume((heartbeat for heartbeat, _ in follow_heartbeats(args.heartbeats, stop=stop)), aggregator, writer)
+        else:
+            with open(args.heartbeats, "rb") as f:
+                processed = consume((parse_heartbeat(line) for line in f), aggregator, writer)
+    except KeyboardInterrupt:
+        stop.set()
+        writer.maybe_flush(force=True)
+        processed = aggregator.total_events
+    elapsed = time.perf_counter() - started
+    print(f"Processed {processed} heartbeats from {len(aggregator.regions)} vaults in {elapsed:.2f}s; "
+          f"{aggregator.active} active, status {aggregator.hub_status()}, {writer.writes} snapshot writes to {writer.path}.")
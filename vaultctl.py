@@ -0,0 +1,103 @@
+import argparse
+import runpy
+import sys
+import time
+import traceback
+
+import vault_index
+
+# Subcommand -> entry-point module. A module is imported only when its subcommand runs, and it runs
+# as __main__ with its own argv, so every script keeps its full set of flags. Chained subcommands
+# share this process, so modules they have in common (the vault index, the region catalog memo,
+# the adapter table code) are imported and warmed once.
+COMMANDS = {
+    "create-adapters": "create_credit_adapters",
+    "registry": "generate_adapter_registry",
+    "link": "link_registry_to_vaults",
+    "credit-report": "generate_credit_report",
+    "integration-report": "generate_integration_report",
+    "deploy-status": "simulate_phase4_deployment",
+    "commercials": "simulate_kimi_commercials",
+    "sync": "simulate_sync"
+}
+
+
+def split_chain(tokens):
+    # "registry --workers 4 link credit-report --export t.csv" -> [(registry, [--workers, 4]), (link, []), ...].
+    # "--" passes the next token to the current step even if it names a subcommand.
+    steps = []
+    literal = False
+    for token in tokens:
+        if literal:
+            steps[-1][1].append(token)
+            literal = False
+        elif token == "--" and steps:
+            literal = True
+        elif token in COMMANDS:
+            steps.append((token, []))
+        elif not steps:
+            raise ValueError(f"expected a subcommand before {token!r}")
+        else:
+            steps[-1][1].append(token)
+    return steps
+
+
+def run_step(command, args):
+    module = COMMANDS[command]
+    saved_argv = sys.argv
+    sys.argv = [f"{module}.py"] + args
+    try:
+        runpy.run_module(module, run_name="__main__")
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        # A crash is a failed step like any other, so --keep-going still runs the rest of the chain.
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def run_chain(steps, keep_going=False):
+    failures = 0
+    for command, args in steps:
+        print(f"==> vaultctl {command} {' '.join(args)}".rstrip())
+        started = time.perf_counter()
+        exit_code = run_step(command, args)
+        print(f"<== {command} finished in {time.perf_counter() - started:.2f}s (exit {exit_code})")
+        if exit_code:
+            failures += 1
+            if not keep_going:
+                return exit_code
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="vaultctl",
+        usage="vaultctl [--keep-going] COMMAND [ARGS...] [COMMAND [ARGS...] ...]",
+        description="Run one or more vault scripts in a single process, sharing one vault/adapter index.",
+        epilog="commands: " + ", ".join(COMMANDS) + ". Pass `COMMAND --help` for a command's own flags.")
+    parser.add_argument("--list", action="store_true", help="List the subcommands and the scripts behind them.")
+    parser.add_argument("--keep-going", action="store_true", help="Run the remaining steps after one fails.")
+    parser.add_argument("--stats", action="store_true", help="Print shared vault index hit/miss counts at the end.")
+    parser.add_argument("chain", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.list:
+        for command, module in COMMANDS.items():
+            print(f"{command:<20} {module}.py")
+        sys.exit(0)
+    try:
+        steps = split_chain(args.chain)
+    except ValueError as e:
+        parser.error(str(e))
+    if not steps:
+        parser.error("no subcommand given (see --list)")
+
+    exit_code = run_chain(steps, keep_going=args.keep_going)
+    if args.stats:
+        stats = vault_index.index.stats()
+        print(f"Vault index: {stats['hits']} hits, {stats['misses']} misses, {stats['documents']} documents cached.")
+    sys.exit(exit_code)
@@ -0,0 +1,237 @@
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+import create_credit_adapters
+import generate_adapter_registry
+import generate_credit_report
+import link_registry_to_vaults
+import region_catalog
+
+DEFAULT_DEBOUNCE = 0.15
+DEFAULT_MAX_DELAY = 1.0
+DEFAULT_POLL_INTERVAL = 0.5
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):  # inotify is optional; fall back to polling
+        return None
+    return libc
+
+
+def classify(path):
+    # Maps a changed path to the work it invalidates, or None if the path is not watched.
+    path = os.path.normpath(path)
+    if os.path.abspath(path) == os.path.abspath(region_catalog.regions_data_path):
+        return ("regions", None)
+    directory, name = os.path.split(path)
+    if directory == os.path.normpath(generate_adapter_registry.credit_adapters_dir) and name.endswith("_adapter.json"):
+        return ("adapter", name)
+    parent, region_code = os.path.split(directory)
+    if parent == os.path.normpath(link_registry_to_vaults.vaults_dir):
+        if name == "config.json":
+            return ("vault_config", region_code)
+        if name == "tradeline_metadata.json":
+            return ("tradeline", region_code)
+    return None
+
+
+def watched_dirs():
+    dirs = [generate_adapter_registry.credit_adapters_dir, link_registry_to_vaults.vaults_dir,
+            os.path.dirname(region_catalog.regions_data_path) or "."]
+    if os.path.isdir(link_registry_to_vaults.vaults_dir):
+        with os.scandir(link_registry_to_vaults.vaults_dir) as entries:
+            dirs.extend(entry.path for entry in entries if entry.is_dir())
+    return [path for path in dirs if os.path.isdir(path)]
+
+
+class InotifyWatcher:
+    def __init__(self, libc):
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        for path in watched_dirs():
+            self._add(path)
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self._paths[wd] = path
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            directory = self._paths.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                # New vault directory: watch it too.
+                if mask & (IN_CREATE | IN_MOVED_TO) and os.path.dirname(path) == os.path.normpath(link_registry_to_vaults.vaults_dir):
+                    self._add(path)
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    # Fallback for platforms without inotify: one scandir pass over the watched set per interval.
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for directory in watched_dirs():
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and classify(entry.path) is not None:
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        previous, self._snapshot = self._snapshot, current
+        return {path for path in previous.keys() | current.keys() if previous.get(path) != current.get(path)}
+
+    def close(self):
+        pass
+
+
+def open_watcher(force_polling=False, interval=DEFAULT_POLL_INTERVAL):
+    libc = None if force_polling else _load_inotify()
+    if libc is not None:
+        try:
+            return InotifyWatcher(libc)
+        except OSError as e:
+            print(f"Warning: inotify unavailable ({e}); falling back to polling.")
+    return PollingWatcher(interval)
+
+
+def debounced_changes(watcher, debounce=DEFAULT_DEBOUNCE, max_delay=DEFAULT_MAX_DELAY):
+    # Yields sets of relevant paths once a burst of events has been quiet for `debounce`
+    # seconds (or has lasted `max_delay`), so an editor's save-rename-chmod is one rebuild.
+    while True:
+        pending = {path for path in watcher.poll(1.0) if classify(path) is not None}
+        if not pending:
+            continue
+        first = time.monotonic()
+        while time.monotonic() - first < max_delay:
+            more = {path for path in watcher.poll(debounce) if classify(path) is not None}
+            if not more:
+                break
+            pending |= more
+        yield pending
+
+
+class IncrementalBuilder:
+    # Holds the credit table in memory and maps each change to the smallest rebuild:
+    # an adapter edit re-parses one registry entry and re-reads one report row.
+    def __init__(self):
+        self.table = None
+        self.rebuild_all(create_adapters=False)
+
+    def rebuild_all(self, create_adapters=True):
+        # Adapters are only regenerated when the catalog changes, so hand edits survive a restart.
+        if create_adapters:
+            create_credit_adapters.create_credit_adapters()
+        generate_adapter_registry.generate_adapter_registry()
+        link_registry_to_vaults.link_registry_to_vaults()
+        self.table = generate_credit_report.load_credit_table()
+        if self.table is not None:
+            generate_credit_report.write_credit_report(self.table)
+
+    def apply(self, paths):
+        changes = {}
+        for path in paths:
+            kind, key = classify(path)
+            changes.setdefault(kind, set()).add(key)
+
+        if "regions" in changes:
+            self.rebuild_all()
+            return "full rebuild (region catalog changed)"
+
+        adapters = changes.get("adapter", set())
+        if adapters:
+            generate_adapter_registry.generate_adapter_registry(changed=adapters)
+        for region_code in changes.get("vault_config", ()):
+            config_path = os.path.join(link_registry_to_vaults.vaults_dir, region_code, "config.json")
+            link_registry_to_vaults.link_vault_config(config_path)
+
+        rows = {filename[:-len("_adapter.json")] for filename in adapters} | changes.get("tradeline", set())
+        if rows:
+            refreshed = self.table.refresh(rows) if self.table is not None else None
+            if refreshed is None:
+                self.table = generate_credit_report.load_credit_table()
+                if self.table is None:
+                    return f"{len(adapters)} registry entries, credit report skipped"
+                refreshed = sorted(rows)
+            if refreshed:
+                generate_credit_report.write_credit_report(self.table)
+            return f"{len(adapters)} registry entries, {len(refreshed)} report rows"
+        return f"{len(changes.get('vault_config', ()))} vault configs"
+
+
+def watch(force_polling=False, interval=DEFAULT_POLL_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+    builder = IncrementalBuilder()
+    watcher = open_watcher(force_polling, interval)
+    print(f"Watching {generate_adapter_registry.credit_adapters_dir}/, {link_registry_to_vaults.vaults_dir}/*/ and "
+          f"{region_catalog.regions_data_path} ({type(watcher).__name__}). Press Ctrl+C to stop.")
+    try:
+        for paths in debounced_changes(watcher, debounce):
+            started = time.monotonic()
+            summary = builder.apply(paths)
+            print(f"[watch] {len(paths)} changed file(s) -> {summary} in {(time.monotonic() - started) * 1000:.0f}ms")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the adapter registry, vault links and credit report as files change.")
+    parser.add_argument("--poll", action="store_true", help="Use the polling watcher even if inotify is available.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_POLL_INTERVAL, help="Polling interval in seconds.")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE, help="Quiet period that ends a burst of events.")
+    args = parser.parse_args()
+    try:
+        watch(force_polling=args.poll, interval=args.interval, debounce=args.debounce)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_WORKERS_PER_DESTINATION = 4
+LATENCY_SAMPLES = 4096
+MAX_BODY_BYTES = 1024 * 1024
+
+# commit type -> destination. Extend by passing routes= or calling add_route().
+DEFAULT_ROUTES = {
+    "creative": "kimi",
+    "backend": "manus"
+}
+
+# Tag keywords used when a push does not state its commit type explicitly.
+COMMIT_TYPE_KEYWORDS = {
+    "creative": ("creative", "aesthetic", "localized", "crypmercial"),
+    "backend": ("infra", "backend", "schema", "adapter")
+}
+
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+def classify_commit(tag):
+    tag = (tag or "").lower()
+    for commit_type, keywords in COMMIT_TYPE_KEYWORDS.items():
+        if any(keyword in tag for keyword in keywords):
+            return commit_type
+    return None
+
+
+def parse_push_event(payload, headers=None):
+    # Accepts the simulator's flat shape ({"repo", "tag", "commit_type"}) or a GitHub push payload.
+    # Anything else that parses as JSON (an array, a string, wrongly typed fields) is rejected with None.
+    if not isinstance(payload, dict):
+        return None
+    headers = headers or {}
+    repository = payload.get("repository")
+    ref = payload.get("ref")
+    repo = payload.get("repo") or (repository.get("name") if isinstance(repository, dict) else None)
+    tag = payload.get("tag") or (ref.rsplit("/", 1)[-1] if isinstance(ref, str) else None)
+    if not isinstance(repo, str) or not isinstance(tag, str) or not repo or not tag:
+        return None
+    commit_type = payload.get("commit_type")
+    if not isinstance(commit_type, str) or not commit_type:
+        commit_type = headers.get("x-commit-type") or classify_commit(tag)
+    return {"repo": repo, "tag": tag, "commit_type": commit_type}
+
+
+async def kimi_destination(event):
+    print(f"  Kimi received creative update for {event['repo']} with tag {event['tag']}.")
+
+
+async def manus_destination(event):
+    print(f"  Manus received backend update for {event['repo']} with tag {event['tag']}.")
+
+
+DEFAULT_DESTINATIONS = {
+    "kimi": kimi_destination,
+    "manus": manus_destination
+}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class _DestinationStats:
+    __slots__ = ("enqueued", "dispatched", "failed", "dropped", "latencies")
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dispatched = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+
+class WebhookIngestService:
+    def __init__(self, routes=None, destinations=None, queue_size=DEFAULT_QUEUE_SIZE,
+                 workers_per_destination=DEFAULT_WORKERS_PER_DESTINATION):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.destinations = dict(DEFAULT_DESTINATIONS if destinations is None else destinations)
+        self.queue_size = queue_size
+        self.workers_per_destination = workers_per_destination
+        self.unroutable = 0
+        self._queues = {}
+        self._stats = {}
+        self._workers = []
+        self._server = None
+
+    def add_route(self, commit_type, destination, handler=None):
+        self.routes[commit_type] = destination
+        if handler is not None:
+            self.destinations[destination] = handler
+
+    async def start(self):
+        for name, handler in self.destinations.items():
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self._queues[name] = queue
+            self._stats[name] = _DestinationStats()
+            for _ in range(self.workers_per_destination):
+                self._workers.append(asyncio.create_task(self._worker(name, handler, queue)))
+
+    async def _worker(self, name, handler, queue):
+        stats = self._stats[name]
+        while True:
+            enqueued_at, event = await queue.get()
+            stats.latencies.append(time.monotonic() - enqueued_at)
+            try:
+                await handler(event)
+                stats.dispatched += 1
+            except Exception as e:
+                stats.failed += 1
+                print(f"  Error: {name} failed to handle {event.get('repo')} {event.get('tag')}: {e}")
+            finally:
+                queue.task_done()
+
+    def submit(self, event):
+        # Never blocks the receiver: a full destination queue drops the event and counts it.
+        destination = self.routes.get(event.get("commit_type"))
+        queue = self._queues.get(destination)
+        if queue is None:
+            self.unroutable += 1
+            return "unroutable"
+        try:
+            queue.put_nowait((time.monotonic(), event))
+        except asyncio.QueueFull:
+            self._stats[destination].dropped += 1
+            return "dropped"
+        self._stats[destination].enqueued += 1
+        return "queued"
+
+    async def drain(self):
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def metrics(self):
+        destinations = {}
+        for name, stats in self._stats.items():
+            latencies = sorted(stats.latencies)
+            destinations[name] = {
+                "queue_depth": self._queues[name].qsize(),
+                "enqueued": stats.enqueued,
+                "dispatched": stats.dispatched,
+                "failed": stats.failed,
+                "dropped": stats.dropped,
+                "latency_ms": {
+                    "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+                    "p95": round(_percentile(latencies, 0.95) * 1000, 3),
+                    "max": round((latencies[-1] if latencies else 0.0) * 1000, 3)
+                }
+            }
+        return {"unroutable": self.unroutable, "destinations": destinations}
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        if not self._queues:
+            await self.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await _read_http_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = self._route_request(method, path, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_http_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            _write_http_response(writer, 413 if "too large" in str(e) else 400, {"error": str(e)}, False)
+        finally:
+            writer.close()
+
+    def _route_request(self, method, path, headers, body):
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        if method != "POST" or path != "/webhook":
+            return 404, {"error": "not found"}
+        try:
+            event = parse_push_event(json.loads(body or b"{}"), headers)
+        except ValueError:
+            event = None
+        if event is None:
+            return 400, {"error": "expected a push event with a repository and tag"}
+        result = self.submit(event)
+        # An event no route takes is accepted and ignored: redelivering it can never help. 503 means
+        # only a full destination queue, which the sender should retry later.
+        return (503 if result == "dropped" else 202), {"result": result}
+
+
+async def _read_http_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length > MAX_BODY_BYTES:
+        raise ValueError("payload too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+def _write_http_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+async def post_events(host, port, events):
+    # Minimal keep-alive client for pushing a burst of events at a running service.
+    reader, writer = await asyncio.open_connection(host, port)
+    statuses = []
+    try:
+        for event in events:
+            body = json.dumps(event).encode("utf-8")
+            writer.write((f"POST /webhook HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            statuses.append(int(status_line.split()[1]))
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+    finally:
+        writer.close()
+    return statuses
+
+
+async def _serve_forever(host, port, queue_size, workers):
+    service = WebhookIngestService(queue_size=queue_size, workers_per_destination=workers)
+    bound_host, bound_port = await service.serve(host, port)
+    print(f"Webhook ingest listening on http://{bound_host}:{bound_port}/webhook (metrics at /metrics)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local GitHub webhook ingest service for Kimi/Manus routing.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS_PER_DESTINATION, help="Worker coroutines per destination.")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_forever(args.host, args.port, args.queue_size, args.workers))
+    except KeyboardInterrupt:
+        pass